@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗂️ Registre des agents Algeria - chargement paresseux
+Chaque agent est déclaré par un point d'entrée "module:attribut" importé au
+premier usage seulement ; les paquets installés peuvent ajouter les leurs
+(groupe `erp_algeria.agents`). prewarm() construit une fois par processus
+les tables partagées (détecteur, extracteur, règles fiscales, modèles).
+add_agent_paths() est le seul endroit qui rend les dossiers du dépôt
+importables : appelé par le registre au premier chargement et par les
+points d'entrée, jamais à l'import d'un module.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+AGENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Dossiers des modules agents dans le dépôt (inutiles une fois installés)
+AGENT_PATHS = (
+    AGENTS_DIR,
+    os.path.join(AGENTS_DIR, 'communication_agent'),
+    os.path.join(os.path.dirname(AGENTS_DIR), 'e-learning', 'chat-ai'),
+    os.path.join(os.path.dirname(AGENTS_DIR), 'ocr-intelligence'),
+)
+
+ENTRY_POINT_GROUP = 'erp_algeria.agents'
+
+AGENT_ENTRY_POINTS: Dict[str, str] = {
+    'fiscal': 'fiscal_agent_algeria:FiscalAiAgent',
+    'whatsapp': 'whatsapp_agent_algeria:WhatsAppAgent',
+    'telegram': 'telegram_agent_algeria:TelegramAgentAlgeria',
+    'signal': 'signal_agent_algeria:SignalAgentAlgeria',
+    'orchestrator': 'multi_platform_orchestrator:MultiPlatformOrchestrator',
+}
+
+
+def add_agent_paths() -> List[str]:
+    """Ajoute à sys.path les dossiers d'AGENT_PATHS absents (idempotent) ; ceux ajoutés"""
+    added = [path for path in AGENT_PATHS if path not in sys.path]
+    sys.path.extend(added)
+    return added
+
+
+def resolve(spec: str) -> Any:
+    """Importe et retourne l'objet désigné par "module:attribut[.sous_attribut]" """
+    module_name, _, attribute = spec.partition(':')
+    target = importlib.import_module(module_name)
+    for part in filter(None, attribute.split('.')):
+        target = getattr(target, part)
+    return target
+
+
+class AgentRegistry:
+    """🗂️ Nom d'agent -> classe, importée au premier load()/create()"""
+
+    def __init__(self, entry_points: Optional[Dict[str, str]] = None,
+                 group: Optional[str] = ENTRY_POINT_GROUP):
+        self._specs: Dict[str, Any] = dict(AGENT_ENTRY_POINTS if entry_points is None
+                                           else entry_points)
+        self._loaded: Dict[str, Any] = {}
+        self._group = group
+        self._discovered = group is None
+        self._lock = threading.RLock()
+
+    def register(self, name: str, target: Any):
+        """Déclare un agent : chaîne "module:attribut" (paresseux) ou classe déjà importée"""
+        with self._lock:
+            self._specs[name] = target
+            self._loaded.pop(name, None)
+
+    def _discover(self):
+        """Points d'entrée des paquets installés (lus une fois, sur nom inconnu)"""
+        self._discovered = True
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=self._group):
+            self._specs.setdefault(entry_point.name, entry_point.value)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            if not self._discovered:
+                self._discover()
+            return sorted(self._specs)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def load(self, name: str) -> Any:
+        """Classe de l'agent `name` (import du module au premier appel)"""
+        agent_class = self._loaded.get(name)
+        if agent_class is not None:
+            return agent_class
+        with self._lock:
+            if name not in self._specs and not self._discovered:
+                self._discover()
+            try:
+                spec = self._specs[name]
+            except KeyError:
+                raise KeyError(f"agent inconnu: {name} (disponibles: {', '.join(sorted(self._specs))})")
+            if isinstance(spec, str):
+                add_agent_paths()
+                agent_class = resolve(spec)
+            else:
+                agent_class = spec
+            self._loaded[name] = agent_class
+            return agent_class
+
+    def create(self, name: str, *args, **kwargs) -> Any:
+        """🏗️ Instancie l'agent `name`"""
+        return self.load(name)(*args, **kwargs)
+
+
+_registry: Optional[AgentRegistry] = None
+
+
+def get_registry() -> AgentRegistry:
+    """Registre partagé par le processus"""
+    global _registry
+    if _registry is None:
+        _registry = AgentRegistry()
+    return _registry
+
+
+def load_agent(name: str) -> Any:
+    return get_registry().load(name)
+
+
+def create_agent(name: str, *args, **kwargs) -> Any:
+    return get_registry().create(name, *args, **kwargs)
+
+
+_prewarm_lock = threading.Lock()
+_prewarm_timings: Optional[Dict[str, float]] = None
+
+
+def prewarm() -> Dict[str, float]:
+    """🔥 Construit les tables partagées une fois par processus ; durées (ms) par table
+
+    À appeler au démarrage d'un worker (ou en initializer d'un pool) pour
+    que la première requête ne paie pas la compilation des lexiques et
+    regex ni la lecture des règles fiscales.
+    """
+    global _prewarm_timings
+    with _prewarm_lock:
+        if _prewarm_timings is not None:
+            return _prewarm_timings
+
+        from entity_extractor_algeria import get_extractor
+        from language_detector_algeria import get_detector
+        from tax_rules_algeria import get_rule_book
+        from templates_algeria import REGISTRY
+
+        timings = {}
+        for table, build in (('language_detector', get_detector),
+                             ('entity_extractor', get_extractor),
+                             ('tax_rules', lambda: get_rule_book().current()),
+                             ('templates', lambda: REGISTRY.render('general_help', 'fr'))):
+            start = time.perf_counter()
+            build()
+            timings[table] = (time.perf_counter() - start) * 1000
+        _prewarm_timings = timings
+        return timings
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark cache de réponses du chat e-learning : promotion de stagiaires
+posant les mêmes questions reformulées (français, arabe) - taux de succès,
+réponses identiques au calcul direct, coût par question (catalogue
+agrandi de leçons synthétiques, voir bench_course_index)
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import unicodedata
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(AGENTS_DIR), 'e-learning', 'chat-ai'))
+
+from answer_cache_algeria import AnswerCache
+from bench_course_index import catalogue
+from course_index_algeria import CourseIndex, collect_documents
+from elearning_chat_ai import KNOWLEDGE_BASE, MODULES_DIR, ELearningChatAI
+
+QUESTIONS = (
+    "Quel est le taux de TVA en Algérie ?",
+    "Quel est le taux de TVA à l'export ?",
+    "Comment fonctionne le barème IRG progressif ?",
+    "Quelles sont les cotisations CNAS de l'employeur ?",
+    "Quelle cotisation CASNOS pour les non-salariés ?",
+    "Comment remplir la déclaration G50 ?",
+    "Quel est le taux réduit de TVA ?",
+    "ما هي نسبة الضريبة على القيمة المضافة في الجزائر؟",
+    "كيف تحسب الضريبة على الدخل الإجمالي؟",
+    "ما هي اشتراكات الضمان الاجتماعي للعمال؟",
+)
+PREFIXES = ("", "", "Bonjour, ", "Svp ", "Question : ")
+FILLERS = ("", "", " exactement", " en ce moment")
+
+
+def strip_accents(text: str) -> str:
+    return ''.join(char for char in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(char))
+
+
+def paraphrase(rng: random.Random, question: str) -> str:
+    """Variante d'une question : casse, accents, ponctuation, formule de politesse"""
+    text = question.rstrip(' ?؟') + rng.choice(FILLERS)
+    if rng.random() < 0.5:
+        text = strip_accents(text)
+    if rng.random() < 0.3:
+        text = text.lower()
+    if question.isascii() or rng.random() < 0.5:
+        text = rng.choice(PREFIXES) + text
+    return text + rng.choice((" ?", "?", "", " ??", "؟"))
+
+
+def cohort(count: int, seed: int = 24):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    return [paraphrase(rng, rng.choices(QUESTIONS, weights)[0]) for _ in range(count)]
+
+
+def main(count: int = 20_000, lessons: int = 5000):
+    questions = cohort(count)
+    print(f"⏱️ Cache de réponses e-learning - {count:,} questions, "
+          f"{len(set(questions)):,} formulations distinctes, {lessons:,} leçons")
+    index = CourseIndex.build(collect_documents(MODULES_DIR, KNOWLEDGE_BASE) + catalogue(lessons))
+    chat = ELearningChatAI(index=index, answer_cache=AnswerCache(maxsize=1000))
+
+    start = time.perf_counter()
+    expected = [chat.answer_question(question) for question in questions]
+    direct = time.perf_counter() - start
+
+    async def ask_all():
+        return [await chat.process_question(question) for question in questions]
+
+    start = time.perf_counter()
+    answers = asyncio.run(ask_all())
+    cached = time.perf_counter() - start
+
+    stats = chat.answer_cache.stats()
+    same = sum(answer == reference for answer, reference in zip(answers, expected))
+    print(f"   Calcul direct : {direct / count * 1e6:7.1f} µs/question")
+    print(f"   Avec cache    : {cached / count * 1e6:7.1f} µs/question "
+          f"(succès {stats['hit_rate']:.1%} : {stats['exact_hits']:,} exacts, "
+          f"{stats['near_hits']:,} proches ; {stats['size']} réponses en cache)")
+    print(f"   Réponses identiques au calcul direct : {same / count:.2%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
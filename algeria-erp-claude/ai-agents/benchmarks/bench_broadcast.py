@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark diffusion multi-plateformes : envois séquentiels vs moteur concurrent
+Agents simulés avec latence réseau, quotas désactivés (débit du moteur seul)
+puis quotas réels sur un petit échantillon (débit limité par API)
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Dossiers des modules agents (agent_registry_algeria.AGENT_PATHS)
+sys.path.insert(0, AGENTS_DIR)
+from agent_registry_algeria import add_agent_paths  # noqa: E402
+
+add_agent_paths()
+
+from broadcast_engine_algeria import BroadcastEngine
+
+PLATFORMS = ('telegram', 'signal', 'whatsapp')
+MESSAGE = "📅 Rappel : déclaration G50 avant le 20 du mois"
+
+
+class LatencyAgent:
+    """Agent simulé : latence fixe par envoi, un échec tous les `fail_every`"""
+
+    def __init__(self, latency: float, fail_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+
+    async def send_message(self, recipient, text):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.latency)
+        if self.fail_every and call % self.fail_every == 0:
+            raise ConnectionError("HTTP 503")
+        return f"📤 {recipient}: {text[:50]}..."
+
+
+def recipients(platform: str, count: int):
+    """Générateur : la liste complète n'est jamais matérialisée"""
+    return (f"{platform}:{i}" for i in range(count))
+
+
+async def sequential(count: int, latency: float) -> float:
+    agents = {platform: LatencyAgent(latency) for platform in PLATFORMS}
+    start = time.perf_counter()
+    for platform in PLATFORMS:
+        for recipient in recipients(platform, count):
+            await agents[platform].send_message(recipient, MESSAGE)
+    return time.perf_counter() - start
+
+
+async def concurrent(count: int, latency: float, concurrency: int, rate_limits=None):
+    agents = {platform: LatencyAgent(latency, fail_every=997) for platform in PLATFORMS}
+    engine = BroadcastEngine(rate_limits, concurrency=concurrency,
+                             progress_every=max(1, count * len(PLATFORMS) // 4))
+    start = time.perf_counter()
+    report = await engine.broadcast(
+        agents, MESSAGE, {platform: recipients(platform, count) for platform in PLATFORMS},
+        on_progress=lambda p: print(f"      ⏳ {p['sent']:>8,} envoyés  {p['failed']:>5,} échecs"
+                                    f"  {p['rate_per_second']:>9,.0f} msg/s")
+    )
+    return time.perf_counter() - start, report
+
+
+def main(count: int = 100_000, latency: float = 0.02, concurrency: int = 512):
+    total = count * len(PLATFORMS)
+    print(f"⏱️ Diffusion - {total:,} destinataires ({count:,} par plateforme), "
+          f"latence simulée {latency * 1000:.0f} ms")
+
+    sample = min(count, 200)
+    sequential_time = asyncio.run(sequential(sample, latency)) / sample * count
+    print(f"   Séquentiel (extrapolé) : {sequential_time:10.1f} s")
+
+    tracemalloc.start()
+    unlimited = dict.fromkeys(PLATFORMS)
+    elapsed, report = asyncio.run(concurrent(count, latency, concurrency, unlimited))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   Concurrent ({concurrency}) : {elapsed:10.1f} s  "
+          f"x{sequential_time / elapsed:,.0f}, {report.total_sent:,} envoyés, "
+          f"{report.total_failed:,} échecs, pic mémoire {peak / 1e6:.1f} Mo")
+
+    # Quotas réels : le débit de chaque plateforme doit coller à son seau
+    burst = 150
+    elapsed, report = asyncio.run(concurrent(burst, latency, concurrency))
+    print(f"   Quotas API, {burst} par plateforme : {elapsed:.1f} s")
+    for platform in PLATFORMS:
+        print(f"      {platform:9}: {report.sent[platform] + report.failed[platform]} traités")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
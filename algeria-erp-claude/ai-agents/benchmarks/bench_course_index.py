@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark index des formations (ELearningChatAI) : catalogue synthétique
+de plusieurs milliers de leçons - construction, taille, ouverture mmap et
+latence des requêtes (p50 / p99), Python pur vs numpy
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(AGENTS_DIR), 'e-learning', 'chat-ai'))
+
+from course_index_algeria import CourseIndex
+
+try:
+    import numpy  # noqa: F401 - importé ici pour ne pas compter dans l'ouverture
+except ImportError:
+    numpy = None
+
+TOPICS = (
+    "TVA taux normal réduit export facture déduction crédit remboursement",
+    "IRG barème progressif abattement salaire retenue source enfants",
+    "G50 déclaration mensuelle paiement échéance pénalités retard",
+    "CNAS cotisations employeur salarié affiliation DAS",
+    "CASNOS non-salariés cotisation revenus commerçant",
+    "IBS bénéfice sociétés acompte liquidation exonération",
+    "ضريبة القيمة المضافة الفاتورة التصدير الخصم",
+    "الضريبة على الدخل الإجمالي الراتب الأطفال",
+    "TAP activité professionnelle chiffre affaires",
+    "NIF NIS registre commerce article imposition",
+)
+QUERIES = (
+    "Quel est le taux de TVA à l'export ?",
+    "comment calculer l'IRG avec deux enfants",
+    "date limite de la déclaration G50",
+    "cotisations CNAS employeur",
+    "ضريبة القيمة المضافة على الفاتورة",
+    "acompte IBS exonération",
+    "pénalités de retard paiement",
+)
+
+
+def catalogue(count: int, seed: int = 23):
+    rng = random.Random(seed)
+    filler = [f"mot{i}" for i in range(20_000)]
+    documents = []
+    for i in range(count):
+        topic = TOPICS[i % len(TOPICS)].split()
+        words = rng.sample(topic, 3) + rng.choices(filler, k=50) + rng.choices(topic, k=10)
+        rng.shuffle(words)
+        documents.append({'kind': 'lesson', 'title': f"Leçon {i} " + " ".join(topic[:2]),
+                          'text': " ".join(words), 'source': f"module-{i // 20}.json#{i % 20}",
+                          'meta': {'module': f"Module {i // 20}", 'duration': '30min'}})
+    return documents
+
+
+def query_latencies(index, rounds: int = 200):
+    latencies = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            start = time.perf_counter()
+            index.search(query, k=3)
+            latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def main(count: int = 5000):
+    print(f"⏱️ Index des formations - {count:,} leçons")
+    documents = catalogue(count)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'course_index.dzix')
+        start = time.perf_counter()
+        size = CourseIndex.save(documents, path)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = CourseIndex.open(path)
+        opened = time.perf_counter() - start
+        stats = index.stats()
+        print(f"   Construction : {build:6.2f} s, {size / 2**20:5.2f} Mo "
+              f"({stats['terms']:,} termes, {stats['postings']:,} postings)")
+        print(f"   Ouverture    : {opened * 1e3:6.3f} ms (mmap)")
+        index.close()
+
+        for label, use_numpy in (("Python pur", False), ("numpy", True)):
+            if use_numpy and numpy is None:
+                continue
+            with CourseIndex.open(path, use_numpy=use_numpy) as index:
+                latencies = query_latencies(index)
+            print(f"   Requête {label:10}: p50 {latencies[len(latencies) // 2] * 1e3:.3f} ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark ordonnancement des envois : surcharge d'une plateforme
+Campagne marketing + trafic normal d'un gros tenant, alertes d'échéance
+d'un petit tenant ; envoi dans l'ordre d'appel vs DispatchScheduler
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENTS_DIR)
+sys.path.insert(0, os.path.join(AGENTS_DIR, 'communication_agent'))
+
+from dispatch_scheduler_algeria import DispatchScheduler
+from multi_platform_orchestrator import MultiPlatformOrchestrator
+
+
+class SlowAgent:
+    """Agent simulé : latence réseau fixe"""
+    http_client = None
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def send_message(self, recipient, text):
+        await asyncio.sleep(self.latency)
+        return True
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+async def run(count: int, rate: float, scheduled: bool):
+    limits = {'telegram': (rate, rate / 10)}
+    scheduler = DispatchScheduler(rate_limits=limits, concurrency=16,
+                                  max_queue=count // 2) if scheduled else None
+    orchestrator = MultiPlatformOrchestrator(rate_limits=limits, scheduler=scheduler)
+    agent = SlowAgent(0.002)
+    bucket = orchestrator.broadcaster.buckets['telegram']
+    if not scheduled:
+        # Référence : envoi dans l'ordre d'appel, même quota API
+        class Limited:
+            http_client = None
+
+            async def send_message(self, recipient, text):
+                await bucket.acquire()
+                return await agent.send_message(recipient, text)
+        orchestrator.register_platform('telegram', Limited())
+    else:
+        orchestrator.register_platform('telegram', agent)
+        orchestrator.start_scheduler()
+
+    latencies = {'alert': [], 'normal-petit': [], 'marketing': []}
+    shed = 0
+
+    async def send(user_id, message_type, tenant, label, delay):
+        nonlocal shed
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        ok = await orchestrator.send_smart_message(user_id, 'Échéance G50', message_type,
+                                                   tenant_id=tenant)
+        if ok is False:
+            shed += 1
+        elif label in latencies:
+            latencies[label].append(time.perf_counter() - start)
+
+    duration = count / rate / 2
+    jobs = [send(f"+2136{i:08d}", 'marketing', 'gros', 'marketing', 0) for i in range(count)]
+    jobs += [send(f"+2137{i:08d}", 'normal', 'gros', 'normal-gros', 0) for i in range(count // 4)]
+    # Petit tenant et alertes réparties pendant la surcharge
+    jobs += [send(f"+2135{i:08d}", 'normal', 'petit', 'normal-petit', duration * i / 50)
+             for i in range(50)]
+    jobs += [send(f"+2138{i:08d}", 'alert', 'petit', 'alert', duration * i / 50) for i in range(50)]
+    start = time.perf_counter()
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - start
+    if scheduler is not None:
+        await scheduler.close()
+    return elapsed, latencies, shed
+
+
+def main(count: int = 4000, rate: float = 2000.0):
+    print(f"⏱️ Ordonnancement - {count:,} marketing + {count // 4:,} normaux (gros tenant), "
+          f"50 alertes + 50 normaux (petit tenant), quota {rate:,.0f} msg/s")
+    for label, scheduled in (("Ordre d'appel", False), ("DispatchScheduler", True)):
+        elapsed, latencies, shed = asyncio.run(run(count, rate, scheduled))
+        print(f"   {label:18}: alertes p99 {percentile(latencies['alert'], 0.99) * 1000:7.1f} ms, "
+              f"normal petit tenant p99 {percentile(latencies['normal-petit'], 0.99) * 1000:7.1f} ms, "
+              f"marketing p99 {percentile(latencies['marketing'], 0.99) * 1000:7.1f} ms, "
+              f"{shed:,} délestés, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark extraction d'entités - latence par requête (p50/p95/p99)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus_dz import MESSAGES
+from entity_extractor_algeria import get_extractor
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Percentile simple (rang le plus proche) sur une liste triée"""
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main(rounds: int = 4000):
+    extractor = get_extractor()
+    queries = [(text, language) for text, language in MESSAGES] * rounds
+
+    latencies = []
+    clock = time.perf_counter_ns
+    for query, language in queries:
+        start = clock()
+        extractor.extract(query, language)
+        latencies.append(clock() - start)
+
+    latencies.sort()
+    total = sum(latencies) / 1e9
+    print(f"⏱️ Extraction d'entités - {len(queries):,} requêtes")
+    print(f"   Débit : {len(queries) / total:,.0f} requêtes/s")
+    for label, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+        print(f"   {label}   : {percentile(latencies, fraction) / 1000:.2f} µs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark calculs fiscaux de l'orchestrateur : rush d'échéance
+Rafales de demandes identiques (peu de montants distincts), calcul à
+chaque appel vs regroupement single-flight + cache
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENTS_DIR)
+sys.path.insert(0, os.path.join(AGENTS_DIR, 'communication_agent'))
+
+from multi_platform_orchestrator import MultiPlatformOrchestrator
+
+
+class SilentAgent:
+    http_client = None
+
+    async def send_message(self, recipient, text):
+        return True
+
+
+class NoCoalescing:
+    """Référence : chaque demande refait le calcul"""
+
+    async def run(self, key, compute):
+        return compute()
+
+    def stats(self):
+        return {}
+
+
+def requests(count: int, distinct: int):
+    rng = random.Random(20)
+    amounts = [rng.randrange(30_000, 400_000, 500) for _ in range(distinct)]
+    return [(('tva', 'irg')[i % 2], amounts[rng.randrange(distinct)]) for i in range(count)]
+
+
+async def run(count: int, distinct: int, burst: int, coalesce: bool):
+    orchestrator = MultiPlatformOrchestrator()
+    orchestrator.register_platform('telegram', SilentAgent())
+    if not coalesce:
+        orchestrator.fiscal_flight = NoCoalescing()
+    work = requests(count, distinct)
+    start = time.perf_counter()
+    for offset in range(0, count, burst):
+        await asyncio.gather(*(
+            orchestrator.handle_fiscal_calculation(f"+2135{i:08d}", calc_type, amount)
+            for i, (calc_type, amount) in enumerate(work[offset:offset + burst], offset)
+        ))
+    return time.perf_counter() - start, orchestrator.fiscal_stats()
+
+
+def main(count: int = 50_000, distinct: int = 200, burst: int = 1000):
+    print(f"⏱️ Calculs fiscaux - {count:,} demandes, {distinct} montants distincts, "
+          f"rafales de {burst}")
+    plain, _ = asyncio.run(run(count, distinct, burst, coalesce=False))
+    grouped, stats = asyncio.run(run(count, distinct, burst, coalesce=True))
+    print(f"   Calcul à chaque appel : {count / plain:9,.0f} demandes/s")
+    print(f"   Single-flight + cache : {count / grouped:9,.0f} demandes/s "
+          f"({stats['computations']:,} calculs, {stats['coalesced']:,} regroupés, "
+          f"{stats['cache_hits']:,} depuis le cache)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
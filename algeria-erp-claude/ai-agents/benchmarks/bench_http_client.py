@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark client HTTP partagé : connexion par message vs pool keep-alive
+Envois WhatsApp (Graph) et Telegram (Bot API) vers le serveur simulé local
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENTS_DIR)
+sys.path.insert(0, os.path.join(AGENTS_DIR, 'communication_agent'))
+
+from http_client_algeria import HttpClient
+from stub_api_server import StubApiServer
+from telegram_agent_algeria import TelegramAgentAlgeria
+from whatsapp_agent_algeria import WhatsAppAgent, WhatsAppConfig
+
+
+async def run(count: int, concurrency: int, keepalive: bool, latency: float):
+    async with StubApiServer(latency=latency) as server:
+        client = HttpClient(limit_per_host=concurrency,
+                            keepalive_expiry=30.0 if keepalive else 0.0)
+        whatsapp = WhatsAppAgent(WhatsAppConfig("TOKEN", "1234567890", "VERIFY", "",
+                                                http_client=client,
+                                                api_base=f"{server.url}/v19.0"))
+        telegram = TelegramAgentAlgeria("123:ABC", http_client=client, api_base=server.url)
+        agents = (whatsapp, telegram)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(i):
+            async with semaphore:
+                await agents[i % 2].send_message(f"+2135{i:08d}", "📅 Rappel G50 avant le 20")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(count)))
+        elapsed = time.perf_counter() - start
+        await client.close()
+        return elapsed, server.connections
+
+
+def main(count: int = 5000, concurrency: int = 32, latency: float = 0.002):
+    print(f"⏱️ Client HTTP - {count:,} envois, {concurrency} en parallèle, "
+          f"latence serveur {latency * 1000:.0f} ms")
+    results = {}
+    for label, keepalive in (('Connexion par message', False), ('Pool keep-alive', True)):
+        elapsed, connections = asyncio.run(run(count, concurrency, keepalive, latency))
+        results[label] = elapsed
+        print(f"   {label:22}: {count / elapsed:8,.0f} messages/s, {connections:,} connexions TCP")
+    print(f"   Gain : x{results['Connexion par message'] / results['Pool keep-alive']:.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark IRG par lots vs calcul unitaire
+Vérifie l'égalité au centime puis compare les temps d'exécution
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fiscal_agent_algeria import FiscalAiAgent
+from fiscal_batch_algeria import to_centimes
+
+try:
+    import numpy as np
+except ImportError:  # NumPy absent : seul le chemin pur Python est mesuré
+    np = None
+
+
+def build_payroll(count: int, seed: int = 2025):
+    """Génère une paie fictive déterministe (salaires au centime, 0-6 enfants)"""
+    rng = random.Random(seed)
+    salaries = [rng.randint(1_500_000, 300_000_000) / 100 for _ in range(count)]
+    children = [rng.randint(0, 6) for _ in range(count)]
+    return salaries, children
+
+
+async def scalar_loop(agent: FiscalAiAgent, salaries, children):
+    """Boucle actuelle : un appel calculate_irg_intelligent par salarié"""
+    return [
+        await agent.calculate_irg_intelligent({'amount': salary, 'children': kids})
+        for salary, kids in zip(salaries, children)
+    ]
+
+
+def check_parity(scalar_results, batch):
+    """Compare chaque champ au centime près"""
+    fields = ('irg_amount', 'abattements', 'taxable_base', 'net_salary')
+    for i, result in enumerate(scalar_results):
+        for field in fields:
+            expected = to_centimes(result[field])
+            if int(batch[field][i]) != expected:
+                raise AssertionError(
+                    f"Écart ligne {i} ({field}): {int(batch[field][i])} != {expected}"
+                )
+
+
+def main(count: int = 100_000):
+    agent = FiscalAiAgent()
+    salaries, children = build_payroll(count)
+
+    start = time.perf_counter()
+    scalar_results = asyncio.run(scalar_loop(agent, salaries, children))
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = agent.calculate_irg_batch(salaries, children)
+    python_time = time.perf_counter() - start
+    check_parity(scalar_results, batch)
+
+    print(f"⏱️ IRG - {count:,} salariés")
+    print(f"   Boucle unitaire : {scalar_time:8.3f} s")
+    print(f"   Lot pur Python  : {python_time:8.3f} s  (x{scalar_time / python_time:.1f})")
+
+    if np is not None:
+        salaries_np = np.asarray(salaries)
+        children_np = np.asarray(children)
+        start = time.perf_counter()
+        batch = agent.calculate_irg_batch(salaries_np, children_np)
+        numpy_time = time.perf_counter() - start
+        check_parity(scalar_results, batch)
+        print(f"   Lot NumPy       : {numpy_time:8.3f} s  (x{scalar_time / numpy_time:.1f})")
+
+    print("✅ Résultats identiques au centime")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
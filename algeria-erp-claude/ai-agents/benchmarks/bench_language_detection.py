@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark détection de langue - débit sur corpus mixte ar/ar_dz/fr/en/ber
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus_dz import MESSAGES
+from language_detector_algeria import get_detector
+
+
+def main(rounds: int = 4000):
+    detector = get_detector()
+
+    errors = [(text, expected, detector.detect(text))
+              for text, expected in MESSAGES
+              if detector.detect(text) != expected]
+    for text, expected, detected in errors:
+        print(f"❌ '{text}' → {detected} (attendu {expected})")
+
+    texts = [text for text, _ in MESSAGES] * rounds
+    start = time.perf_counter()
+    for text in texts:
+        detector.detect(text)
+    elapsed = time.perf_counter() - start
+
+    print(f"⏱️ Détection de langue - {len(texts):,} messages")
+    print(f"   Débit   : {len(texts) / elapsed:,.0f} messages/s")
+    print(f"   Latence : {elapsed / len(texts) * 1e6:.2f} µs/message")
+    print(f"   Précision corpus : {len(MESSAGES) - len(errors)}/{len(MESSAGES)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
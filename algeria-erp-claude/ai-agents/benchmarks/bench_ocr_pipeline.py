@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark pipeline OCR des factures : lot de TIFF multi-pages synthétiques
+(police du moteur GlyphOcr, bruit de numérisation), débit en pages/s selon
+le nombre de processus, champs extraits et TVA contrôlée vs attendus
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Dossiers des modules agents (agent_registry_algeria.AGENT_PATHS)
+sys.path.insert(0, AGENTS_DIR)
+from agent_registry_algeria import add_agent_paths  # noqa: E402
+
+add_agent_paths()
+
+from ocr_factures_dz import GlyphOcrBackend, InvoiceOcrPipeline, render_page, write_tiff
+
+SUPPLIERS = ("SARL TASSILI EQUIPEMENT - ALGER", "EURL NOUR INFORMATIQUE - ORAN",
+             "SPA SIDI BEL ABBES AGRO", "SNC FRERES BENALI - CONSTANTINE")
+PRODUCTS = ("Ordinateur portable", "Imprimante laser", "Ramette papier A4", "Onduleur 1500VA",
+            "Câble réseau Cat6", "Maintenance annuelle", "Formation Odoo", "Écran 24 pouces")
+RATES = (19, 9)
+
+
+def amount(centimes: int) -> str:
+    """Format des factures algériennes : 119 000,00"""
+    return f"{centimes // 100:,}".replace(',', ' ') + f",{centimes % 100:02d}"
+
+
+def invoice(rng: random.Random, number: int, pages: int = 1, wrong_tva: bool = False):
+    """Texte de chaque page d'une facture et champs attendus (totaux en dernière page)"""
+    rate = rng.choice(RATES)
+    lines, ht = [], 0
+    for line in range(rng.randint(6, 14) * pages):
+        quantity, unit = rng.randint(1, 20), rng.randint(500, 90_000) * 100
+        ht += quantity * unit
+        lines.append(f"{rng.choice(PRODUCTS):<22} {quantity:>3} x {amount(unit):>12} "
+                     f"{amount(quantity * unit):>14}")
+    tva = (ht * rate + 50) // 100
+    if wrong_tva:
+        tva += rng.randint(5, 50) * 1000
+    day, month = rng.randint(1, 28), rng.randint(1, 12)
+    fields = {'nif': f"0002{rng.randrange(10 ** 11):011d}", 'nis': f"0002{rng.randrange(10 ** 11):011d}",
+              'rc': f"{rng.randint(1, 48):02d}/00-{rng.randrange(10 ** 7):07d}B{rng.randint(0, 99):02d}",
+              'article': f"{rng.randrange(10 ** 11):011d}", 'date': f"2025-{month:02d}-{day:02d}",
+              'ht': ht, 'tva_rate': float(rate), 'tva': tva, 'ttc': ht + tva}
+    header = [rng.choice(SUPPLIERS),
+              f"NIF: {fields['nif']}  NIS: {fields['nis']}",
+              f"RC: {fields['rc']}  ART: {fields['article']}",
+              f"FACTURE N° 2025-{number:05d} DU {day:02d}/{month:02d}/2025", ""]
+    per_page = -(-len(lines) // pages)
+    texts = []
+    for page in range(pages):
+        body = lines[page * per_page:(page + 1) * per_page]
+        texts.append("\n".join((header if page == 0 else [f"Suite facture 2025-{number:05d}", ""])
+                               + body + [f"Page {page + 1}/{pages}"]))
+    texts[-1] += (f"\n\nTOTAL HT: {amount(ht)}\nTVA {rate}%: {amount(tva)}\n"
+                  f"TOTAL TTC: {amount(ht + tva)}")
+    return texts, fields
+
+
+def write_batch(directory: str, count: int, seed: int = 25, invalid_ratio: float = 0.1):
+    """TIFF multi-pages (1 à 3 pages) ; renvoie [(chemin, champs attendus, valide ?)]"""
+    rng = random.Random(seed)
+    batch = []
+    for number in range(count):
+        wrong = rng.random() < invalid_ratio
+        texts, fields = invoice(rng, number, pages=rng.randint(1, 3), wrong_tva=wrong)
+        path = os.path.join(directory, f"facture-{number:05d}.tif")
+        write_tiff(path, (render_page(text, path, page, noise_seed=number * 10 + page)
+                          for page, text in enumerate(texts, 1)))
+        batch.append((path, fields, not wrong))
+    return batch
+
+
+async def run(pipeline: InvoiceOcrPipeline, paths):
+    return [result async for result in pipeline.process(paths)]
+
+
+def main(count: int = 200):
+    with tempfile.TemporaryDirectory() as directory:
+        batch = write_batch(directory, count)
+        expected = {path: (fields, valid) for path, fields, valid in batch}
+        print(f"⏱️ Pipeline OCR factures - {count:,} factures TIFF "
+              f"({sum(os.path.getsize(path) for path in expected) / 2**20:.1f} Mo)")
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            pipeline = InvoiceOcrPipeline(GlyphOcrBackend(), workers=workers)
+            start = time.perf_counter()
+            results = asyncio.run(run(pipeline, list(expected)))
+            elapsed = time.perf_counter() - start
+            stats = pipeline.stats()
+            fields_ok = sum(result['fields'] == expected[result['source']][0] for result in results)
+            verdict_ok = sum(result['validation']['valid'] == expected[result['source']][1]
+                             for result in results)
+            print(f"   {workers:2d} processus : {stats['pages'] / elapsed:7.1f} pages/s "
+                  f"({elapsed:.2f} s, file max {stats['max_pending_pages']}) - champs exacts "
+                  f"{fields_ok / count:.1%}, verdict TVA {verdict_ok / count:.1%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark file d'envoi durable : commit par message vs commit groupé,
+et temps de reprise après redémarrage sur un journal volumineux
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'communication_agent'))
+
+from outbound_queue_algeria import OutboundQueue
+
+
+async def enqueue_all(path: str, count: int, max_batch: int, commit_interval: float) -> float:
+    queue = OutboundQueue(path, max_batch=max_batch, commit_interval=commit_interval)
+    await queue.open()
+    start = time.perf_counter()
+    # Producteurs concurrents (webhooks, calculs fiscaux...) : chacun attend la durabilité
+    await asyncio.gather(*(
+        queue.enqueue(f"+2135{i:08d}", 'telegram', f"📅 Rappel G50 #{i}") for i in range(count)
+    ))
+    elapsed = time.perf_counter() - start
+    await queue.close()
+    return elapsed
+
+
+def fill_delivered(path: str, count: int):
+    """Journal déjà livré (état après des semaines de production)"""
+    db = sqlite3.connect(path)
+    now = time.time()
+    with db:
+        db.executemany(
+            "INSERT INTO outbox (idempotency_key, user_id, platform, message, message_type, state,"
+            " attempts, next_attempt, created, delivered) VALUES (?, ?, 'telegram', ?, 'normal',"
+            " 1, 1, ?, ?, ?)",
+            ((f"old-{i}", f"+2135{i:08d}", "📅 Rappel G50", now, now, now) for i in range(count)))
+        db.execute("INSERT OR REPLACE INTO outbox_meta (key, value) VALUES ('acked_offset', ?)",
+                   (count,))
+    db.close()
+
+
+async def restart(path: str) -> float:
+    start = time.perf_counter()
+    queue = OutboundQueue(path)
+    await queue.open()
+    due = await queue._call(queue._due, time.time(), 128)
+    elapsed = time.perf_counter() - start
+    await queue.close()
+    return elapsed, len(due)
+
+
+def main(count: int = 2000, log_size: int = 500_000):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"⏱️ File d'envoi durable - {count:,} messages, synchronous=FULL")
+        per_message = asyncio.run(enqueue_all(os.path.join(directory, 'a.db'), count, 1, 0.0))
+        grouped = asyncio.run(enqueue_all(os.path.join(directory, 'b.db'), count, 512, 0.005))
+        print(f"   Commit par message : {count / per_message:10,.0f} messages/s")
+        print(f"   Commit groupé      : {count / grouped:10,.0f} messages/s  "
+              f"x{per_message / grouped:.1f}")
+
+        path = os.path.join(directory, 'c.db')
+        asyncio.run(enqueue_all(path, 0, 512, 0.005))
+        fill_delivered(path, log_size)
+        asyncio.run(enqueue_all(path, 100, 512, 0.005))
+        elapsed, due = asyncio.run(restart(path))
+        print(f"   Reprise ({log_size:,} livrés + {due} en attente) : {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark préférences utilisateurs SQLite : import massif, recherches
+unitaires (à froid / cache LRU) et recherches groupées pour une diffusion
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Dossiers des modules agents (agent_registry_algeria.AGENT_PATHS)
+sys.path.insert(0, AGENTS_DIR)
+from agent_registry_algeria import add_agent_paths  # noqa: E402
+
+add_agent_paths()
+
+from preference_store_algeria import SQLitePreferenceStore
+
+PLATFORMS = ('telegram', 'whatsapp', 'signal')
+
+
+def phone(i: int) -> str:
+    return f"+2135{i:08d}"
+
+
+def main(count: int = 1_000_000, lookups: int = 100_000):
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLitePreferenceStore(os.path.join(directory, 'preferences.db'))
+        print(f"⏱️ Préférences SQLite - {count:,} abonnés")
+
+        start = time.perf_counter()
+        store.import_bulk((phone(i), PLATFORMS[i % 3]) for i in range(count))
+        elapsed = time.perf_counter() - start
+        print(f"   Import massif      : {elapsed:6.2f} s ({count / elapsed:,.0f} lignes/s)")
+
+        # Moitié des numéros interrogés sans préférence enregistrée
+        ids = [phone(random.randrange(count * 2)) for _ in range(lookups)]
+        for label in ('à froid', 'cache LRU'):
+            start = time.perf_counter()
+            for user_id in ids:
+                store.get(user_id, 'telegram')
+            elapsed = time.perf_counter() - start
+            print(f"   get ({label:9}) : {elapsed / lookups * 1e6:6.2f} µs/recherche")
+
+        store.cache.clear()
+        start = time.perf_counter()
+        groups = store.group_by_platform(phone(i) for i in range(0, count * 2, 10))
+        elapsed = time.perf_counter() - start
+        total = sum(len(group) for group in groups.values())
+        print(f"   Regroupement diffusion : {total:,} destinataires en {elapsed:.2f} s "
+              f"({elapsed / total * 1e6:.2f} µs/destinataire)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark sessions de conversation : mémoire par million de sessions
+actives et coût de la détection de langue collante vs détection à chaque message
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENTS_DIR)
+
+from language_detector_algeria import get_detector
+from session_store_algeria import SessionStore
+
+CONVERSATIONS = (
+    "Bonjour, je voudrais calculer la TVA sur ma facture de 150000 DZD",
+    "كيفاش نحسب ضريبة الراتب تاعي 85000 دج؟",
+    "احسب ضريبة القيمة المضافة على 200000 دينار",
+    "Hello, how do I compute the IRG on a 120000 DZD salary?",
+    "azul, amek ara ḥesbeɣ TVA?",
+)
+
+
+def user_ids(count: int):
+    return [f"+2135{i:08d}" for i in range(count)]
+
+
+def measure(build, count: int) -> int:
+    """Octets alloués (tracemalloc) par la structure construite, identifiants exclus"""
+    users = user_ids(count)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build(users)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del store
+    return size
+
+
+def build_dicts(users):
+    # Approche naïve : un dict par utilisateur
+    return {user: {'language': 'fr', 'intent': 'tva', 'entities': {'amount': 150000.0},
+                   'last_seen': time.monotonic()} for user in users}
+
+
+def build_sessions(users):
+    store = SessionStore(maxsize=len(users))
+    for user in users:
+        store.remember(user, 'tva', {'amount': 150000.0})
+    return store
+
+
+def detection(count: int, messages_per_user: int = 8):
+    detector = get_detector()
+    store = SessionStore(maxsize=count)
+    rng = random.Random(7)
+    traffic = []
+    for user in user_ids(count):
+        text = CONVERSATIONS[rng.randrange(len(CONVERSATIONS))]
+        traffic.extend((user, text) for _ in range(messages_per_user))
+    rng.shuffle(traffic)
+
+    start = time.perf_counter()
+    for user, text in traffic:
+        detector.detect(text)
+    plain = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for user, text in traffic:
+        store.detect_language(user, text)
+    sticky = time.perf_counter() - start
+    return len(traffic), plain, sticky, store.stats()
+
+
+def main(count: int = 1_000_000):
+    print(f"⏱️ Sessions - {count:,} sessions actives")
+    scale = 1_000_000 / count
+    for label, build in (("Dict par utilisateur", build_dicts), ("SessionStore (array)", build_sessions)):
+        size = measure(build, count)
+        print(f"   {label:22}: {size * scale / 2**20:7.1f} Mo par million de sessions "
+              f"({size / count:5.1f} octets/session)")
+
+    messages, plain, sticky, stats = detection(max(1, count // 10))
+    print(f"   Détection à chaque message : {plain / messages * 1e6:6.2f} µs/message")
+    print(f"   Langue collante (session)  : {sticky / messages * 1e6:6.2f} µs/message "
+          f"({stats['skip_ratio']:.0%} des détections évitées)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
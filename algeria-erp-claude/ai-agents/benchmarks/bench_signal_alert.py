@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark alertes Signal : boucle séquentielle vs envoi par lots concurrents
+Envoi simulé avec latence (signal-cli / réseau)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Dossiers des modules agents (agent_registry_algeria.AGENT_PATHS)
+sys.path.insert(0, AGENTS_DIR)
+from agent_registry_algeria import add_agent_paths  # noqa: E402
+
+add_agent_paths()
+
+from signal_agent_algeria import SignalAgentAlgeria
+
+
+class SlowSignalAgent(SignalAgentAlgeria):
+    latency = 0.02
+
+    async def send_message(self, recipient, text):
+        await asyncio.sleep(self.latency)
+        return f"🔒 Signal → {recipient}: {text[:50]}..."
+
+
+async def sequential(agent, contacts):
+    start = time.perf_counter()
+    for contact, language in contacts:
+        await agent.send_message(contact, language)
+    return time.perf_counter() - start
+
+
+async def batched(agent, contacts, concurrency):
+    start = time.perf_counter()
+    delivered = 0
+    async for delivery in agent.stream_alert(contacts, 'deadline_fiscal', concurrency=concurrency):
+        delivered += delivery['success']
+    return time.perf_counter() - start, delivered
+
+
+def main(count: int = 30_000, concurrency: int = 256):
+    agent = SlowSignalAgent("+213555123456")
+    contacts = [(f"+2135{i:08d}", ('fr', 'ar', 'ar_dz', 'ber')[i % 4]) for i in range(count)]
+    print(f"⏱️ Alertes Signal - {count:,} comptables, latence {agent.latency * 1000:.0f} ms")
+
+    sample = contacts[:200]
+    sequential_time = asyncio.run(sequential(agent, sample)) / len(sample) * count
+    elapsed, delivered = asyncio.run(batched(agent, contacts, concurrency))
+    print(f"   Séquentiel (extrapolé) : {sequential_time:8.1f} s")
+    print(f"   Lots ({concurrency} en vol)  : {elapsed:8.1f} s  x{sequential_time / elapsed:.0f}, "
+          f"{delivered:,} livrées")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30_000)
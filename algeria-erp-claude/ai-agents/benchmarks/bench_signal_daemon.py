@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark Signal : un processus signal-cli par message vs démon JSON-RPC
+persistant, avec le faux signal-cli (démarrage JVM simulé)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'communication_agent'))
+
+from signal_daemon_algeria import SignalDaemon
+
+FAKE_CLI = [sys.executable, os.path.join(BENCH_DIR, 'fake_signal_cli.py')]
+
+
+async def process_per_message(count: int, startup: float) -> float:
+    """Ancien schéma : lancer signal-cli pour chaque envoi"""
+    start = time.perf_counter()
+    for i in range(count):
+        daemon = SignalDaemon(FAKE_CLI + ['-a', '+213555000000', 'jsonRpc',
+                                          '--startup', str(startup)])
+        await daemon.send(f"+2135{i:08d}", "📅 Rappel G50")
+        await daemon.close()
+    return time.perf_counter() - start
+
+
+async def persistent(count: int, startup: float, concurrency: int) -> float:
+    daemon = SignalDaemon(FAKE_CLI + ['-a', '+213555000000', 'jsonRpc',
+                                      '--startup', str(startup)])
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i):
+        async with semaphore:
+            await daemon.send(f"+2135{i:08d}", "📅 Rappel G50")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(count)))
+    elapsed = time.perf_counter() - start
+    await daemon.close()
+    return elapsed
+
+
+def main(count: int = 2000, startup: float = 0.5, concurrency: int = 64):
+    print(f"⏱️ Signal - {count:,} envois, démarrage JVM simulé {startup}s")
+    sample = 5
+    per_message = asyncio.run(process_per_message(sample, startup)) / sample
+    elapsed = asyncio.run(persistent(count, startup, concurrency))
+    print(f"   Processus par message : {per_message * 1000:8.1f} ms/envoi")
+    print(f"   Démon persistant      : {elapsed / count * 1000:8.2f} ms/envoi "
+          f"({count / elapsed:,.0f} envois/s, démarrage compris)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark réception Telegram : getUpdates par lots + aiguillage par table
+Mises à jour servies par le serveur d'API simulé, réponses envoyées via
+sendMessage (pool keep-alive) ; débit de bout en bout selon la taille des lots
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENTS_DIR)
+sys.path.insert(0, os.path.join(AGENTS_DIR, 'communication_agent'))
+
+from fiscal_agent_algeria import FiscalAiAgent
+from http_client_algeria import HttpClient
+from stub_api_server import StubApiServer
+from telegram_agent_algeria import TelegramAgentAlgeria
+from telegram_updates_algeria import TelegramUpdatePoller
+
+TEXTS = (
+    "/start",
+    "/tva 150000",
+    "/irg 85000 2",
+    "/help",
+    "Calculer la TVA sur 75000 DZD",
+    "كيفاش نحسب ضريبة الراتب 300000 دج مع 2 دراري؟",
+    "/inconnue",
+)
+
+
+async def run(count: int, limit: int):
+    async with StubApiServer() as server:
+        client = HttpClient(limit_per_host=64)
+        agent = TelegramAgentAlgeria("123:ABC", http_client=client, api_base=server.url,
+                                     fiscal_agent=FiscalAiAgent())
+        for i in range(count):
+            server.push_update(TEXTS[i % len(TEXTS)], chat_id=1000 + i % 500)
+        poller = TelegramUpdatePoller(agent, limit=limit, timeout=1)
+
+        start = time.perf_counter()
+        poller.start()
+        while len(server.messages) < count:
+            await asyncio.sleep(0.002)
+        elapsed = time.perf_counter() - start
+        await poller.stop()
+        await client.close()
+        return elapsed, poller.polls, poller.dispatcher.stats
+
+
+def main(count: int = 10_000):
+    print(f"⏱️ Réception Telegram - {count:,} mises à jour, réponses via sendMessage")
+    for limit in (1, 10, 100):
+        elapsed, polls, stats = asyncio.run(run(count, limit))
+        print(f"   Lots de {limit:3}: {count / elapsed:8,.0f} mises à jour/s, "
+              f"{polls:,} getUpdates, {stats['fiscal']:,} requêtes fiscales, "
+              f"{stats['commands']:,} commandes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
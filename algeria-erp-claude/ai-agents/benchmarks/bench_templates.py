@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark rendu des réponses : dicts reconstruits à chaque appel vs registre partagé
+Mesure la latence et les allocations (tracemalloc) par message
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from templates_algeria import REGISTRY, TEMPLATES
+
+TVA_RESULT = {
+    'type': 'tva_calculation', 'amount_ht': 100000.0, 'tva_rate': 19.0,
+    'tva_amount': 19000.0, 'amount_ttc': 119000.0, 'currency': 'DZD', 'reason': 'Taux normal'
+}
+TEXT = "Bonjour, comment calculer la TVA sur 100000 DZD ?"
+LANGUAGES = ('ar', 'ar_dz', 'fr', 'en', 'ber')
+
+
+def legacy_message(result, text, language):
+    """Ancien schéma : dict de modèles et dict de f-strings recréés à chaque message"""
+    templates = dict(TEMPLATES['tva_calculation'])
+    response = templates.get(language, templates['fr']).format(**result)
+    responses = {
+        'ar': f"تم استلام رسالتك باللغة العربية: {text[:50]}...",
+        'ar_dz': f"وصلت الرسالة بالدارجة الجزائرية: {text[:50]}...",
+        'fr': f"Message reçu en français: {text[:50]}...",
+        'en': f"Message received in English: {text[:50]}...",
+        'ber': f"Yewweḍ-d izen s teqbaylit: {text[:50]}..."
+    }
+    return response, responses.get(language, responses['fr'])
+
+
+def registry_message(result, text, language):
+    """Registre partagé : une recherche + un format_map par modèle"""
+    return (
+        REGISTRY.render('tva_calculation', language, result),
+        REGISTRY.render('message_received', language, {'excerpt': text[:50]})
+    )
+
+
+def measure(render, count: int):
+    """(µs par message, pic d'octets alloués pendant un rendu)"""
+    start = time.perf_counter()
+    for i in range(count):
+        render(TVA_RESULT, TEXT, LANGUAGES[i % 5])
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i in range(min(count, 10_000)):
+        render(TVA_RESULT, TEXT, LANGUAGES[i % 5])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / count * 1e6, peak - before
+
+
+def main(count: int = 200_000):
+    print(f"⏱️ Rendu des réponses - {count:,} messages")
+    results = {}
+    for label, render in (('Dicts par appel', legacy_message), ('Registre', registry_message)):
+        latency, peak = measure(render, count)
+        results[label] = latency
+        print(f"   {label:16}: {latency:6.2f} µs/message, pic mémoire {peak:,} octets")
+    gain = results['Dicts par appel'] / results['Registre']
+    print(f"   Gain : x{gain:.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
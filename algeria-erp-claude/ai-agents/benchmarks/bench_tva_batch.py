@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark TVA par lots vs calcul unitaire
+Vérifie l'égalité au centime puis compare les temps d'exécution
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fiscal_agent_algeria import FiscalAiAgent
+from fiscal_batch_algeria import to_centimes
+
+try:
+    import numpy as np
+except ImportError:  # NumPy absent : seul le chemin pur Python est mesuré
+    np = None
+
+
+def build_ledger(count: int, seed: int = 2025):
+    """Registre fictif déterministe : montants HT, taux normal/exonéré, export, zone franche"""
+    rng = random.Random(seed)
+    amounts = [rng.randint(-500_000, 50_000_000) / 100 for _ in range(count)]
+    # Le calcul unitaire ne connaît que le taux normal ou l'exonération
+    codes = [0] * count
+    exports = [rng.random() < 0.05 for _ in range(count)]
+    zones = [rng.random() < 0.02 for _ in range(count)]
+    return amounts, codes, exports, zones
+
+
+async def scalar_loop(agent: FiscalAiAgent, amounts, exports, zones):
+    """Boucle actuelle : un appel calculate_tva_intelligent par ligne"""
+    return [
+        await agent.calculate_tva_intelligent(
+            {'amount': amount, 'is_export': export, 'is_zone_franche': zone})
+        for amount, export, zone in zip(amounts, exports, zones)
+    ]
+
+
+def check_parity(scalar_results, batch):
+    """Compare chaque ligne et les sous-totaux au centime près"""
+    totals = {}
+    for i, result in enumerate(scalar_results):
+        for field in ('amount_ht', 'tva_amount', 'amount_ttc'):
+            expected = to_centimes(result[field])
+            if int(batch[field][i]) != expected:
+                raise AssertionError(
+                    f"Écart ligne {i} ({field}): {int(batch[field][i])} != {expected}"
+                )
+        totals[result['tva_rate']] = totals.get(result['tva_rate'], 0) + to_centimes(result['tva_amount'])
+
+    for subtotal in batch['subtotals'].values():
+        if subtotal['count'] and subtotal['tva_amount'] != totals.get(subtotal['rate'], 0):
+            raise AssertionError(f"Écart sous-total au taux {subtotal['rate']}%")
+
+
+def main(count: int = 100_000):
+    agent = FiscalAiAgent()
+    amounts, codes, exports, zones = build_ledger(count)
+
+    start = time.perf_counter()
+    scalar_results = asyncio.run(scalar_loop(agent, amounts, exports, zones))
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = agent.calculate_tva_batch(amounts, codes, exports, zones)
+    python_time = time.perf_counter() - start
+    check_parity(scalar_results, batch)
+
+    print(f"⏱️ TVA - {count:,} lignes de factures")
+    print(f"   Boucle unitaire : {scalar_time:8.3f} s")
+    print(f"   Lot pur Python  : {python_time:8.3f} s  (x{scalar_time / python_time:.1f})")
+
+    if np is not None:
+        columns = [np.asarray(column) for column in (amounts, codes, exports, zones)]
+        start = time.perf_counter()
+        batch = agent.calculate_tva_batch(*columns)
+        numpy_time = time.perf_counter() - start
+        check_parity(scalar_results, batch)
+        print(f"   Lot NumPy       : {numpy_time:8.3f} s  (x{scalar_time / numpy_time:.1f})")
+
+    print("✅ Résultats identiques au centime")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Benchmark réception des webhooks WhatsApp : latence d'acquittement en rafale
+Rafales de tailles croissantes (10 % de renvois Meta), traitement par micro-lots
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENTS_DIR)
+sys.path.insert(0, os.path.join(AGENTS_DIR, 'communication_agent'))
+
+from fiscal_agent_algeria import FiscalAiAgent
+from http_client_algeria import HttpClient, NO_RETRY
+from whatsapp_agent_algeria import WhatsAppAgent, WhatsAppConfig
+from whatsapp_webhook_algeria import WhatsAppWebhookReceiver
+
+TEXTS = (
+    "Calculer TVA 19% sur 150000 DA",
+    "IRG salaire 85000 DA",
+    "Bonjour, je veux des informations",
+    "مرحبا، أريد معلومات",
+    "Salam khouya, kifach ndir G50?",
+)
+
+
+def notification(i: int) -> dict:
+    number = f"2135{i % 50_000:08d}"
+    return {
+        'object': 'whatsapp_business_account',
+        'entry': [{'id': 'WABA', 'changes': [{'field': 'messages', 'value': {
+            'messaging_product': 'whatsapp',
+            'contacts': [{'wa_id': number, 'profile': {'name': 'Client'}}],
+            'messages': [{'id': f"wamid.{i}", 'from': number, 'timestamp': '1700000000',
+                          'type': 'text', 'text': {'body': TEXTS[i % len(TEXTS)]}}]
+        }}]}]
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def burst(count: int, connections: int):
+    agent = WhatsAppAgent(WhatsAppConfig("TOKEN", "1234567890", "VERIFY", ""))
+    replies = []
+    receiver = WhatsAppWebhookReceiver(agent, FiscalAiAgent(), queue_size=count * 2,
+                                       on_reply=lambda message, reply: replies.append(reply))
+    async with receiver:
+        client = HttpClient(limit_per_host=connections, retry=NO_RETRY)
+        url = f"http://127.0.0.1:{receiver.port}/webhook"
+        # Meta renvoie une partie des notifications : 10 % de doublons
+        payloads = [notification(i - 1 if i and i % 10 == 0 else i) for i in range(count)]
+        latencies = []
+        semaphore = asyncio.Semaphore(connections)
+
+        async def post(payload):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(url, json=payload)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(post(payload) for payload in payloads))
+        acked = time.perf_counter() - start
+        await receiver.drain()
+        processed = time.perf_counter() - start
+        await client.close()
+    return acked, processed, latencies, receiver.stats, len(replies)
+
+
+def main(count: int = 5000, connections: int = 64):
+    print(f"⏱️ Webhook WhatsApp - rafales jusqu'à {count:,} notifications, "
+          f"{connections} connexions keep-alive")
+    for size in sorted({max(1, count // 10), max(1, count // 2), count}):
+        acked, processed, latencies, stats, replies = asyncio.run(burst(size, connections))
+        print(f"   Rafale {size:7,}: {size / acked:8,.0f} acquittements/s, "
+              f"latence p50 {percentile(latencies, 0.5) * 1000:5.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:5.2f} ms | "
+              f"traité en {processed:.2f}s ({stats['batches']:,} lots, "
+              f"{stats['duplicates']:,} doublons, {replies:,} réponses)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+📚 Corpus multilingue fixe pour les benchmarks (ar / ar_dz / fr / en / ber)
+Chaque entrée : (message, langue attendue)
+"""
+
+MESSAGES = [
+    # Arabe standard
+    ("احسب ضريبة القيمة المضافة على 100000 دينار", 'ar'),
+    ("حساب ضريبة الدخل على راتب 200000 دينار", 'ar'),
+    ("ما هو معدل الضريبة على التصدير؟", 'ar'),
+    ("مرحبا، أريد حساب الضريبة على فاتورة 45000 دج", 'ar'),
+    ("السلام عليكم، متى موعد الإقرار الضريبي؟", 'ar'),
+    # Darija algérienne
+    ("كيفاش نحسب الضريبة على راتب 200000 دج؟", 'ar_dz'),
+    ("كيفاش نحسب ضريبة الراتب 300000 دج مع 2 دراري؟", 'ar_dz'),
+    ("واش هي الضريبة تاع البيع على 50000 دج", 'ar_dz'),
+    ("ابعتلي الحساب تاع الضريبة بصح", 'ar_dz'),
+    ("كاش واحد يعاوني في الضريبة تاع الخدمة", 'ar_dz'),
+    # Français
+    ("Calculer la TVA sur 150000 DZD", 'fr'),
+    ("IRG pour salaire 300000 DZD avec 2 enfants", 'fr'),
+    ("TVA export 200000 DZD", 'fr'),
+    ("Bonjour, comment calculer la TVA en zone franche ?", 'fr'),
+    ("Quel est le montant de l'impôt sur un salaire de 85000 DA ?", 'fr'),
+    # English
+    ("Hello, how to calculate tax?", 'en'),
+    ("What is the VAT on 100000 DZD?", 'en'),
+    ("Please help me with my salary income tax", 'en'),
+    ("When is the tax declaration deadline?", 'en'),
+    ("Calculate VAT for export invoice 250000 DZD", 'en'),
+    # Amazigh (latin et Tifinagh)
+    ("Asiḍen n tigawin deg 100000 idrimen", 'ber'),
+    ("Tigawin n udem azref 200000 s sin n mmi", 'ber'),
+    ("Amek ara asiḍneɣ tigawin deg tamurt n Dzayer?", 'ber'),
+    ("azul, tanemmirt ɣef tallalt", 'ber'),
+    ("ⴰⵣⵓⵍ ⵜⵉⴳⴰⵡⵉⵏ ⵏ 50000", 'ber'),
+]
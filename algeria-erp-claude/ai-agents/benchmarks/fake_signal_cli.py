@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 Faux `signal-cli jsonRpc` pour les tests et benchmarks
+Lit une requête JSON-RPC par ligne sur stdin, répond sur stdout dans le
+désordre (latence aléatoire), peut planter après N requêtes.
+
+Usage:
+    python fake_signal_cli.py [-a COMPTE] jsonRpc [--latency 0.01] [--crash-after N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-a', dest='account', default='+213555000000')
+    parser.add_argument('--config', default=None)
+    parser.add_argument('mode', nargs='?', default='jsonRpc')
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--crash-after', type=int, default=0,
+                        help="quitte brutalement après N requêtes (0 = jamais)")
+    parser.add_argument('--startup', type=float, default=0.0, help="délai de démarrage (JVM)")
+    return parser.parse_args(argv)
+
+
+def respond(message):
+    sys.stdout.write(json.dumps(message, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
+async def handle(request, latency):
+    # Latence variable : les réponses sortent dans un ordre différent des requêtes
+    await asyncio.sleep(random.uniform(0, 2 * latency))
+    method = request.get('method')
+    params = request.get('params', {})
+    if method == 'send':
+        recipients = params.get('recipient', [])
+        if any(not str(number).startswith('+') for number in recipients):
+            respond({'jsonrpc': '2.0', 'id': request['id'],
+                     'error': {'code': -32602, 'message': 'Invalid recipient'}})
+            return
+        respond({'jsonrpc': '2.0', 'id': request['id'], 'result': {
+            'timestamp': int(time.time() * 1000),
+            'results': [{'recipientAddress': {'number': number}, 'type': 'SUCCESS'}
+                        for number in recipients]
+        }})
+    elif method == 'version':
+        respond({'jsonrpc': '2.0', 'id': request['id'], 'result': {'version': '0.13.0-fake'}})
+    else:
+        respond({'jsonrpc': '2.0', 'id': request.get('id'),
+                 'error': {'code': -32601, 'message': f'Method not implemented: {method}'}})
+
+
+async def main(argv):
+    args = parse_args(argv)
+    await asyncio.sleep(args.startup)
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    # Notification spontanée, comme un message entrant
+    respond({'jsonrpc': '2.0', 'method': 'receive', 'params': {
+        'envelope': {'source': '+213555999999', 'dataMessage': {'message': 'azul'}}}})
+
+    tasks = set()
+    handled = 0
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        handled += 1
+        if args.crash_after and handled > args.crash_after:
+            sys.stdout.flush()
+            os._exit(1)
+        task = asyncio.ensure_future(handle(json.loads(line), args.latency))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
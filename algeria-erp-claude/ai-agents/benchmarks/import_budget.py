@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Budget d'import des modules agents (python -X importtime)
+Chaque module est importé dans un interpréteur neuf : temps cumulé comparé
+au budget, import sans effet de bord (rien sur stdout, aucun handler
+ajouté au logger racine, sys.path inchangé, pas de dépendance lourde
+chargée d'office : numpy, pstats, httpx même s'ils sont installés)
+
+Usage:
+    python benchmarks/import_budget.py           # vérifie les budgets (CI)
+    python benchmarks/import_budget.py --save    # budgets = mesure x marge
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.dirname(BENCH_DIR)
+BUDGET_PATH = os.path.join(BENCH_DIR, 'import_budgets.json')
+# Dossiers des modules (agent_registry_algeria.AGENT_PATHS), fournis par PYTHONPATH
+MODULE_DIRS = [AGENTS_DIR, os.path.join(AGENTS_DIR, 'communication_agent'),
+               os.path.join(os.path.dirname(AGENTS_DIR), 'e-learning', 'chat-ai'),
+               os.path.join(os.path.dirname(AGENTS_DIR), 'ocr-intelligence')]
+DEFAULT_MARGIN = 2.0  # budget enregistré = 2 x la mesure (machines de CI plus lentes)
+
+# Exécuté après l'import : handlers du logger racine, sys.path modifié et modules
+# interdits, sur stderr (_path : copie de sys.path prise avant l'import)
+PROBE = ("import logging, sys; "
+         "sys.stderr.write('probe:%d:%d:%s\\n' % (len(logging.getLogger().handlers), "
+         "sys.path != _path, ','.join(m for m in {forbidden!r} if m in sys.modules)))")
+
+
+def measure(module: str, forbidden: List[str]) -> Dict:
+    """Import de `module` dans un sous-processus -> temps cumulé (µs) et effets de bord"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(MODULE_DIRS))
+    code = (f"import sys; _path = list(sys.path); import {module}; "
+            + PROBE.format(forbidden=tuple(forbidden)))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                             capture_output=True, text=True, env=env, cwd=AGENTS_DIR)
+    if process.returncode:
+        raise RuntimeError(f"import {module} a échoué:\n{process.stderr}")
+
+    cumulative = None
+    handlers, path_changed, loaded = 0, False, []
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:'):
+            # "import time: self | cumulé | nom" ; module de premier niveau = un seul espace
+            _, cumulative_us, name = line.split('|')
+            if name.rstrip() == ' ' + module:
+                cumulative = int(cumulative_us)
+        elif line.startswith('probe:'):
+            _, count, changed, modules = line.split(':', 3)
+            handlers, path_changed = int(count), changed == '1'
+            loaded = [name for name in modules.split(',') if name]
+    return {'us': cumulative or 0, 'stdout': process.stdout, 'handlers': handlers,
+            'sys_path': path_changed, 'forbidden': loaded}
+
+
+def best_of(module: str, forbidden: List[str], repeat: int) -> Dict:
+    """Meilleure de `repeat` mesures (le bruit du démarrage ne fait qu'ajouter)"""
+    runs = [measure(module, forbidden) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run['us'])
+    best['stdout'] = next((run['stdout'] for run in runs if run['stdout']), '')
+    return best
+
+
+def load_budgets(path: str = BUDGET_PATH) -> Dict:
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def check(results: Dict[str, Dict], budgets: Dict) -> List[str]:
+    """Liste des violations (vide si tout est dans le budget)"""
+    violations = []
+    for module, result in results.items():
+        budget = budgets['budgets_us'].get(module)
+        if budget and result['us'] > budget:
+            violations.append(f"{module}: {result['us'] / 1000:.1f} ms > budget "
+                              f"{budget / 1000:.1f} ms")
+        if result['stdout']:
+            violations.append(f"{module}: écrit sur stdout à l'import "
+                              f"({result['stdout'].strip()[:60]!r})")
+        if result['handlers']:
+            violations.append(f"{module}: configure le logger racine à l'import")
+        if result['sys_path']:
+            violations.append(f"{module}: modifie sys.path à l'import")
+        if result['forbidden']:
+            violations.append(f"{module}: importe {', '.join(result['forbidden'])} d'office")
+    return violations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Budget d'import des agents Algeria")
+    parser.add_argument('--save', action='store_true', help="enregistrer les budgets")
+    parser.add_argument('--margin', type=float, default=DEFAULT_MARGIN)
+    parser.add_argument('--repeat', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    budgets = load_budgets()
+    repeat = args.repeat or budgets.get('repeat', 5)
+    forbidden = budgets.get('forbidden', [])
+    results = {module: best_of(module, forbidden, repeat) for module in budgets['budgets_us']}
+
+    print("⏱️ BUDGET D'IMPORT (python -X importtime, meilleur de %d)" % repeat)
+    print("=" * 60)
+    for module, result in results.items():
+        budget = budgets['budgets_us'][module]
+        print(f"{module:30} {result['us'] / 1000:8.1f} ms   budget {budget / 1000:8.1f} ms")
+
+    if args.save:
+        budgets['budgets_us'] = {module: int(result['us'] * args.margin)
+                                 for module, result in results.items()}
+        with open(BUDGET_PATH, 'w', encoding='utf-8') as handle:
+            json.dump(budgets, handle, indent=2, ensure_ascii=False)
+            handle.write('\n')
+        print(f"💾 Budgets enregistrés dans {BUDGET_PATH}")
+        return 0
+
+    violations = check(results, budgets)
+    for line in violations:
+        print(f"❌ {line}")
+    if not violations:
+        print("✅ Imports dans le budget, sans effet de bord")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 Serveur local imitant les API des plateformes (tests et benchmarks)
+- WhatsApp Cloud (Graph) : POST /{version}/{phone_number_id}/messages
+- Telegram Bot API       : POST|GET /bot{token}/{méthode} (getUpdates en long-polling)
+HTTP/1.1 keep-alive, latence et pannes (503) configurables, compteurs
+"""
+
+import asyncio
+import json
+import sys
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+
+class StubApiServer:
+    """🧪 Serveur HTTP/1.1 minimal (asyncio) : `async with StubApiServer() as server`"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 fail_every: int = 0, retry_after: Optional[int] = None,
+                 fail_status: int = 503):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.fail_every = fail_every
+        self.retry_after = retry_after
+        self.fail_status = fail_status
+        self.connections = 0
+        self.requests = 0
+        self.messages: List[Dict] = []
+        # Telegram : mises à jour servies par getUpdates (voir push_update)
+        self.updates = deque()
+        self._update_id = 0
+        self._update_pushed: Optional[asyncio.Event] = None
+        self._server = None
+        self._handlers = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        # Fermer les connexions clientes restantes : les gestionnaires se terminent seuls
+        if self._update_pushed is not None:
+            self._update_pushed.set()
+        for writer in self._handlers.values():
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def push_update(self, text: str, chat_id: int = 1) -> Dict:
+        """Ajoute un message entrant Telegram (renvoyé par getUpdates)"""
+        self._update_id += 1
+        update = {
+            'update_id': self._update_id,
+            'message': {'message_id': self._update_id, 'chat': {'id': chat_id, 'type': 'private'},
+                        'from': {'id': chat_id}, 'text': text}
+        }
+        self.updates.append(update)
+        if self._update_pushed is not None:
+            self._update_pushed.set()
+        return update
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload, extra = await self._route(method, target, body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                head = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}",
+                        "Content-Type: application/json",
+                        f"Content-Length: {len(data)}"]
+                head.extend(f"{name}: {value}" for name, value in extra)
+                close = headers.get('connection', '').lower() == 'close'
+                if close:
+                    head.append("Connection: close")
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._handlers.pop(task, None)
+            writer.close()
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[int, Dict, List]:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_every and self.requests % self.fail_every == 0:
+            extra = [('Retry-After', self.retry_after)] if self.retry_after is not None else []
+            return self.fail_status, {'error': {'message': 'Service temporarily unavailable'}}, extra
+
+        path, _, query = target.partition('?')
+        payload = json.loads(body) if body else {}
+        segments = path.strip('/').split('/')
+
+        if segments[0].startswith('bot') and len(segments) == 2:
+            return await self._telegram(segments[1], payload, query)
+        if len(segments) == 3 and segments[2] == 'messages' and method == 'POST':
+            self.messages.append({'platform': 'whatsapp', **payload})
+            return 200, {
+                'messaging_product': 'whatsapp',
+                'contacts': [{'input': payload.get('to'), 'wa_id': payload.get('to')}],
+                'messages': [{'id': f"wamid.stub{len(self.messages)}"}]
+            }, []
+        return 404, {'error': {'message': f'Unknown endpoint {path}'}}, []
+
+    async def _telegram(self, api_method: str, payload: Dict, query: str):
+        if api_method == 'sendMessage':
+            self.messages.append({'platform': 'telegram', **payload})
+            return 200, {'ok': True, 'result': {
+                'message_id': len(self.messages), 'chat': {'id': payload.get('chat_id')},
+                'text': payload.get('text')}}, []
+        if api_method == 'getUpdates':
+            offset = int(payload.get('offset', 0))
+            limit = int(payload.get('limit', 100))
+            # Confirmer un offset supprime les mises à jour antérieures (comme l'API réelle)
+            while self.updates and self.updates[0]['update_id'] < offset:
+                self.updates.popleft()
+            timeout = float(payload.get('timeout', 0))
+            if not self.updates and timeout > 0:
+                # Long-polling : réponse dès qu'une mise à jour arrive, liste vide après `timeout`
+                self._update_pushed = self._update_pushed or asyncio.Event()
+                self._update_pushed.clear()
+                try:
+                    await asyncio.wait_for(self._update_pushed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return 200, {'ok': True, 'result': list(islice(self.updates, limit))}, []
+        if api_method == 'setWebhook':
+            return 200, {'ok': True, 'result': True}, []
+        if api_method == 'getMe':
+            return 200, {'ok': True, 'result': {'id': 1, 'is_bot': True, 'username': 'erp_dz_bot'}}, []
+        return 404, {'ok': False, 'description': 'Not Found'}, []
+
+
+async def serve(port: int):
+    async with StubApiServer(port=port) as server:
+        print(f"🧪 Serveur d'API simulé sur {server.url}")
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8081))
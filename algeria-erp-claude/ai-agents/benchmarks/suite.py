@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Suite de benchmarks Agents IA Algeria (style asv)
+Corpus fixes, références enregistrées, échec si régression au-delà du seuil
+
+Usage:
+    python benchmarks/suite.py              # compare aux références
+    python benchmarks/suite.py --save       # enregistre les références
+    python benchmarks/suite.py -k detect    # filtre par nom
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, AGENTS_DIR)
+sys.path.insert(0, os.path.join(AGENTS_DIR, 'communication_agent'))
+
+from corpus_dz import MESSAGES
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baselines.json')
+DEFAULT_THRESHOLD = 0.25  # +25 % par rapport à la référence = régression
+
+# nom -> fabrique retournant (fonction à chronométrer, opérations par appel)
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Enregistre une fabrique de benchmark"""
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def _fiscal_agent():
+    from fiscal_agent_algeria import FiscalAiAgent
+    # Cache désactivé : on mesure le pipeline, pas les hits
+    return FiscalAiAgent(cache_size=0)
+
+
+def _run_async(loop, coroutine_factory, items):
+    """Exécute une coroutine par élément dans une boucle déjà créée"""
+    async def run_all():
+        for item in items:
+            await coroutine_factory(item)
+    return lambda: loop.run_until_complete(run_all())
+
+
+@benchmark('detect_language')
+def bench_detect_language(loop):
+    agent = _fiscal_agent()
+    texts = [text for text, _ in MESSAGES]
+    return _run_async(loop, agent.detect_language, texts), len(texts)
+
+
+@benchmark('extract_entities')
+def bench_extract_entities(loop):
+    agent = _fiscal_agent()
+    return _run_async(loop, lambda item: agent.extract_entities(*item), MESSAGES), len(MESSAGES)
+
+
+@benchmark('determine_calculation_type')
+def bench_determine_calculation_type(loop):
+    agent = _fiscal_agent()
+    return (_run_async(loop, lambda item: agent.determine_calculation_type(*item), MESSAGES),
+            len(MESSAGES))
+
+
+@benchmark('calculate_tva')
+def bench_calculate_tva(loop):
+    agent = _fiscal_agent()
+    entities = [{'amount': 1000.0 * i + 0.55, 'is_export': i % 7 == 0} for i in range(200)]
+    return _run_async(loop, agent.calculate_tva_intelligent, entities), len(entities)
+
+
+@benchmark('calculate_irg')
+def bench_calculate_irg(loop):
+    agent = _fiscal_agent()
+    entities = [{'amount': 15000.0 * i + 0.25, 'children': i % 5} for i in range(200)]
+    return _run_async(loop, agent.calculate_irg_intelligent, entities), len(entities)
+
+
+@benchmark('format_response')
+def bench_format_response(loop):
+    agent = _fiscal_agent()
+    results = []
+    for language in ('ar', 'ar_dz', 'fr', 'ber'):
+        results.append((loop.run_until_complete(
+            agent.calculate_tva_intelligent({'amount': 100000.0})), language))
+        results.append((loop.run_until_complete(
+            agent.calculate_irg_intelligent({'amount': 300000.0, 'children': 2})), language))
+    return _run_async(loop, lambda item: agent.format_response(*item), results), len(results)
+
+
+@benchmark('process_fiscal_query')
+def bench_process_fiscal_query(loop):
+    agent = _fiscal_agent()
+    texts = [text for text, _ in MESSAGES]
+    return _run_async(loop, agent.process_fiscal_query, texts), len(texts)
+
+
+@benchmark('broadcast_notification')
+def bench_broadcast_notification(loop):
+    from multi_platform_orchestrator import MultiPlatformOrchestrator
+
+    class MockAgent:
+        async def send_message(self, recipient, text):
+            return f"📤 {recipient}: {text[:50]}..."
+
+    # Quotas désactivés : on mesure le moteur de diffusion, pas les API
+    orchestrator = MultiPlatformOrchestrator(
+        rate_limits=dict.fromkeys(('telegram', 'signal', 'whatsapp')))
+    for platform_name in ('telegram', 'signal', 'whatsapp'):
+        orchestrator.register_platform(platform_name, MockAgent())
+    messages = [text for text, _ in MESSAGES]
+    return _run_async(loop, orchestrator.broadcast_notification, messages), len(messages)
+
+
+def measure(run: Callable, ops: int, repeat: int = 5, min_time: float = 0.05) -> float:
+    """Meilleur temps par opération (µs), boucle calibrée pour durer min_time"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, time.perf_counter() - start)
+    return best / (loops * ops) * 1e6
+
+
+def run_suite(names: Optional[List[str]] = None, repeat: int = 5) -> Dict[str, float]:
+    """Exécute les benchmarks sélectionnés -> {nom: µs par opération}"""
+    loop = asyncio.new_event_loop()
+    try:
+        results = {}
+        for name, factory in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            run, ops = factory(loop)
+            results[name] = measure(run, ops, repeat=repeat)
+        return results
+    finally:
+        loop.close()
+
+
+def load_baselines(path: str = BASELINE_PATH) -> Dict:
+    if not os.path.exists(path):
+        return {'threshold': DEFAULT_THRESHOLD, 'results': {}}
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def save_baselines(results: Dict[str, float], path: str = BASELINE_PATH,
+                   threshold: float = DEFAULT_THRESHOLD):
+    data = {
+        'threshold': threshold,
+        'machine': f"{platform.python_implementation()} {platform.python_version()} "
+                   f"{platform.machine()}",
+        'unit': 'us_per_op',
+        'results': {name: round(value, 3) for name, value in sorted(results.items())}
+    }
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(data, handle, indent=2, ensure_ascii=False)
+        handle.write('\n')
+
+
+def compare(results: Dict[str, float], baselines: Dict,
+            threshold: Optional[float] = None) -> List[str]:
+    """Liste des régressions (vide si tout est dans le seuil)"""
+    threshold = baselines.get('threshold', DEFAULT_THRESHOLD) if threshold is None else threshold
+    regressions = []
+    for name, value in results.items():
+        reference = baselines['results'].get(name)
+        if reference and value > reference * (1 + threshold):
+            regressions.append(
+                f"{name}: {value:.2f} µs/op > {reference:.2f} µs/op (+{value / reference - 1:.0%})"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks Agents IA Algeria")
+    parser.add_argument('--save', action='store_true', help="enregistrer les références")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="seuil de régression (0.25 = +25 %%)")
+    parser.add_argument('-k', dest='filter', default=None, help="sous-chaîne du nom")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    results = run_suite(names, repeat=args.repeat)
+    baselines = load_baselines()
+
+    print("⏱️ BENCHMARKS AGENTS IA ALGERIA")
+    print("=" * 60)
+    for name, value in results.items():
+        reference = baselines['results'].get(name)
+        delta = f"{value / reference - 1:+.0%}" if reference else "n/a"
+        print(f"{name:28} {value:10.2f} µs/op   réf. {reference or 0:10.2f}   {delta}")
+
+    if args.save:
+        merged = dict(baselines['results'], **results)
+        save_baselines(merged, threshold=baselines.get('threshold', DEFAULT_THRESHOLD))
+        print(f"💾 Références enregistrées dans {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, baselines, args.threshold)
+    for line in regressions:
+        print(f"❌ Régression {line}")
+    if not regressions:
+        print("✅ Aucune régression")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
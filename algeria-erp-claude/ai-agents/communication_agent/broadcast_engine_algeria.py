@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📢 Moteur de diffusion multi-plateformes Algeria
+Envoi concurrent vers toutes les plateformes, débit limité par API
+(seau à jetons), progression incrémentale et statuts compacts par destinataire
+"""
+
+import asyncio
+import time
+from typing import AsyncIterable, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from rate_limit_algeria import platform_buckets
+
+PENDING, SENT, FAILED = 0, 1, 2
+
+Recipients = Union[Iterable[str], AsyncIterable[str]]
+
+
+class BroadcastReport:
+    """📊 Résultat d'une diffusion : un octet de statut par destinataire
+
+    Les chaînes retournées par les agents ne sont pas conservées (elles sont
+    transmises à `on_result` puis libérées) ; seules les erreurs sont gardées,
+    dans la limite de `max_failures` par plateforme.
+    """
+
+    __slots__ = ('statuses', 'sent', 'failed', 'failures', 'unavailable',
+                 'max_failures', 'started', 'finished')
+
+    def __init__(self, platforms: Iterable[str], max_failures: int = 1000):
+        platforms = list(platforms)
+        self.statuses = {platform: bytearray() for platform in platforms}
+        self.sent = dict.fromkeys(platforms, 0)
+        self.failed = dict.fromkeys(platforms, 0)
+        self.failures: Dict[str, Dict[str, str]] = {platform: {} for platform in platforms}
+        self.unavailable = []
+        self.max_failures = max_failures
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def _record(self, platform: str, index: int, recipient: str, ok: bool, error: Optional[str]):
+        statuses = self.statuses[platform]
+        if index >= len(statuses):
+            statuses.extend(bytes(index + 1 - len(statuses)))
+        if ok:
+            statuses[index] = SENT
+            self.sent[platform] += 1
+        else:
+            statuses[index] = FAILED
+            self.failed[platform] += 1
+            failures = self.failures[platform]
+            if len(failures) < self.max_failures:
+                failures[recipient] = error
+
+    def status(self, platform: str, index: int) -> Optional[bool]:
+        """True envoyé, False échec, None pas (encore) traité"""
+        statuses = self.statuses.get(platform, b'')
+        if index >= len(statuses) or statuses[index] == PENDING:
+            return None
+        return statuses[index] == SENT
+
+    def iter_results(self, platform: str, recipients: Iterable[str]) -> Iterator[Tuple[str, Optional[bool]]]:
+        """(destinataire, statut) en rejouant la liste d'origine, sans la stocker"""
+        for index, recipient in enumerate(recipients):
+            yield recipient, self.status(platform, index)
+
+    @property
+    def total_sent(self) -> int:
+        return sum(self.sent.values())
+
+    @property
+    def total_failed(self) -> int:
+        return sum(self.failed.values())
+
+    def progress(self) -> Dict:
+        """📈 Instantané de progression (appelé périodiquement pendant l'envoi)"""
+        elapsed = (self.finished or time.monotonic()) - self.started
+        done = self.total_sent + self.total_failed
+        return {
+            'sent': self.total_sent,
+            'failed': self.total_failed,
+            'elapsed': elapsed,
+            'rate_per_second': done / elapsed if elapsed > 0 else 0.0,
+            'done': self.finished is not None,
+            'platforms': {
+                platform: {'sent': self.sent[platform], 'failed': self.failed[platform]}
+                for platform in self.statuses
+            }
+        }
+
+    def to_dict(self) -> Dict:
+        summary = self.progress()
+        summary['failures'] = {platform: dict(errors) for platform, errors in self.failures.items()}
+        summary['unavailable'] = list(self.unavailable)
+        return summary
+
+
+def _recipient_source(recipients: Recipients):
+    """Fonction async -> (index, destinataire) ou None en fin de liste (partagée entre workers)"""
+    counter = iter(range(1 << 62))
+
+    if hasattr(recipients, '__aiter__'):
+        iterator = recipients.__aiter__()
+        lock = asyncio.Lock()
+
+        async def next_async():
+            async with lock:
+                try:
+                    recipient = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return None
+                return next(counter), recipient
+        return next_async
+
+    iterator = iter(recipients)
+
+    async def next_sync():
+        # Pas de point d'attente : next() est atomique dans la boucle asyncio
+        for recipient in iterator:
+            return next(counter), recipient
+        return None
+    return next_sync
+
+
+class BroadcastEngine:
+    """📢 Diffusion concurrente, débit limité par plateforme
+
+    - `concurrency` : envois simultanés au total, toutes plateformes confondues
+    - `rate_limits` : {plateforme: (messages/s, rafale) ou None}, fusionné avec
+      PLATFORM_RATE_LIMITS ; les seaux persistent d'une diffusion à l'autre
+    - `progress_every` : `on_progress` est appelé tous les N envois terminés
+    """
+
+    def __init__(self, rate_limits: Optional[Dict] = None, concurrency: int = 64,
+                 progress_every: int = 500, max_failures: int = 1000):
+        if concurrency < 1:
+            raise ValueError("concurrency doit être >= 1")
+        self.buckets = platform_buckets(rate_limits)
+        self.concurrency = concurrency
+        self.progress_every = progress_every
+        self.max_failures = max_failures
+
+    async def broadcast(self, agents: Dict[str, object], message: str,
+                        recipients: Dict[str, Recipients],
+                        on_progress: Optional[Callable[[Dict], None]] = None,
+                        on_result: Optional[Callable[[str, str, bool, object], None]] = None
+                        ) -> BroadcastReport:
+        """
+        📢 Envoie `message` à chaque destinataire de chaque plateforme
+
+        `recipients` : {plateforme: itérable ou itérable async de destinataires},
+        consommé au fil de l'eau (jamais matérialisé). `on_result(plateforme,
+        destinataire, ok, résultat)` reçoit chaque réponse d'agent.
+        """
+        report = BroadcastReport(recipients, self.max_failures)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        done = 0
+
+        async def worker(platform: str, agent, next_recipient, bucket):
+            nonlocal done
+            while True:
+                item = await next_recipient()
+                if item is None:
+                    return
+                index, recipient = item
+                if bucket is not None:
+                    await bucket.acquire()
+
+                result, error = None, None
+                async with semaphore:
+                    try:
+                        result = await agent.send_message(recipient, message)
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+                ok = error is None and result is not None and result is not False
+                if not ok and error is None:
+                    error = "envoi refusé par l'agent"
+
+                report._record(platform, index, recipient, ok, error)
+                if on_result is not None:
+                    on_result(platform, recipient, ok, result)
+                done += 1
+                if on_progress is not None and done % self.progress_every == 0:
+                    on_progress(report.progress())
+
+        workers = []
+        for platform, platform_recipients in recipients.items():
+            agent = agents.get(platform)
+            if agent is None:
+                report.unavailable.append(platform)
+                continue
+            next_recipient = _recipient_source(platform_recipients)
+            bucket = self.buckets.get(platform)
+            size = self.concurrency
+            if hasattr(platform_recipients, '__len__'):
+                size = max(1, min(size, len(platform_recipients)))
+            workers.extend(
+                worker(platform, agent, next_recipient, bucket)
+                for _ in range(size)
+            )
+
+        await asyncio.gather(*workers)
+        report.finished = time.monotonic()
+        if on_progress is not None:
+            on_progress(report.progress())
+        return report
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗓️ Ordonnanceur d'envoi Algeria : classes de priorité et échéances
+Priorité stricte entre classes, tourniquet équitable entre clients (tenants),
+échéance la plus proche d'abord (EDF) ; délestage du trafic non urgent en
+surcharge ; profondeur de file et temps d'attente par classe
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rate_limit_algeria import platform_buckets
+
+logger = logging.getLogger('DispatchScheduler')
+
+# message_type -> (rang de priorité, délai cible en secondes, délestable)
+PRIORITY_CLASSES: Dict[str, Tuple[int, float, bool]] = {
+    'secure': (0, 5.0, False),        # rapports financiers chiffrés (Signal)
+    'alert': (1, 10.0, False),        # alertes d'échéance fiscale (G50, IRG...)
+    'normal': (2, 60.0, False),
+    'marketing': (3, 900.0, True),
+}
+
+DEFAULT_TENANT = 'default'
+
+
+class MessageShed(Exception):
+    """Message délesté : file saturée ou échéance dépassée (trafic non urgent)"""
+
+
+class _Job:
+    __slots__ = ('deadline', 'seq', 'tenant', 'message_class', 'user_id', 'platform',
+                 'message', 'message_type', 'enqueued', 'future')
+
+    def __lt__(self, other):
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+
+class _ClassMetrics:
+    """Compteurs d'une classe + temps d'attente récents (réservoir borné)"""
+
+    __slots__ = ('submitted', 'sent', 'failed', 'shed', 'late', 'depth', 'waits')
+
+    def __init__(self, window: int):
+        self.submitted = self.sent = self.failed = self.shed = self.late = self.depth = 0
+        self.waits = deque(maxlen=window)
+
+    def snapshot(self) -> Dict:
+        waits = sorted(self.waits)
+
+        def percentile(fraction):
+            return waits[min(len(waits) - 1, int(len(waits) * fraction))] if waits else 0.0
+
+        return {
+            'depth': self.depth,
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'failed': self.failed,
+            'shed': self.shed,
+            'late': self.late,
+            'wait_p50': percentile(0.50),
+            'wait_p95': percentile(0.95),
+            'wait_p99': percentile(0.99),
+            'wait_max': waits[-1] if waits else 0.0
+        }
+
+
+class _PlatformQueue:
+    """File d'une plateforme : rang -> {tenant: tas EDF}, tenants en tourniquet"""
+
+    def __init__(self, ranks: int):
+        self.classes: List["OrderedDict[str, List[_Job]]"] = [OrderedDict() for _ in range(ranks)]
+        self.depth = 0
+        self.nonempty = asyncio.Event()
+
+    def push(self, job: _Job, rank: int):
+        tenants = self.classes[rank]
+        heap = tenants.get(job.tenant)
+        if heap is None:
+            heap = tenants[job.tenant] = []
+        heapq.heappush(heap, job)
+        self.depth += 1
+        self.nonempty.set()
+
+    def pop(self) -> Optional[_Job]:
+        """Meilleur message : classe la plus prioritaire, tenant suivant, échéance la plus proche"""
+        for tenants in self.classes:
+            if tenants:
+                tenant, heap = next(iter(tenants.items()))
+                job = heapq.heappop(heap)
+                if heap:
+                    tenants.move_to_end(tenant)
+                else:
+                    del tenants[tenant]
+                self.depth -= 1
+                if not self.depth:
+                    self.nonempty.clear()
+                return job
+        return None
+
+    def pop_from_largest(self, rank: int) -> Optional[_Job]:
+        """Délestage : plus ancien message du tenant le plus chargé de la classe"""
+        tenants = self.classes[rank]
+        if not tenants:
+            return None
+        tenant = max(tenants, key=lambda name: len(tenants[name]))
+        heap = tenants[tenant]
+        job = heapq.heappop(heap)
+        if not heap:
+            del tenants[tenant]
+        self.depth -= 1
+        if not self.depth:
+            self.nonempty.clear()
+        return job
+
+
+class DispatchScheduler:
+    """🗓️ Ordonnancement des envois unitaires par plateforme
+
+    - priorité stricte entre classes (PRIORITY_CLASSES) : une alerte passe
+      toujours devant le trafic normal et marketing en attente
+    - dans une classe, tourniquet entre tenants (un message chacun) : un
+      client qui envoie 100 000 messages ne retarde pas les autres
+    - pour un tenant, échéance la plus proche d'abord (EDF)
+    - capacité de chaque plateforme : seau à jetons (quota API) et
+      `concurrency` envois simultanés
+    - au-delà de `max_queue` messages en attente sur une plateforme, un
+      message délestable est évincé (ou refusé) ; les classes non
+      délestables ne sont jamais refusées. Un message délestable dont
+      l'échéance est passée est abandonné au lieu d'être envoyé en retard.
+
+    submit() retourne le résultat de l'envoi, ou lève MessageShed.
+    """
+
+    def __init__(self, rate_limits: Optional[Dict] = None, concurrency: int = 8,
+                 max_queue: int = 10_000,
+                 classes: Optional[Dict[str, Tuple[int, float, bool]]] = None,
+                 wait_window: int = 4096, clock: Callable[[], float] = time.monotonic):
+        self.classes = dict(classes or PRIORITY_CLASSES)
+        self._ranks = max(rank for rank, _, _ in self.classes.values()) + 1
+        self._sheddable_ranks = sorted({rank for rank, _, sheddable in self.classes.values()
+                                        if sheddable}, reverse=True)
+        self.buckets = platform_buckets(rate_limits)
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self._clock = clock
+        self._seq = itertools.count()
+        self._queues: Dict[str, _PlatformQueue] = {}
+        self._metrics = {name: _ClassMetrics(wait_window) for name in self.classes}
+        self._send: Optional[Callable[..., Awaitable]] = None
+        self._workers: List[asyncio.Task] = []
+        self._in_flight = 0
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start(self, send: Callable[[str, str, str, str], Awaitable]):
+        """Lance les envois : `send(user_id, platform, message, message_type)`"""
+        self._send = send
+        for platform in self._queues:
+            self._start_workers(platform)
+
+    @property
+    def started(self) -> bool:
+        """Envois lancés (start) : sans cela les messages restent en file"""
+        return self._send is not None
+
+    def _start_workers(self, platform: str):
+        if self._send is None:
+            return
+        self._workers += [asyncio.ensure_future(self._worker(platform))
+                          for _ in range(self.concurrency)]
+
+    def _queue(self, platform: str) -> _PlatformQueue:
+        queue = self._queues.get(platform)
+        if queue is None:
+            queue = self._queues[platform] = _PlatformQueue(self._ranks)
+            self._start_workers(platform)
+        return queue
+
+    async def drain(self):
+        """Attend que toutes les files soient vides et les envois terminés"""
+        while self._in_flight or any(queue.depth for queue in self._queues.values()):
+            await asyncio.sleep(0.005)
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for queue in self._queues.values():
+            while queue.depth:
+                self._finish(queue.pop(), error=MessageShed("ordonnanceur arrêté"), shed=True)
+
+    # ------------------------------------------------------------------
+    # Soumission
+    # ------------------------------------------------------------------
+
+    def _class_of(self, message_type: str) -> str:
+        return message_type if message_type in self.classes else 'normal'
+
+    def submit_nowait(self, user_id: str, platform: str, message: str,
+                      message_type: str = 'normal', tenant: Optional[str] = None,
+                      deadline: Optional[float] = None) -> asyncio.Future:
+        """Met un message en file ; le futur donne le résultat de l'envoi"""
+        message_class = self._class_of(message_type)
+        rank, budget, sheddable = self.classes[message_class]
+        now = self._clock()
+
+        job = _Job()
+        job.deadline = now + budget if deadline is None else deadline
+        job.seq = next(self._seq)
+        job.tenant = tenant or DEFAULT_TENANT
+        job.message_class = message_class
+        job.user_id = user_id
+        job.platform = platform
+        job.message = message
+        job.message_type = message_type
+        job.enqueued = now
+        job.future = asyncio.get_running_loop().create_future()
+
+        metrics = self._metrics[message_class]
+        metrics.submitted += 1
+        queue = self._queue(platform)
+
+        if queue.depth >= self.max_queue:
+            victim = self._victim(queue, rank)
+            if victim is not None:
+                self._finish(victim, error=MessageShed("file saturée"), shed=True)
+            elif sheddable:
+                metrics.shed += 1
+                job.future.set_exception(MessageShed(f"file {platform} saturée"))
+                return job.future
+
+        queue.push(job, rank)
+        metrics.depth += 1
+        return job.future
+
+    async def submit(self, user_id: str, platform: str, message: str,
+                     message_type: str = 'normal', tenant: Optional[str] = None,
+                     deadline: Optional[float] = None):
+        return await self.submit_nowait(user_id, platform, message, message_type,
+                                        tenant, deadline)
+
+    def _victim(self, queue: _PlatformQueue, rank: int) -> Optional[_Job]:
+        """Message délestable de priorité strictement inférieure à évincer"""
+        for victim_rank in self._sheddable_ranks:
+            if victim_rank <= rank:
+                break
+            job = queue.pop_from_largest(victim_rank)
+            if job is not None:
+                return job
+        return None
+
+    # ------------------------------------------------------------------
+    # Envoi
+    # ------------------------------------------------------------------
+
+    async def _worker(self, platform: str):
+        queue = self._queues[platform]
+        bucket = self.buckets.get(platform)
+        while True:
+            await queue.nonempty.wait()
+            job = queue.pop()
+            if job is None:
+                continue
+            self._in_flight += 1
+            try:
+                if self.classes[job.message_class][2] and self._clock() > job.deadline:
+                    self._finish(job, error=MessageShed("échéance dépassée"), shed=True)
+                    continue
+                if bucket is not None:
+                    await bucket.acquire()
+                await self._dispatch(job)
+            finally:
+                self._in_flight -= 1
+
+    async def _dispatch(self, job: _Job):
+        metrics = self._metrics[job.message_class]
+        now = self._clock()
+        metrics.waits.append(now - job.enqueued)
+        if now > job.deadline:
+            metrics.late += 1
+        try:
+            result = await self._send(job.user_id, job.platform, job.message, job.message_type)
+        except asyncio.CancelledError:
+            self._finish(job, error=MessageShed("ordonnanceur arrêté"))
+            raise
+        except Exception as e:
+            logger.error(f"❌ Envoi {job.platform} → {job.user_id}: {e}")
+            self._finish(job, error=e)
+        else:
+            self._finish(job, result=result)
+
+    def _finish(self, job: _Job, result=None, error: Optional[BaseException] = None,
+                shed: bool = False):
+        metrics = self._metrics[job.message_class]
+        metrics.depth -= 1
+        if shed:
+            metrics.shed += 1
+        elif error is None:
+            metrics.sent += 1
+        else:
+            metrics.failed += 1
+        if job.future.done():
+            return
+        if error is None:
+            job.future.set_result(result)
+        else:
+            job.future.set_exception(error)
+            # Personne n'attend forcément le futur (submit_nowait)
+            job.future.exception()
+
+    # ------------------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------------------
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {platform: queue.depth for platform, queue in self._queues.items()}
+
+    def stats(self) -> Dict:
+        """📊 Profondeur par plateforme, compteurs et attentes (s) par classe"""
+        return {
+            'queue_depth': self.queue_depths(),
+            'in_flight': self._in_flight,
+            'classes': {name: metrics.snapshot() for name, metrics in self._metrics.items()}
+        }
@@ -1,19 +1,22 @@
-class TelegramAgent:
-    def __init__(self, bot_token):
-        self.bot_token = bot_token
-        print("📱 Telegram Agent Algeria initialisé")
-    
-    async def send_message(self, chat_id, text):
-        # Envoi message Telegram
-        return f"📤 Telegram: {text[:50]}..."
+"""
+📱 Alias de compatibilité des agents de messagerie
+TelegramAgent et SignalAgent étaient des doublons simplifiés de
+TelegramAgentAlgeria et SignalAgentAlgeria : ils pointent désormais vers ces
+classes, importées au premier accès via le registre des agents.
+"""
 
-class SignalAgent:
-    def __init__(self, phone_number):
-        self.phone_number = phone_number
-        print("🔐 Signal Agent Algeria initialisé")
-    
-    async def send_message(self, recipient, text):
-        # Envoi message Signal
-        return f"🔒 Signal: {text[:50]}..."
 
-print("✅ Multi-Platform Agents ready!")
+from agent_registry_algeria import load_agent
+
+_ALIASES = {
+    'TelegramAgent': 'telegram',
+    'SignalAgent': 'signal',
+}
+
+__all__ = sorted(_ALIASES)
+
+
+def __getattr__(name):
+    if name in _ALIASES:
+        return load_agent(_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
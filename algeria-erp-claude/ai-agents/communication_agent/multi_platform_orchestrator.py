@@ -1,31 +1,114 @@
 ﻿import asyncio
 import logging
+import os
+import tempfile
 from datetime import datetime
+from typing import TYPE_CHECKING
+
+from agent_registry_algeria import create_agent
+from broadcast_engine_algeria import BroadcastEngine, BroadcastReport
+from dispatch_scheduler_algeria import DispatchScheduler, MessageShed
+from outbound_queue_algeria import OutboundQueue, QueuedMessage
+from preference_store_algeria import MemoryPreferenceStore, PreferenceStore
+from result_cache_algeria import LruTtlCache, SingleFlight
+
+if TYPE_CHECKING:
+    # Annotations seulement : l'agent fiscal est importé au premier calcul (create_agent)
+    from fiscal_agent_algeria import FiscalAiAgent
+
+logger = logging.getLogger('Orchestrator')
+
+# Destinataire « canal » par plateforme quand aucune liste n'est fournie
+BROADCAST_CHANNELS = {
+    'telegram': '@all',
+    'signal': '+213ALL'
+}
 
 class MultiPlatformOrchestrator:
-    def __init__(self):
+    def __init__(self, rate_limits=None, broadcast_concurrency=64,
+                 outbox: OutboundQueue = None, preference_store: PreferenceStore = None,
+                 http_client=None, fiscal_agent: 'FiscalAiAgent' = None,
+                 fiscal_cache_size=1024, fiscal_cache_ttl=300.0,
+                 scheduler: DispatchScheduler = None):
         self.platforms = {
             'whatsapp': None,
             'telegram': None,
             'signal': None
         }
-        self.user_preferences = {}
-        print("🎯 Orchestrateur Multi-Plateformes Algeria initialisé")
+        # Téléphone -> plateforme ; SQLitePreferenceStore pour persister et partager entre workers
+        self.user_preferences = preference_store or MemoryPreferenceStore()
+        # Quotas par API (voir rate_limit_algeria.PLATFORM_RATE_LIMITS)
+        self.broadcaster = BroadcastEngine(rate_limits, concurrency=broadcast_concurrency)
+        # Ordonnanceur des envois unitaires (priorités, échéances, équité entre tenants) ;
+        # il partage les seaux à jetons des diffusions : un seul quota par API
+        self.scheduler = scheduler
+        if scheduler is not None:
+            self.broadcaster.buckets = scheduler.buckets
+        # File d'envoi durable : send_smart_message ne fait qu'y écrire (None = envoi direct)
+        self.outbox = outbox
+        # Client HTTP partagé (http_client_algeria.HttpClient) transmis aux agents enregistrés
+        self.http_client = http_client
+        # Calculs fiscaux exacts (centimes) ; requêtes identiques simultanées regroupées.
+        # L'agent (règles, lexiques) n'est créé qu'au premier calcul
+        self._fiscal_agent = fiscal_agent
+        self.fiscal_flight = SingleFlight(LruTtlCache(maxsize=fiscal_cache_size,
+                                                      ttl=fiscal_cache_ttl))
+        logger.info("🎯 Orchestrateur Multi-Plateformes Algeria initialisé")
+    
+    @property
+    def fiscal_agent(self) -> 'FiscalAiAgent':
+        if self._fiscal_agent is None:
+            self._fiscal_agent = create_agent('fiscal')
+        return self._fiscal_agent
+    
+    @fiscal_agent.setter
+    def fiscal_agent(self, agent: 'FiscalAiAgent'):
+        self._fiscal_agent = agent
     
     def register_platform(self, platform_name, agent):
+        if self.http_client is not None and getattr(agent, 'http_client', False) is None:
+            agent.http_client = self.http_client
         self.platforms[platform_name] = agent
-        print(f"✅ {platform_name.title()} Agent enregistré")
+        logger.info(f"✅ {platform_name.title()} Agent enregistré")
     
     def set_user_preference(self, user_id, preferred_platform):
-        self.user_preferences[user_id] = preferred_platform
-        print(f"📱 Utilisateur {user_id} préfère {preferred_platform}")
+        self.user_preferences.set(user_id, preferred_platform)
+        logger.info(f"📱 Utilisateur {user_id} préfère {preferred_platform}")
     
-    async def send_smart_message(self, user_id, message, message_type="normal"):
-        platform = self.user_preferences.get(user_id, 'telegram')
+    async def send_smart_message(self, user_id, message, message_type="normal",
+                                 idempotency_key=None, tenant_id=None, deadline=None):
+        preferences = self.user_preferences
+        if preferences.blocking:
+            # Stockage sur disque (SQLite) : lecture dans un thread, boucle asyncio libre
+            platform = await asyncio.to_thread(preferences.get, user_id, 'telegram')
+        else:
+            platform = preferences.get(user_id, 'telegram')
+        if self.outbox is not None:
+            # Durable dès le retour ; livré par start_outbox(), au moins une fois,
+            # via l'ordonnanceur s'il est configuré
+            return await self.outbox.enqueue(user_id, platform, message, message_type,
+                                             idempotency_key, tenant=tenant_id)
+        if self.scheduler is not None:
+            try:
+                return await self._schedule(user_id, platform, message, message_type,
+                                            tenant_id, deadline)
+            except MessageShed:
+                return False
+        return await self._deliver(user_id, platform, message, message_type)
+    
+    async def _schedule(self, user_id, platform, message, message_type, tenant_id=None,
+                        deadline=None):
+        # message_type : secure > alert > normal > marketing (délestable)
+        if not self.scheduler.started:
+            self.start_scheduler()
+        return await self.scheduler.submit(user_id, platform, message, message_type,
+                                           tenant=tenant_id, deadline=deadline)
+    
+    async def _deliver(self, user_id, platform, message, message_type):
         agent = self.platforms.get(platform)
         
         if not agent:
-            print(f"❌ Agent {platform} non disponible")
+            logger.warning(f"❌ Agent {platform} non disponible")
             return False
         
         if message_type == "secure" and platform == "signal":
@@ -33,34 +116,79 @@ class MultiPlatformOrchestrator:
         else:
             return await agent.send_message(user_id, message)
     
-    async def broadcast_notification(self, message, platforms=None):
-        if platforms is None:
-            platforms = ['telegram', 'signal']
-        
-        results = {}
-        for platform in platforms:
-            agent = self.platforms.get(platform)
-            if agent:
-                if platform == 'telegram':
-                    results[platform] = await agent.send_message("@all", message)
-                elif platform == 'signal':
-                    results[platform] = await agent.send_message("+213ALL", message)
+    async def _deliver_queued(self, entry: QueuedMessage):
+        if self.scheduler is None:
+            return await self._deliver(entry.user_id, entry.platform, entry.message,
+                                       entry.message_type)
+        # Délesté (file saturée, échéance passée) : MessageShed, la file d'envoi
+        # le reprend plus tard avec son délai exponentiel
+        return await self._schedule(entry.user_id, entry.platform, entry.message,
+                                    entry.message_type, entry.tenant)
+    
+    def start_outbox(self) -> asyncio.Task:
+        """🚚 Lance la livraison de la file d'envoi (messages en attente compris)"""
+        return self.outbox.start(self._deliver_queued)
+    
+    def start_scheduler(self):
+        """🗓️ Lance les envois ordonnancés (fait au premier envoi sinon, dans la boucle asyncio)"""
+        self.scheduler.start(self._deliver)
+    
+    def dispatch_stats(self):
+        """📊 Profondeur des files et temps d'attente par classe de priorité"""
+        return self.scheduler.stats() if self.scheduler is not None else {}
+    
+    def recipients_by_platform(self, user_ids, default_platform='telegram'):
+        """📇 Répartit des utilisateurs selon leur plateforme préférée (recherches groupées)"""
+        return self.user_preferences.group_by_platform(user_ids, default_platform)
+    
+    async def broadcast_notification(self, message, platforms=None, recipients=None,
+                                     on_progress=None, on_result=None) -> BroadcastReport:
+        """
+        📢 Diffusion concurrente sur toutes les plateformes
+
+        recipients: {plateforme: itérable (ou itérable async) de destinataires} ;
+        sans liste, chaque plateforme reçoit son destinataire canal
+        (BROADCAST_CHANNELS). Retourne un BroadcastReport (statut par
+        destinataire, compteurs, erreurs).
+        """
+        if recipients is None:
+            if platforms is None:
+                platforms = ['telegram', 'signal']
+            recipients = {
+                platform: (BROADCAST_CHANNELS[platform],)
+                for platform in platforms if platform in BROADCAST_CHANNELS
+            }
+        elif platforms is not None:
+            recipients = {platform: recipients[platform] for platform in platforms
+                          if platform in recipients}
         
-        return results
-    
-    async def handle_fiscal_calculation(self, user_id, calc_type, amount, language="fr"):
-        # Simulation calcul fiscal
-        if calc_type == "tva":
-            tva_amount = amount * 0.19
-            result = f"💰 TVA Algeria: {amount:,.0f} DZD + {tva_amount:,.0f} DZD = {amount + tva_amount:,.0f} DZD"
-        elif calc_type == "irg":
-            irg_amount = max(0, (amount - 120000) * 0.23) if amount > 120000 else 0
-            result = f"💼 IRG Algeria: {amount:,.0f} DZD - {irg_amount:,.0f} DZD = {amount - irg_amount:,.0f} DZD net"
+        agents = {platform: self.platforms.get(platform) for platform in recipients}
+        return await self.broadcaster.broadcast(agents, message, recipients,
+                                                on_progress=on_progress, on_result=on_result)
+    
+    async def handle_fiscal_calculation(self, user_id, calc_type, amount, language="fr",
+                                        children=0):
+        """
+        💰 Calcul TVA/IRG par les calculateurs de FiscalAiAgent, envoyé à l'utilisateur
+
+        Les demandes identiques (type, montant au centime, enfants, langue,
+        règles en vigueur) partagent un seul calcul en vol puis le cache ;
+        voir fiscal_stats().
+        """
+        if calc_type in ("tva", "irg"):
+            fiscal_agent = self.fiscal_agent
+            key = fiscal_agent.calculation_key(calc_type, amount, children, language)
+            result = await self.fiscal_flight.run(
+                key, lambda: fiscal_agent.calculate(calc_type, amount, children, language))
         else:
             result = "❓ Type de calcul non reconnu"
         
         await self.send_smart_message(user_id, result)
         return result
+    
+    def fiscal_stats(self):
+        """📊 Calculs fiscaux : appels, calculs réels, appels regroupés, cache"""
+        return self.fiscal_flight.stats()
 
 async def test_orchestrator():
     print("🧪 TEST ORCHESTRATEUR MULTI-PLATEFORMES")
@@ -96,11 +224,62 @@ async def test_orchestrator():
     print("\n💰 Test calcul fiscal:")
     await orchestrator.handle_fiscal_calculation('+213555123456', 'tva', 100000, 'fr')
     await orchestrator.handle_fiscal_calculation('+213555789012', 'irg', 300000, 'fr')
+    # Rush d'échéance : demandes identiques simultanées
+    await asyncio.gather(*(
+        orchestrator.handle_fiscal_calculation(f"+21355500{i:04d}", 'tva', 150000, 'fr')
+        for i in range(50)
+    ))
+    print(f"   📊 {orchestrator.fiscal_stats()}")
     
     print("\n📢 Test broadcast:")
     await orchestrator.broadcast_notification('🇩🇿 Mise à jour ERP Algeria disponible!')
     
+    orchestrator.user_preferences.import_bulk(
+        (f"+21355500{i:04d}", 'whatsapp') for i in range(0, 90, 3))
+    subscribers = orchestrator.recipients_by_platform(f"+21355500{i:04d}" for i in range(90))
+    report = await orchestrator.broadcast_notification(
+        '📅 Échéance G50 le 20 du mois', recipients=subscribers,
+        on_progress=lambda p: print(f"   ⏳ {p['sent']} envoyés, {p['failed']} échecs, "
+                                    f"{p['rate_per_second']:.0f} msg/s")
+    )
+    print(f"   📊 {report.total_sent} envoyés en {report.progress()['elapsed']:.1f}s")
+    
+    print("\n📮 Test file d'envoi durable:")
+    with tempfile.TemporaryDirectory() as directory:
+        orchestrator.outbox = OutboundQueue(os.path.join(directory, 'outbox.db'))
+        orchestrator.start_outbox()
+        for i in range(3):
+            await orchestrator.send_smart_message('+213555123456', f'Rappel G50 #{i}',
+                                                  idempotency_key=f'g50-{i}')
+        await orchestrator.outbox.drain(timeout=5)
+        print(f"   📊 {await orchestrator.outbox.stats()}")
+        await orchestrator.outbox.close()
+    orchestrator.outbox = None
+    
+    print("\n🗓️ Test ordonnancement (priorités, tenants):")
+    orchestrator.scheduler = DispatchScheduler(rate_limits={'telegram': (200.0, 20.0)},
+                                               max_queue=100)
+    orchestrator.start_scheduler()
+    campaign = [
+        orchestrator.send_smart_message(f"+21366600{i:04d}", f'Promo Pack PME #{i}', 'marketing',
+                                        tenant_id='sarl-atlas')
+        for i in range(150)
+    ]
+    alerts = [
+        orchestrator.send_smart_message('+213555123456', f'⚠️ G50 dû dans 24h #{i}', 'alert',
+                                        tenant_id='eurl-tassili')
+        for i in range(5)
+    ]
+    await asyncio.gather(*campaign, *alerts)
+    classes = orchestrator.dispatch_stats()['classes']
+    print(f"   📊 alertes: {classes['alert']['sent']} envoyées, "
+          f"attente p95 {classes['alert']['wait_p95'] * 1000:.0f} ms | marketing: "
+          f"{classes['marketing']['sent']} envoyés, {classes['marketing']['shed']} délestés, "
+          f"attente p95 {classes['marketing']['wait_p95'] * 1000:.0f} ms")
+    await orchestrator.scheduler.close()
+    
     print("\n✅ Orchestrateur multi-plateformes opérationnel!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     asyncio.run(test_orchestrator())
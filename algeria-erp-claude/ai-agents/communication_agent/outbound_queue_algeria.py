@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📮 File d'envoi persistante Algeria - Résiste aux coupures de courant
+SQLite en mode WAL (synchronous=FULL), commit groupé, livraison au moins
+une fois, reprises à délai exponentiel, clés d'idempotence, reprise rapide
+depuis le dernier offset acquitté
+"""
+
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger('OutboundQueue')
+
+PENDING, DELIVERED, DEAD = 0, 1, 2
+
+QueuedMessage = namedtuple(
+    'QueuedMessage',
+    'id idempotency_key user_id platform message message_type attempts tenant'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    user_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    message TEXT NOT NULL,
+    message_type TEXT NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    created REAL NOT NULL,
+    delivered REAL,
+    last_error TEXT,
+    tenant TEXT
+);
+-- Index partiel : seuls les messages en attente y figurent
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox(next_attempt) WHERE state = 0;
+CREATE INDEX IF NOT EXISTS outbox_dead ON outbox(id) WHERE state = 2;
+CREATE TABLE IF NOT EXISTS outbox_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class OutboundQueue:
+    """📮 File d'envoi durable (une connexion SQLite, un thread d'écriture)
+
+    - enqueue() rend la main une fois le message écrit sur disque ; les
+      écritures arrivées pendant `commit_interval` partagent un seul commit
+    - l'offset acquitté est le plus grand id sous lequel tout est livré (ou
+      abandonné) : au redémarrage seuls les ids au-delà sont relus
+    - un message non acquitté au moment d'une coupure est renvoyé : les
+      destinataires dédupliquent grâce à `idempotency_key`
+    - les clés d'idempotence restent connues pendant `retention` secondes
+    """
+
+    def __init__(self, path: str, commit_interval: float = 0.005, max_batch: int = 512,
+                 max_attempts: int = 8, base_delay: float = 1.0, max_delay: float = 600.0,
+                 concurrency: int = 32, poll_interval: float = 1.0,
+                 retention: float = 7 * 86400, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._clock = clock
+
+        # Toutes les opérations SQLite passent par ce thread unique
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='outbox')
+        self._db: Optional[sqlite3.Connection] = None
+        # Premiers appels simultanés : une seule connexion ouverte
+        self._open_lock = asyncio.Lock()
+        self._writes: List = []
+        self._flush_handle = None
+        self._commits = set()
+        self._in_flight = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.acked_offset = 0
+        self.enqueued = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dead = 0
+        self.commits = 0
+
+    # ------------------------------------------------------------------
+    # Thread d'écriture
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        db = sqlite3.connect(self.path, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=FULL")  # commit durable même sur coupure
+        db.executescript(_SCHEMA)
+        # Bases créées avant la colonne tenant (ordonnancement par client)
+        columns = {row[1] for row in db.execute("PRAGMA table_info(outbox)")}
+        if 'tenant' not in columns:
+            db.execute("ALTER TABLE outbox ADD COLUMN tenant TEXT")
+        row = db.execute("SELECT value FROM outbox_meta WHERE key = 'acked_offset'").fetchone()
+        self.acked_offset = row[0] if row else 0
+        self._db = db
+
+    def _commit(self, operations) -> List:
+        """Applique un lot d'écritures dans une seule transaction"""
+        db = self._db
+        results = []
+        acknowledged = False
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for kind, args in operations:
+                if kind == 'put':
+                    cursor = db.execute(
+                        "INSERT OR IGNORE INTO outbox (idempotency_key, user_id, platform, message,"
+                        " message_type, next_attempt, created, tenant)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", args)
+                    if cursor.rowcount:
+                        results.append((cursor.lastrowid, True))
+                    else:
+                        row = db.execute("SELECT id FROM outbox WHERE idempotency_key = ?",
+                                         (args[0],)).fetchone()
+                        results.append((row[0], False))
+                    continue
+                if kind == 'ack':
+                    db.execute("UPDATE outbox SET state = 1, delivered = ?, attempts = attempts + 1"
+                               " WHERE id = ?", args)
+                    acknowledged = True
+                elif kind == 'retry':
+                    db.execute("UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ?"
+                               " WHERE id = ?", args)
+                elif kind == 'dead':
+                    db.execute("UPDATE outbox SET state = 2, attempts = ?, last_error = ?"
+                               " WHERE id = ?", args)
+                    acknowledged = True
+                results.append(None)
+
+            if acknowledged:
+                self._advance_offset(db)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self.commits += 1
+        return results
+
+    def _advance_offset(self, db):
+        """Offset = premier message en attente - 1 (balayage borné à partir de l'offset)"""
+        row = db.execute("SELECT MIN(id) FROM outbox WHERE id > ? AND state = 0",
+                         (self.acked_offset,)).fetchone()
+        if row[0] is not None:
+            offset = row[0] - 1
+        else:
+            offset = db.execute("SELECT COALESCE(MAX(id), 0) FROM outbox").fetchone()[0]
+        if offset != self.acked_offset:
+            self.acked_offset = offset
+            db.execute("INSERT OR REPLACE INTO outbox_meta (key, value) VALUES ('acked_offset', ?)",
+                       (offset,))
+
+    def _due(self, now: float, limit: int) -> List[QueuedMessage]:
+        rows = self._db.execute(
+            "SELECT id, idempotency_key, user_id, platform, message, message_type, attempts,"
+            " tenant FROM outbox WHERE state = 0 AND id > ? AND next_attempt <= ?"
+            " ORDER BY next_attempt LIMIT ?", (self.acked_offset, now, limit)).fetchall()
+        return [QueuedMessage(*row) for row in rows]
+
+    def _next_due_time(self) -> Optional[float]:
+        row = self._db.execute("SELECT MIN(next_attempt) FROM outbox WHERE state = 0").fetchone()
+        return row[0]
+
+    def _counts(self) -> Dict[int, int]:
+        db = self._db
+        return {
+            PENDING: db.execute("SELECT COUNT(*) FROM outbox WHERE state = 0").fetchone()[0],
+            DEAD: db.execute("SELECT COUNT(*) FROM outbox WHERE state = 2").fetchone()[0]
+        }
+
+    def _compact(self, before: float) -> int:
+        cursor = self._db.execute(
+            "DELETE FROM outbox WHERE state = 1 AND id <= ? AND delivered < ?",
+            (self.acked_offset, before))
+        return cursor.rowcount
+
+    def _close(self):
+        if self._db is not None:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.close()
+            self._db = None
+
+    # ------------------------------------------------------------------
+    # API asyncio
+    # ------------------------------------------------------------------
+
+    async def _call(self, function, *args):
+        loop = asyncio.get_running_loop()
+        if self._db is None:
+            async with self._open_lock:
+                if self._db is None:
+                    await loop.run_in_executor(self._executor, self._open)
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def open(self):
+        """Ouvre la base (fait automatiquement au premier appel)"""
+        await self._call(lambda: None)
+
+    def _write(self, kind: str, args) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.append((kind, args, future))
+        if len(self._writes) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.commit_interval, self._flush)
+        return future
+
+    def _flush(self):
+        """Commit groupé des écritures en attente (ordre préservé : un seul thread)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._writes = self._writes, []
+        if not batch:
+            return
+
+        async def commit():
+            try:
+                results = await self._call(self._commit, [(kind, args) for kind, args, _ in batch])
+            except Exception as e:
+                logger.error(f"❌ Commit file d'envoi: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+        task = asyncio.ensure_future(commit())
+        self._commits.add(task)
+        task.add_done_callback(self._commits.discard)
+
+    async def enqueue(self, user_id: str, platform: str, message: str,
+                      message_type: str = "normal", idempotency_key: Optional[str] = None,
+                      tenant: Optional[str] = None) -> int:
+        """
+        📥 Ajoute un message (durable au retour) et retourne son id
+
+        Une clé déjà connue ne crée pas de doublon : l'id existant est retourné.
+        `tenant` est conservé pour l'ordonnancement à la livraison.
+        """
+        if self._db is None:
+            await self.open()
+        key = idempotency_key or uuid.uuid4().hex
+        message_id, created = await self._write(
+            'put', (key, str(user_id), platform, message, message_type, self._clock(), self._clock(),
+                    tenant))
+        if created:
+            self.enqueued += 1
+        return message_id
+
+    def backoff(self, attempts: int) -> float:
+        """Délai exponentiel plafonné, avec gigue (moitié fixe, moitié aléatoire)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _deliver_one(self, entry: QueuedMessage, deliver, semaphore):
+        try:
+            async with semaphore:
+                try:
+                    ok = await deliver(entry)
+                    error = None if ok is not False else "envoi refusé"
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+
+                attempts = entry.attempts + 1
+                if error is None:
+                    self.delivered += 1
+                    await self._write('ack', (self._clock(), entry.id))
+                elif attempts >= self.max_attempts:
+                    self.dead += 1
+                    logger.error(f"❌ Message {entry.id} abandonné après {attempts} essais: {error}")
+                    await self._write('dead', (attempts, error, entry.id))
+                else:
+                    self.retried += 1
+                    await self._write('retry', (attempts, self._clock() + self.backoff(attempts),
+                                                error, entry.id))
+        finally:
+            # Libéré seulement une fois l'état écrit : pas de double envoi local
+            self._in_flight.discard(entry.id)
+
+    async def run(self, deliver: Callable[[QueuedMessage], Awaitable], compact_interval: float = 3600.0):
+        """🚚 Boucle de livraison : `deliver(message)` lève ou retourne False en cas d'échec"""
+        await self.open()
+        self._wakeup = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        next_compact = self._clock() + compact_interval
+        try:
+            while True:
+                self._wakeup.clear()
+                due = await self._call(self._due, self._clock(), self.concurrency * 4)
+                fresh = [entry for entry in due if entry.id not in self._in_flight]
+                for entry in fresh:
+                    self._in_flight.add(entry.id)
+                    task = asyncio.ensure_future(self._deliver_one(entry, deliver, semaphore))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                if self._clock() >= next_compact:
+                    await self.compact()
+                    next_compact = self._clock() + compact_interval
+
+                if fresh and len(fresh) == len(due):
+                    continue
+                # Rien de neuf : attendre un commit, la prochaine échéance ou le délai de sondage
+                timeout = self.poll_interval
+                next_due = await self._call(self._next_due_time)
+                if next_due is not None:
+                    timeout = max(0.0, min(timeout, next_due - self._clock()))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout or self.commit_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def start(self, deliver: Callable[[QueuedMessage], Awaitable]) -> asyncio.Task:
+        """Lance la boucle de livraison en tâche de fond"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self.run(deliver))
+        return self._worker
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Attend que tout message dû soit livré (ou reporté)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._flush()
+            pending = await self._call(self._due, self._clock(), 1)
+            if not pending and not self._in_flight and not self._writes and not self._commits:
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                raise asyncio.TimeoutError("file d'envoi non vidée")
+            await asyncio.sleep(self.commit_interval)
+
+    async def compact(self) -> int:
+        """🧹 Supprime les messages livrés plus vieux que `retention`"""
+        return await self._call(self._compact, self._clock() - self.retention)
+
+    async def stats(self) -> Dict:
+        """📊 État de la file"""
+        counts = await self._call(self._counts)
+        return {
+            'pending': counts.get(PENDING, 0),
+            'dead': counts.get(DEAD, 0),
+            'in_flight': len(self._in_flight),
+            'acked_offset': self.acked_offset,
+            'enqueued': self.enqueued,
+            'delivered': self.delivered,
+            'retried': self.retried,
+            'abandoned': self.dead,
+            'commits': self.commits
+        }
+
+    async def close(self):
+        """Arrête la livraison, écrit les derniers acquittements et ferme la base"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._flush()
+        if self._commits:
+            await asyncio.gather(*self._commits, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📇 Préférences utilisateurs Algeria (téléphone -> plateforme)
+Stockage interchangeable : mémoire (défaut) ou SQLite indexé partagé entre
+workers, avec cache LRU en lecture, import massif et recherches groupées
+"""
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from result_cache_algeria import LruTtlCache
+
+_MISSING = object()
+
+# Limite de paramètres par requête SQLite (999 sur les anciennes versions)
+_LOOKUP_CHUNK = 900
+
+
+class PreferenceStore(ABC):
+    """📇 Interface commune des stockages de préférences"""
+
+    # Lectures bloquantes (disque) : à appeler hors de la boucle asyncio
+    blocking = False
+
+    @abstractmethod
+    def get(self, user_id: str, default: Optional[str] = None) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, user_id: str, platform: str) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, user_id: str) -> None:
+        ...
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """{user_id: plateforme} pour les utilisateurs ayant une préférence"""
+        found = {}
+        for user_id in user_ids:
+            platform = self.get(user_id)
+            if platform is not None:
+                found[user_id] = platform
+        return found
+
+    def import_bulk(self, mappings: Iterable[Tuple[str, str]]) -> int:
+        """Importe des couples (user_id, plateforme) ; retourne le nombre importé"""
+        count = 0
+        for user_id, platform in mappings:
+            self.set(user_id, platform)
+            count += 1
+        return count
+
+    def group_by_platform(self, user_ids: Iterable[str], default: str = 'telegram',
+                          chunk_size: int = 10_000) -> Dict[str, List[str]]:
+        """📢 Destinataires regroupés par plateforme préférée (recherches par lots)"""
+        groups: Dict[str, List[str]] = {}
+        iterator = iter(user_ids)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return groups
+            found = self.get_many(chunk)
+            for user_id in chunk:
+                groups.setdefault(found.get(user_id, default), []).append(user_id)
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryPreferenceStore(PreferenceStore):
+    """Dict en mémoire (comportement historique, non partagé, perdu au redémarrage)"""
+
+    def __init__(self):
+        self._data: Dict[str, str] = {}
+
+    def get(self, user_id, default=None):
+        return self._data.get(user_id, default)
+
+    def set(self, user_id, platform):
+        self._data[user_id] = platform
+
+    def delete(self, user_id):
+        self._data.pop(user_id, None)
+
+    def get_many(self, user_ids):
+        data = self._data
+        return {user_id: data[user_id] for user_id in user_ids if user_id in data}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLitePreferenceStore(PreferenceStore):
+    """📇 Table SQLite indexée (WAL) + cache LRU en lecture
+
+    Plusieurs workers peuvent ouvrir le même fichier : lectures concurrentes,
+    écritures sérialisées par SQLite. Une écriture d'un autre worker devient
+    visible ici au plus tard après `cache_ttl` secondes.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, cache_size: int = 100_000, cache_ttl: Optional[float] = 60.0,
+                 busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.cache = LruTtlCache(maxsize=cache_size, ttl=cache_ttl)
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS preferences ("
+                " user_id TEXT PRIMARY KEY,"
+                " platform TEXT NOT NULL"
+                ") WITHOUT ROWID"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Une connexion par thread (sqlite3 interdit le partage entre threads)"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, user_id, default=None):
+        platform = self.cache.get(user_id, _MISSING)
+        if platform is _MISSING:
+            row = self._connection().execute(
+                "SELECT platform FROM preferences WHERE user_id = ?", (user_id,)).fetchone()
+            platform = row[0] if row else None
+            # Les absences sont aussi mises en cache (la plupart des abonnés n'ont pas de préférence)
+            self.cache.put(user_id, platform)
+        return default if platform is None else platform
+
+    def set(self, user_id, platform):
+        with self._connection() as db:
+            db.execute("INSERT OR REPLACE INTO preferences (user_id, platform) VALUES (?, ?)",
+                       (user_id, platform))
+        self.cache.put(user_id, platform)
+
+    def delete(self, user_id):
+        with self._connection() as db:
+            db.execute("DELETE FROM preferences WHERE user_id = ?", (user_id,))
+        self.cache.put(user_id, None)
+
+    def get_many(self, user_ids):
+        found, misses = {}, []
+        for user_id in user_ids:
+            platform = self.cache.get(user_id, _MISSING)
+            if platform is _MISSING:
+                misses.append(user_id)
+            elif platform is not None:
+                found[user_id] = platform
+
+        db = self._connection()
+        for start in range(0, len(misses), _LOOKUP_CHUNK):
+            chunk = misses[start:start + _LOOKUP_CHUNK]
+            rows = dict(db.execute(
+                f"SELECT user_id, platform FROM preferences WHERE user_id IN "
+                f"({','.join('?' * len(chunk))})", chunk).fetchall())
+            for user_id in chunk:
+                platform = rows.get(user_id)
+                self.cache.put(user_id, platform)
+                if platform is not None:
+                    found[user_id] = platform
+        return found
+
+    def import_bulk(self, mappings, chunk_size: int = 50_000):
+        """📥 Import massif : transactions de `chunk_size` lignes, cache vidé à la fin"""
+        db = self._connection()
+        iterator = iter(mappings)
+        count = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO preferences (user_id, platform) VALUES (?, ?)", chunk)
+            count += len(chunk)
+        self.cache.clear()
+        return count
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM preferences").fetchone()[0]
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
@@ -1,49 +1,103 @@
 ﻿import asyncio
 import logging
+from collections import deque
 from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, Tuple, Union
+
+from signal_daemon_algeria import SignalDaemon
+from templates_algeria import REGISTRY as TEMPLATE_REGISTRY
+
+logger = logging.getLogger('SignalAgent')
 
 class SignalAgentAlgeria:
-    def __init__(self, phone_number):
+    def __init__(self, phone_number, daemon: SignalDaemon = None, signal_cli_path="signal-cli"):
         self.phone_number = phone_number
-        self.signal_cli_path = "signal-cli"
-        print("🔐 Signal Agent Algeria initialisé")
+        self.signal_cli_path = signal_cli_path
+        # Démon signal-cli persistant (JSON-RPC) ; None = envoi simulé
+        self.daemon = daemon
+        logger.info("🔐 Signal Agent Algeria initialisé")
+    
+    async def start_daemon(self, **options) -> SignalDaemon:
+        """🔐 Lance un démon `signal-cli jsonRpc` unique pour tous les envois"""
+        if self.daemon is None:
+            self.daemon = SignalDaemon.for_account(self.phone_number, self.signal_cli_path,
+                                                   **options)
+        await self.daemon.start(self.daemon.request_timeout)
+        return self.daemon
     
     async def send_message(self, recipient, text):
+        if self.daemon is not None:
+            return await self.daemon.send(recipient, text)
         # Simulation envoi Signal
         timestamp = datetime.now().strftime("%H:%M")
         return f"🔒 [{timestamp}] Signal → {recipient}: {text[:50]}..."
     
     async def send_secure_data(self, recipient, data_type, content):
-        security_messages = {
-            "ar": f"🔒 بيانات آمنة: {data_type}",
-            "fr": f"🔒 Données sécurisées: {data_type}",
-            "en": f"🔒 Secure data: {data_type}"
-        }
-        
-        return await self.send_message(recipient, security_messages["fr"])
+        message = TEMPLATE_REGISTRY.render('secure_data', 'fr', {'data_type': data_type})
+        return await self.send_message(recipient, message)
     
     async def broadcast_alert(self, contacts, alert_type, language="fr"):
-        alerts = {
-            "deadline_fiscal": {
-                "ar": "🚨 تذكير: موعد الإقرار الضريبي قريب!",
-                "fr": "🚨 Rappel: Échéance déclaration fiscale proche!",
-                "en": "🚨 Reminder: Tax declaration deadline approaching!"
-            },
-            "system_update": {
-                "ar": "⚡ تحديث النظام متاح",
-                "fr": "⚡ Mise à jour système disponible", 
-                "en": "⚡ System update available"
-            }
-        }
-        
-        message = alerts.get(alert_type, {}).get(language, "🔔 Notification")
-        
         results = []
-        for contact in contacts:
-            result = await self.send_message(contact, message)
-            results.append(result)
+        async for delivery in self.stream_alert(contacts, alert_type, language):
+            results.append(delivery.get('result'))
         
         return results
+    
+    async def stream_alert(self, contacts: Iterable[Union[str, Tuple[str, str]]], alert_type: str,
+                           language: str = "fr", chunk_size: int = 256,
+                           concurrency: int = 64) -> AsyncIterator[Dict]:
+        """
+        📢 Envoi par lots, `concurrency` envois simultanés au plus
+        
+        contacts: numéros, ou couples (numéro, langue) pour une alerte
+        localisée par contact. Le message est rendu une fois par langue.
+        Les résultats sont produits lot par lot, dans l'ordre des contacts,
+        pendant que le lot suivant est déjà en cours d'envoi.
+        """
+        messages = {}
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        def message_for(contact_language):
+            message = messages.get(contact_language)
+            if message is None:
+                message = messages[contact_language] = TEMPLATE_REGISTRY.render(
+                    f"alert.{alert_type}", contact_language, default="🔔 Notification")
+            return message
+        
+        async def deliver(contact, contact_language):
+            async with semaphore:
+                try:
+                    result = await self.send_message(contact, message_for(contact_language))
+                except Exception as e:
+                    return {'contact': contact, 'language': contact_language,
+                            'success': False, 'error': str(e) or type(e).__name__}
+            return {'contact': contact, 'language': contact_language,
+                    'success': True, 'result': result}
+        
+        def start_chunk(chunk):
+            return asyncio.ensure_future(asyncio.gather(*(
+                deliver(*entry) if isinstance(entry, tuple) else deliver(entry, language)
+                for entry in chunk
+            )))
+        
+        iterator = iter(contacts)
+        in_flight = deque()
+        try:
+            while True:
+                # Deux lots en vol : le suivant part pendant qu'on consomme le courant
+                while len(in_flight) < 2:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    in_flight.append(start_chunk(chunk))
+                if not in_flight:
+                    return
+                for delivery in await in_flight.popleft():
+                    yield delivery
+        finally:
+            for pending in in_flight:
+                pending.cancel()
 
 async def test_signal_agent():
     print("🧪 TEST SIGNAL AGENT ALGERIA")
@@ -59,7 +113,15 @@ async def test_signal_agent():
     contacts = ["+213555111222", "+213555333444"]
     await agent.broadcast_alert(contacts, "deadline_fiscal", "fr")
     
+    # Test envoi par lots, langue par contact
+    contacts = [(f"+21355500{i:04d}", ('fr', 'ar', 'ber')[i % 3]) for i in range(1000)]
+    delivered = 0
+    async for delivery in agent.stream_alert(contacts, "deadline_fiscal", chunk_size=100):
+        delivered += delivery['success']
+    print(f"📢 {delivered}/{len(contacts)} alertes livrées par lots")
+    
     print("✅ Signal Agent opérationnel et sécurisé!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     asyncio.run(test_signal_agent())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔐 Démon signal-cli persistant (JSON-RPC sur stdio)
+Un seul processus JVM pour tous les envois : requêtes concurrentes
+multiplexées par id, redémarrage automatique en cas de plantage
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger('SignalDaemon')
+
+# Les notifications `receive` peuvent contenir des pièces jointes volumineuses
+_LINE_LIMIT = 16 * 1024 * 1024
+
+
+class SignalDaemonError(Exception):
+    """Démon indisponible (arrêté, planté) ou délai de réponse dépassé"""
+
+
+class SignalRpcError(SignalDaemonError):
+    """Erreur JSON-RPC retournée par signal-cli"""
+
+    def __init__(self, error: Dict):
+        super().__init__(error.get('message', 'erreur signal-cli'))
+        self.code = error.get('code')
+        self.data = error.get('data')
+
+
+class SignalDaemon:
+    """🔐 Client du mode `signal-cli jsonRpc` (une requête JSON par ligne)
+
+    - request() peut être appelée en parallèle : chaque réponse est rendue
+      à son appelant grâce à l'id JSON-RPC, quel que soit l'ordre d'arrivée
+    - si le processus meurt, les requêtes en cours échouent (SignalDaemonError)
+      et le démon est relancé avec un délai croissant ; les nouvelles
+      requêtes attendent le redémarrage
+    - les messages sans id (notifications `receive`) vont à `on_notification`
+    """
+
+    def __init__(self, command: Sequence[str], request_timeout: float = 30.0,
+                 restart_delay: float = 0.5, max_restart_delay: float = 30.0,
+                 on_notification: Optional[Callable[[Dict], None]] = None):
+        self.command = list(command)
+        self.request_timeout = request_timeout
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.on_notification = on_notification
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self.restarts = 0
+        self.requests = 0
+
+    @classmethod
+    def for_account(cls, account: str, signal_cli_path: str = "signal-cli",
+                    config_dir: Optional[str] = None, **options) -> 'SignalDaemon':
+        command: List[str] = [signal_cli_path]
+        if config_dir:
+            command += ['--config', config_dir]
+        command += ['-a', account, 'jsonRpc']
+        return cls(command, **options)
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self, timeout: Optional[float] = None):
+        """Lance le démon (et sa supervision) puis attend qu'il soit prêt
+
+        Binaire absent ou non exécutable : SignalDaemonError immédiate.
+        """
+        if self._supervisor is None or self._supervisor.done():
+            self._closing = False
+            self._ready = asyncio.Event()
+            self._write_lock = asyncio.Lock()
+            self._supervisor = asyncio.ensure_future(self._supervise())
+            # Erreur marquée comme lue même si aucun appelant n'attend
+            self._supervisor.add_done_callback(lambda done: done.cancelled() or done.exception())
+        if self._ready.is_set():
+            return
+        ready = asyncio.ensure_future(self._ready.wait())
+        try:
+            await asyncio.wait((ready, self._supervisor), timeout=timeout,
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            ready.cancel()
+        if self._ready.is_set():
+            return
+        if self._supervisor.done() and not self._supervisor.cancelled():
+            raise self._supervisor.exception() or SignalDaemonError("démon signal-cli arrêté")
+        raise SignalDaemonError(f"démon signal-cli non démarré après {timeout}s")
+
+    async def _supervise(self):
+        delay = self.restart_delay
+        while not self._closing:
+            started = time.monotonic()
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self.command,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    limit=_LINE_LIMIT
+                )
+            except (FileNotFoundError, PermissionError) as e:
+                # Relancer ne changera rien : l'erreur remonte à start()
+                self._process = None
+                raise SignalDaemonError(f"signal-cli introuvable ou non exécutable: {e}") from e
+            except OSError as e:
+                logger.error(f"❌ Lancement signal-cli impossible: {e}")
+                self._process = None
+            else:
+                self._ready.set()
+                await self._read_responses(self._process)
+                self._ready.clear()
+                self._fail_pending(SignalDaemonError(
+                    f"démon signal-cli arrêté (code {self._process.returncode})"))
+
+            if self._closing:
+                break
+            # Délai remis à zéro après une minute de fonctionnement normal
+            if time.monotonic() - started > 60.0:
+                delay = self.restart_delay
+            self.restarts += 1
+            logger.warning(f"🔁 Redémarrage signal-cli dans {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(self.max_restart_delay, delay * 2)
+
+    async def _read_responses(self, process):
+        while True:
+            try:
+                line = await process.stdout.readline()
+            except (ValueError, asyncio.LimitOverrunError) as e:
+                logger.error(f"❌ Ligne signal-cli illisible: {e}")
+                continue
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.warning(f"⚠️ Sortie signal-cli non JSON ignorée: {line[:200]!r}")
+                continue
+
+            future = self._pending.pop(message.get('id'), None) if 'id' in message else None
+            if future is not None:
+                if future.done():
+                    continue
+                if 'error' in message:
+                    future.set_exception(SignalRpcError(message['error']))
+                else:
+                    future.set_result(message.get('result'))
+            elif 'method' in message and self.on_notification is not None:
+                try:
+                    self.on_notification(message)
+                except Exception as e:
+                    logger.error(f"❌ Notification signal-cli: {e}")
+        await process.wait()
+
+    def _fail_pending(self, error: Exception):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def request(self, method: str, params: Optional[Dict] = None,
+                      timeout: Optional[float] = None):
+        """Appel JSON-RPC : retourne `result` ou lève SignalRpcError / SignalDaemonError"""
+        if self._closing:
+            raise SignalDaemonError("démon signal-cli fermé")
+        timeout = self.request_timeout if timeout is None else timeout
+        await self.start(timeout)
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        payload = {'jsonrpc': '2.0', 'method': method, 'id': request_id}
+        if params:
+            payload['params'] = params
+        self.requests += 1
+
+        try:
+            async with self._write_lock:
+                process = self._process
+                process.stdin.write(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n')
+                await process.stdin.drain()
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise SignalDaemonError(f"pas de réponse de signal-cli à {method} en {timeout}s")
+        except (ConnectionError, AttributeError) as e:
+            raise SignalDaemonError(f"démon signal-cli indisponible: {e}")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def send(self, recipient: str, message: str) -> Dict:
+        """📤 Envoi d'un message (méthode `send` de signal-cli)"""
+        return await self.request('send', {'recipient': [recipient], 'message': message})
+
+    async def close(self, timeout: float = 5.0):
+        """Arrête le démon (fin de stdin, puis terminate si nécessaire)"""
+        self._closing = True
+        process = self._process
+        if process is not None and process.returncode is None:
+            process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.terminate()
+                await process.wait()
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except (asyncio.CancelledError, SignalDaemonError):
+                pass
+            self._supervisor = None
+        self._fail_pending(SignalDaemonError("démon signal-cli fermé"))
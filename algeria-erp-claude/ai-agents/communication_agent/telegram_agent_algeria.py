@@ -1,20 +1,86 @@
 ﻿import asyncio
 import logging
+import re
+
+from http_client_algeria import HttpClient
+
+logger = logging.getLogger('TelegramAgent')
+
+TELEGRAM_API_BASE = "https://api.telegram.org"
+
+def _irg_query(args):
+    salary, _, children = args.partition(' ')
+    query = f"IRG pour salaire {salary} DZD"
+    return f"{query} avec {children.strip()} enfant" if children.strip() else query
+
+# Commande -> (réponse fixe, requête fiscale construite à partir des arguments ou None)
+# `/tva 150000` est transmis à FiscalAiAgent ; `/tva` seul répond le texte fixe
+COMMANDS = {
+    'start': ("🇩🇿 Bienvenue ERP Algeria via Telegram!", None),
+    'tva': ("💰 Calcul TVA Algeria: 19% normal, 9% réduit, 0% export",
+            lambda args: f"Calculer la TVA sur {args} DZD"),
+    'irg': ("💼 IRG Algeria: barème progressif - /irg <salaire> [enfants]", _irg_query),
+    'help': ("ℹ️ Commandes: /start, /tva <montant HT>, /irg <salaire> [enfants] - "
+             "ou posez votre question fiscale", None),
+}
+
+UNKNOWN_COMMAND = "❓ Commande inconnue. Tapez /help"
+
+# /commande[@nom_du_bot] [arguments]
+COMMAND_RE = re.compile(r'/([A-Za-z0-9_]+)(?:@[A-Za-z0-9_]+)?(?:\s+(.*))?\Z', re.S)
+
+def parse_command(text):
+    """(commande, arguments) pour un texte commençant par '/', sinon None"""
+    match = COMMAND_RE.match(text) if text.startswith('/') else None
+    if match is None:
+        return None
+    return match.group(1).lower(), (match.group(2) or '').strip()
 
 class TelegramAgentAlgeria:
-    def __init__(self, bot_token):
+    def __init__(self, bot_token, http_client: HttpClient = None, api_base=TELEGRAM_API_BASE,
+                 fiscal_agent=None):
         self.bot_token = bot_token
-        print("📱 Telegram Agent Algeria initialisé")
+        # Client HTTP partagé (pool keep-alive) ; None = envoi simulé
+        self.http_client = http_client
+        self.api_base = api_base
+        # Requêtes fiscales (/tva 150000, texte libre) ; None = réponses fixes uniquement
+        self.fiscal_agent = fiscal_agent
+        self.commands = COMMANDS
+        logger.info("📱 Telegram Agent Algeria initialisé")
+    
+    async def call_api(self, method, payload=None, timeout=None):
+        """Appel Bot API : retourne `result` ou lève HttpError"""
+        response = await self.http_client.post(
+            f"{self.api_base}/bot{self.bot_token}/{method}", json=payload or {}, timeout=timeout)
+        return response.raise_for_status().json()['result']
     
     async def send_message(self, chat_id, text):
-        return f"📤 Telegram: {text}"
+        if self.http_client is None:
+            return f"📤 Telegram: {text}"
+        return await self.call_api('sendMessage', {'chat_id': chat_id, 'text': text})
+    
+    def route(self, text):
+        """
+        🧭 Aiguillage d'un message : ('reply', texte) pour une réponse fixe,
+        ('fiscal', requête) pour une requête à transmettre à FiscalAiAgent
+        """
+        parsed = parse_command(text)
+        if parsed is None:
+            return 'fiscal', text
+        name, args = parsed
+        entry = self.commands.get(name)
+        if entry is None:
+            return 'reply', UNKNOWN_COMMAND
+        reply, build_query = entry
+        if args and build_query is not None:
+            return 'fiscal', build_query(args)
+        return 'reply', reply
     
     async def process_command(self, command):
-        if command == "/start":
-            return "🇩🇿 Bienvenue ERP Algeria via Telegram!"
-        elif command == "/tva":
-            return "💰 Calcul TVA Algeria: 19% normal, 9% réduit, 0% export"
-        else:
-            return "❓ Commande inconnue. Tapez /help"
-
-print("✅ Telegram Agent Algeria ready!")
+        kind, value = self.route(command)
+        if kind == 'reply':
+            return value
+        if self.fiscal_agent is None:
+            return COMMANDS['help'][0]
+        result = await self.fiscal_agent.process_fiscal_query(value)
+        return result.get('response') or COMMANDS['help'][0]
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📥 Réception des mises à jour Telegram Algeria
+Long-polling getUpdates par lots (offset confirmé au lot suivant) ou
+webhook ; aiguillage par table de commandes et traitement concurrent,
+requêtes fiscales transmises par lots à FiscalAiAgent
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from http_client_algeria import HttpError
+from telegram_agent_algeria import COMMANDS
+
+logger = logging.getLogger('TelegramUpdates')
+
+# Types de mises à jour demandés à l'API (les autres ne sont pas transmis)
+ALLOWED_UPDATES = ('message', 'edited_message')
+
+
+class TelegramUpdateDispatcher:
+    """🧭 Traitement d'un lot de mises à jour
+
+    Chaque lot est décodé une fois : les commandes à réponse fixe sont
+    résolues par la table de l'agent (TelegramAgentAlgeria.route), les
+    requêtes fiscales du lot partent ensemble dans
+    FiscalAiAgent.process_fiscal_queries (pool de threads persistant), puis
+    toutes les réponses sont envoyées en parallèle (`concurrency` au plus).
+    """
+
+    def __init__(self, agent, fiscal_agent=None, concurrency: int = 64, workers: int = 4,
+                 fiscal_executor: Optional[Executor] = None):
+        self.agent = agent
+        self.fiscal_agent = fiscal_agent if fiscal_agent is not None else agent.fiscal_agent
+        self._send_slots = asyncio.Semaphore(concurrency)
+        self._fiscal_executor = fiscal_executor
+        self._owns_executor = fiscal_executor is None
+        self.workers = workers
+        self.stats = {'updates': 0, 'ignored': 0, 'commands': 0, 'fiscal': 0,
+                      'sent': 0, 'errors': 0}
+
+    @staticmethod
+    def parse(update: Dict) -> Optional[tuple]:
+        """(chat_id, texte) d'une mise à jour, None si elle ne contient pas de texte"""
+        message = update.get('message') or update.get('edited_message')
+        if not message or 'text' not in message:
+            return None
+        return message['chat']['id'], message['text']
+
+    async def dispatch(self, updates: List[Dict]):
+        """⚙️ Réponses d'un lot de mises à jour"""
+        replies: List[tuple] = []
+        fiscal_chats: List[int] = []
+        fiscal_queries: List[str] = []
+
+        for update in updates:
+            self.stats['updates'] += 1
+            parsed = self.parse(update)
+            if parsed is None:
+                self.stats['ignored'] += 1
+                continue
+            chat_id, text = parsed
+            kind, value = self.agent.route(text)
+            if kind == 'fiscal' and self.fiscal_agent is not None:
+                fiscal_chats.append(chat_id)
+                fiscal_queries.append(value)
+            else:
+                self.stats['commands'] += 1
+                replies.append((chat_id, value if kind == 'reply' else COMMANDS['help'][0]))
+
+        if fiscal_queries:
+            if self._fiscal_executor is None:
+                self._fiscal_executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                           thread_name_prefix='telegram-fiscal')
+            async for result in self.fiscal_agent.process_fiscal_queries(
+                    fiscal_queries, concurrency=len(fiscal_queries),
+                    executor=self._fiscal_executor, ordered=False):
+                self.stats['fiscal'] += 1
+                replies.append((fiscal_chats[result['index']],
+                                result.get('response') or COMMANDS['help'][0]))
+
+        await asyncio.gather(*(self._send(chat_id, text) for chat_id, text in replies))
+
+    async def _send(self, chat_id, text):
+        async with self._send_slots:
+            try:
+                await self.agent.send_message(chat_id, text)
+                self.stats['sent'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Réponse Telegram à {chat_id}: {e}")
+
+    def close(self):
+        if self._owns_executor and self._fiscal_executor is not None:
+            self._fiscal_executor.shutdown(wait=False)
+            self._fiscal_executor = None
+
+
+class TelegramUpdatePoller:
+    """📥 Boucle getUpdates (long-polling) avec suivi d'offset
+
+    Dès qu'un lot arrive, l'offset avance au-delà de sa dernière mise à jour
+    et le lot part en traitement pendant que la requête suivante attend les
+    nouveaux messages (`max_batches` lots en cours au plus). Telegram
+    considère un lot confirmé à la requête suivante : en cas d'arrêt brutal,
+    les lots encore en traitement ne sont pas redistribués.
+    """
+
+    def __init__(self, agent, dispatcher: Optional[TelegramUpdateDispatcher] = None,
+                 limit: int = 100, timeout: int = 25, max_batches: int = 8,
+                 retry_delay: float = 1.0, max_retry_delay: float = 30.0):
+        self.agent = agent
+        self.dispatcher = dispatcher or TelegramUpdateDispatcher(agent)
+        self.limit = limit
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.offset = 0
+        self.polls = 0
+        self.batches = 0
+        self._batch_slots = asyncio.Semaphore(max_batches)
+        self._tasks = set()
+        self._runner: Optional[asyncio.Task] = None
+
+    async def run(self):
+        delay = self.retry_delay
+        while True:
+            await self._batch_slots.acquire()
+            try:
+                updates = await self.agent.call_api('getUpdates', {
+                    'offset': self.offset,
+                    'limit': self.limit,
+                    'timeout': self.timeout,
+                    'allowed_updates': list(ALLOWED_UPDATES)
+                }, timeout=self.timeout + 10)
+            except (HttpError, ConnectionError, OSError) as e:
+                self._batch_slots.release()
+                logger.warning(f"⚠️ getUpdates: {e} - nouvel essai dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(self.max_retry_delay, delay * 2)
+                continue
+            except BaseException:
+                self._batch_slots.release()
+                raise
+
+            delay = self.retry_delay
+            self.polls += 1
+            if not updates:
+                self._batch_slots.release()
+                continue
+            self.offset = updates[-1]['update_id'] + 1
+            self.batches += 1
+            task = asyncio.ensure_future(self._dispatch(updates))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, updates: List[Dict]):
+        try:
+            await self.dispatcher.dispatch(updates)
+        except Exception as e:
+            self.dispatcher.stats['errors'] += len(updates)
+            logger.error(f"❌ Lot Telegram: {e}")
+        finally:
+            self._batch_slots.release()
+
+    def start(self) -> asyncio.Task:
+        """Lance la boucle en tâche de fond"""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self.run())
+        return self._runner
+
+    async def drain(self):
+        """Attend la fin des lots en cours de traitement"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    async def stop(self):
+        """Arrête la boucle, termine les lots reçus et confirme l'offset auprès de l'API"""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        await self.drain()
+        if self.offset:
+            try:
+                await self.agent.call_api('getUpdates', {'offset': self.offset, 'limit': 1,
+                                                         'timeout': 0})
+            except (HttpError, ConnectionError, OSError) as e:
+                logger.warning(f"⚠️ Confirmation de l'offset {self.offset}: {e}")
+        self.dispatcher.close()
+
+
+class TelegramWebhookHandler:
+    """🔗 Mode webhook (setWebhook) : une mise à jour par requête HTTP
+
+    handle() vérifie l'en-tête X-Telegram-Bot-Api-Secret-Token puis
+    regroupe les mises à jour reçues pendant `batch_delay` secondes avant de
+    les passer au dispatcher ; le serveur HTTP répond sans attendre.
+    """
+
+    def __init__(self, dispatcher: TelegramUpdateDispatcher, secret_token: Optional[str] = None,
+                 batch_size: int = 100, batch_delay: float = 0.01):
+        self.dispatcher = dispatcher
+        self.secret_token = secret_token
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._pending: List[Dict] = []
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def register(self, url: str):
+        """Déclare l'URL du webhook auprès de l'API"""
+        payload = {'url': url, 'allowed_updates': list(ALLOWED_UPDATES)}
+        if self.secret_token:
+            payload['secret_token'] = self.secret_token
+        return await self.dispatcher.agent.call_api('setWebhook', payload)
+
+    def handle(self, body: bytes, headers: Dict[str, str]) -> int:
+        """Statut HTTP à renvoyer à Telegram (en-têtes en minuscules)"""
+        if self.secret_token is not None:
+            # Comparaison en octets : un en-tête non ASCII est refusé, pas une TypeError
+            token = headers.get('x-telegram-bot-api-secret-token', '').encode('latin-1')
+            if not hmac.compare_digest(token, self.secret_token.encode()):
+                return 403
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return 400
+        self._pending.append(update)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self._flush)
+        return 200
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self.dispatcher.dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def drain(self):
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
@@ -12,115 +12,85 @@ import re
 from datetime import datetime
 from typing import Dict, List, Optional
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from http_client_algeria import HttpClient
+from language_detector_algeria import get_detector
+from session_store_algeria import SessionStore
+from templates_algeria import REGISTRY as TEMPLATE_REGISTRY
+
 logger = logging.getLogger('WhatsAppAgent')
 
+WELCOME_COMMANDS = ('salut', 'bonjour', 'hello', 'hi', 'مرحبا', 'السلام', 'azul')
+
+GRAPH_API_BASE = "https://graph.facebook.com/v19.0"
+
 class WhatsAppConfig:
-    def __init__(self, access_token, phone_number_id, verify_token, webhook_url):
+    def __init__(self, access_token, phone_number_id, verify_token, webhook_url,
+                 http_client: Optional[HttpClient] = None, api_base=GRAPH_API_BASE):
         self.access_token = access_token
         self.phone_number_id = phone_number_id
         self.verify_token = verify_token
         self.webhook_url = webhook_url
         self.business_name = "Algeria ERP by Claude"
+        # Client HTTP partagé (pool keep-alive) ; None = envoi simulé
+        self.http_client = http_client
+        self.api_base = api_base
 
 class WhatsAppAgent:
-    def __init__(self, config):
+    def __init__(self, config, sessions: Optional[SessionStore] = None):
         self.config = config
-        self.templates = {
-            'welcome': {
-                'ar': """🇩🇿 أهلاً في نظام إدارة الأعمال الجزائري
-🤖 مساعدك الذكي للضرائب والمحاسبة
-📱 أستطيع مساعدتك في:
-- حساب ضريبة القيمة المضافة (TVA)
-- حساب ضريبة الدخل الإجمالي (IRG)
-- الإقرارات الضريبية
-
-أرسل استفسارك بأي لغة تريد 👍""",
-                
-                'ar_dz': """🇩🇿 مرحبا بيك في السيستام تاع البيزنس الجزائري
-🤖 أنا المساعد الذكي تاعك للضرائب
-📱 نقدر نعاونك في:
-- حساب الضريبة (TVA)
-- ضريبة الراتب (IRG)
-- الإقرارات
-
-ابعتلي السؤال تاعك بأي لغة تحب 👍""",
-                
-                'fr': """🇩🇿 Bienvenue dans Algeria ERP by Claude
-🤖 Assistant intelligent fiscal et comptable
-📱 Je peux vous aider avec:
-- Calculs TVA Algeria
-- Calculs IRG progressif
-- Déclarations fiscales
-
-Posez votre question dans la langue de votre choix 👍""",
-                
-                'en': """🇩🇿 Welcome to Algeria ERP by Claude
-🤖 Your smart tax and accounting assistant
-📱 I can help you with:
-- Algeria VAT calculations
-- Progressive income tax (IRG)
-- Tax declarations
-
-Ask your question in any language 👍""",
-                
-                'ber': """🇩🇿 Ansuf-ik deg unagraw n tnebgi n Dzayer
-🤖 Amaɛiw-ik n tikti i tigawin
-📱 Zemreɣ ad k-ɛiwneɣ deg:
-- Asiḍen n tigawin (TVA)
-- Asiḍen n udem (IRG)
-- Tinnubga n tigawin
-
-Azen-iyi asteqsi s tutlayt i tebɣiḍ 👍"""
-            }
-        }
+        self.templates = TEMPLATE_REGISTRY
+        self.language_detector = get_detector()
+        self.sessions = sessions if sessions is not None else SessionStore(detector=self.language_detector)
         logger.info("📱 Agent WhatsApp Algeria 5 langues initialisé")
     
-    async def detect_language(self, text):
-        text_lower = text.lower()
-        
-        # Darija algérienne
-        darija_words = ['كيفاش', 'واش', 'بصح', 'هكاك', 'تاع', 'نتاع', 'دراري', 'كاش', 'ابعتلي']
-        if any(word in text_lower for word in darija_words):
-            return 'ar_dz'
-        
-        # Arabe standard
-        if re.search(r'[\u0600-\u06FF]', text):
-            return 'ar'
-        
-        # Amazigh
-        berber_latin = ['azul', 'tanemmirt', 'asiḍen', 'tigawin', 'tallalt', 'anagraw', 'zemreɣ', 'amaɛiw']
-        if any(word in text_lower for word in berber_latin):
-            return 'ber'
-        
-        # Anglais
-        english_words = ['hello', 'help', 'calculate', 'tax', 'vat', 'income', 'salary', 'how', 'what', 'when']
-        if any(word in text_lower for word in english_words):
-            return 'en'
-        
-        # Français
-        if re.search(r'[àâäéèêëïîôùûüÿç]', text) or any(word in text_lower for word in ['calculer', 'tva', 'irg', 'bonjour', 'aide']):
-            return 'fr'
+    @property
+    def http_client(self) -> Optional[HttpClient]:
+        return self.config.http_client
+    
+    @http_client.setter
+    def http_client(self, client: HttpClient):
+        self.config.http_client = client
+    
+    async def send_message(self, recipient, text):
+        """📤 Message texte via l'API Cloud ; retourne l'identifiant WhatsApp du message"""
+        if self.http_client is None:
+            return f"📤 WhatsApp → {recipient}: {text[:50]}..."
         
-        return 'fr'
+        response = await self.http_client.post(
+            f"{self.config.api_base}/{self.config.phone_number_id}/messages",
+            json={
+                'messaging_product': 'whatsapp',
+                'recipient_type': 'individual',
+                'to': recipient,
+                'type': 'text',
+                'text': {'body': text}
+            },
+            headers={'Authorization': f"Bearer {self.config.access_token}"}
+        )
+        return response.raise_for_status().json()['messages'][0]['id']
     
-    async def process_message(self, text):
+    async def detect_language(self, text, user_id=None):
+        """🌍 Langue du message ; avec `user_id`, la langue de la session est réutilisée"""
+        if user_id is None:
+            return self.language_detector.detect(text)
+        return self.sessions.detect_language(user_id, text)
+    
+    async def process_message(self, text, user_id=None):
         try:
-            language = await self.detect_language(text)
-            
-            welcome_commands = ['salut', 'bonjour', 'hello', 'hi', 'مرحبا', 'السلام', 'azul']
-            if any(cmd in text.lower() for cmd in welcome_commands):
-                return self.templates['welcome'].get(language, self.templates['welcome']['fr'])
+            # Conversation en cours : l'utilisateur a déjà été accueilli
+            greeted = user_id is not None and self.sessions.is_active(user_id)
+            language = await self.detect_language(text, user_id)
             
-            responses = {
-                'ar': f"تم استلام رسالتك باللغة العربية: {text[:50]}...",
-                'ar_dz': f"وصلت الرسالة بالدارجة الجزائرية: {text[:50]}...",
-                'fr': f"Message reçu en français: {text[:50]}...",
-                'en': f"Message received in English: {text[:50]}...",
-                'ber': f"Yewweḍ-d izen s teqbaylit: {text[:50]}..."
-            }
+            if not greeted:
+                text_lower = text.lower()
+                if any(cmd in text_lower for cmd in WELCOME_COMMANDS):
+                    if user_id is not None:
+                        self.sessions.remember(user_id, 'welcome')
+                    return self.templates.render('welcome', language)
             
-            return responses.get(language, responses['fr'])
+            if user_id is not None:
+                self.sessions.remember(user_id, 'general')
+            return self.templates.render('message_received', language, {'excerpt': text[:50]})
             
         except Exception as e:
             logger.error(f"Erreur: {e}")
@@ -164,4 +134,5 @@ async def test_agent():
     print("\n✅ Tests terminés - Agent 5 langues opérationnel!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     asyncio.run(test_agent())
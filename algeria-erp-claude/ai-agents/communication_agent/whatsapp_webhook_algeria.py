@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📥 Réception des webhooks WhatsApp Cloud Algeria
+Acquittement immédiat, file bornée, déduplication par id de message sur
+fenêtre glissante, micro-lots vers WhatsAppAgent et FiscalAiAgent
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger('WhatsAppWebhook')
+
+_MAX_BODY = 4 * 1024 * 1024  # Meta envoie des lots de quelques Ko
+
+
+class TimeWindowDedupe:
+    """🧮 Ensemble d'ids vus pendant `window` secondes, au plus `maxsize` entrées
+
+    L'ordre d'insertion est l'ordre chronologique : les entrées expirées
+    sont toujours en tête et purgées à chaque ajout (coût amorti O(1)).
+    """
+
+    def __init__(self, window: float = 3600.0, maxsize: int = 200_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.maxsize = maxsize
+        self._clock = clock
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self.duplicates = 0
+
+    def seen(self, key: str) -> bool:
+        """True si `key` a déjà été vue dans la fenêtre ; sinon l'enregistre"""
+        now = self._clock()
+        seen = self._seen
+        while seen:
+            oldest = next(iter(seen.values()))
+            if now - oldest < self.window and len(seen) < self.maxsize:
+                break
+            seen.popitem(last=False)
+
+        if key in seen:
+            self.duplicates += 1
+            return True
+        seen[key] = now
+        return False
+
+    def forget(self, key: str):
+        """Retire `key` (traitement échoué : le prochain renvoi sera traité)"""
+        self._seen.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+def extract_messages(payload: Dict) -> List[Dict]:
+    """Messages entrants d'une notification Meta (les statuts de livraison sont ignorés)"""
+    messages = []
+    for entry in payload.get('entry', ()):
+        for change in entry.get('changes', ()):
+            value = change.get('value', {})
+            names = {contact.get('wa_id'): contact.get('profile', {}).get('name')
+                     for contact in value.get('contacts', ())}
+            for message in value.get('messages', ()):
+                if message.get('type') == 'text':
+                    text = message.get('text', {}).get('body', '')
+                elif message.get('type') == 'interactive':
+                    reply = message.get('interactive', {})
+                    text = (reply.get('button_reply') or reply.get('list_reply') or {}).get('title', '')
+                else:
+                    continue
+                messages.append({
+                    'id': message.get('id'),
+                    'from': message.get('from'),
+                    'name': names.get(message.get('from')),
+                    'timestamp': message.get('timestamp'),
+                    'text': text
+                })
+    return messages
+
+
+class WhatsAppWebhookReceiver:
+    """📥 Serveur de webhooks (HTTP/1.1 keep-alive, asyncio)
+
+    Le chemin d'acquittement ne fait que lire le corps, vérifier la
+    signature et le déposer dans une file bornée : sa latence ne dépend pas
+    de la charge de traitement. File pleine -> 503, Meta renverra plus tard
+    (et la déduplication absorbera le doublon).
+
+    En aval, les messages dédupliqués sont regroupés par lots de
+    `batch_size` (ou après `batch_delay` secondes) : les requêtes fiscales
+    passent par FiscalAiAgent.process_fiscal_queries dans un pool de
+    threads, les autres par WhatsAppAgent.process_message (session de
+    l'expéditeur : langue collante, dernière intention). Chaque réponse
+    est transmise à `on_reply(message, réponse)`, ou à
+    whatsapp_agent.send_message par défaut.
+    """
+
+    def __init__(self, whatsapp_agent, fiscal_agent=None, path: str = '/webhook',
+                 app_secret: Optional[str] = None, queue_size: int = 10_000,
+                 batch_size: int = 64, batch_delay: float = 0.02, workers: int = 4,
+                 dedupe: Optional[TimeWindowDedupe] = None,
+                 fiscal_executor: Optional[Executor] = None,
+                 on_reply: Optional[Callable] = None):
+        self.whatsapp_agent = whatsapp_agent
+        self.fiscal_agent = fiscal_agent
+        self.path = path
+        self.verify_token = whatsapp_agent.config.verify_token
+        self.app_secret = app_secret.encode() if app_secret else None
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.workers = workers
+        self.dedupe = dedupe or TimeWindowDedupe()
+        self.on_reply = on_reply
+        self._fiscal_executor = fiscal_executor
+        self._owns_executor = fiscal_executor is None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._server = None
+        self._tasks: List[asyncio.Task] = []
+        self._batch: List[Dict] = []
+        self.stats = {
+            'received': 0, 'rejected': 0, 'invalid_signature': 0, 'messages': 0,
+            'duplicates': 0, 'batches': 0, 'processed': 0, 'fiscal': 0, 'errors': 0
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    async def start(self, host: str = '0.0.0.0', port: int = 8080):
+        if self.fiscal_agent is not None and self._fiscal_executor is None:
+            self._fiscal_executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                       thread_name_prefix='webhook-fiscal')
+        self._batches: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        self._tasks = [asyncio.ensure_future(self._batcher())]
+        self._tasks += [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📥 Webhook WhatsApp en écoute sur {host}:{self.port}{self.path}")
+        return self
+
+    async def drain(self):
+        """Attend le traitement de tout ce qui a été acquitté"""
+        while True:
+            await self._queue.join()
+            await self._batches.join()
+            if not self._batch:
+                return
+            await asyncio.sleep(self.batch_delay)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._owns_executor and self._fiscal_executor is not None:
+            self._fiscal_executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return await self.start('127.0.0.1', 0)
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    # ------------------------------------------------------------------
+    # HTTP : acquittement immédiat
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > _MAX_BODY:
+                    writer.write(self._response(413, b''))
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, content = self._dispatch(method, target, headers, body)
+                writer.write(self._response(status, content))
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _response(status: int, content: bytes) -> bytes:
+        reasons = {200: 'OK', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+                   413: 'Payload Too Large', 503: 'Service Unavailable'}
+        return (f"HTTP/1.1 {status} {reasons.get(status, 'Error')}\r\n"
+                f"Content-Type: text/plain\r\nContent-Length: {len(content)}\r\n\r\n"
+                ).encode('latin-1') + content
+
+    def _dispatch(self, method: str, target: str, headers: Dict, body: bytes):
+        parts = urlsplit(target)
+        if parts.path != self.path:
+            return 404, b''
+        if method == 'GET':
+            # Vérification de l'abonnement (hub.challenge)
+            query = parse_qs(parts.query)
+            if (query.get('hub.mode', [''])[0] == 'subscribe'
+                    and query.get('hub.verify_token', [''])[0] == self.verify_token):
+                return 200, query.get('hub.challenge', [''])[0].encode()
+            return 403, b''
+        if method != 'POST':
+            return 405, b''
+
+        self.stats['received'] += 1
+        if self.app_secret is not None:
+            expected = b'sha256=' + hmac.new(self.app_secret, body, hashlib.sha256).hexdigest().encode()
+            # Comparaison en octets : un en-tête non ASCII est refusé, pas une TypeError
+            signature = headers.get('x-hub-signature-256', '').encode('latin-1')
+            if not hmac.compare_digest(expected, signature):
+                self.stats['invalid_signature'] += 1
+                return 403, b''
+        try:
+            self._queue.put_nowait(body)
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            return 503, b''
+        return 200, b'EVENT_RECEIVED'
+
+    # ------------------------------------------------------------------
+    # Traitement : décodage, déduplication, micro-lots
+    # ------------------------------------------------------------------
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                body = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                body = None
+            else:
+                try:
+                    messages = extract_messages(json.loads(body))
+                except ValueError:
+                    logger.warning("⚠️ Webhook WhatsApp non JSON ignoré")
+                    messages = []
+                finally:
+                    self._queue.task_done()
+                for message in messages:
+                    self.stats['messages'] += 1
+                    if message['id'] and self.dedupe.seen(message['id']):
+                        self.stats['duplicates'] += 1
+                        continue
+                    self._batch.append(message)
+                    if deadline is None:
+                        deadline = loop.time() + self.batch_delay
+
+            if self._batch and (len(self._batch) >= self.batch_size or body is None):
+                batch, self._batch, deadline = self._batch, [], None
+                await self._batches.put(batch)
+
+    async def _worker(self):
+        while True:
+            batch = await self._batches.get()
+            try:
+                await self.process_batch(batch)
+            except Exception as e:
+                self.stats['errors'] += len(batch)
+                logger.error(f"❌ Lot webhook: {e}")
+                for message in batch:
+                    self._forget(message)
+            finally:
+                self._batches.task_done()
+
+    async def process_batch(self, batch: List[Dict]):
+        """⚙️ Réponses d'un micro-lot : calcul fiscal si reconnu, sinon agent WhatsApp"""
+        self.stats['batches'] += 1
+        replies: List[Optional[str]] = [None] * len(batch)
+        sessions = self.whatsapp_agent.sessions
+
+        if self.fiscal_agent is not None:
+            async for result in self.fiscal_agent.process_fiscal_queries(
+                    [message['text'] for message in batch], concurrency=len(batch),
+                    executor=self._fiscal_executor):
+                if result.get('success') and result.get('calculation_type') in ('tva', 'irg'):
+                    replies[result['index']] = result['response']
+                    sessions.remember(batch[result['index']]['from'], result['calculation_type'],
+                                      result.get('entities'))
+                    self.stats['fiscal'] += 1
+
+        for position, message in enumerate(batch):
+            if replies[position] is None:
+                replies[position] = await self.whatsapp_agent.process_message(
+                    message['text'], user_id=message['from'])
+
+        await asyncio.gather(*(self._reply(message, reply) for message, reply in zip(batch, replies)))
+        self.stats['processed'] += len(batch)
+
+    async def _reply(self, message: Dict, reply: str):
+        try:
+            if self.on_reply is not None:
+                result = self.on_reply(message, reply)
+                if asyncio.iscoroutine(result):
+                    await result
+            else:
+                await self.whatsapp_agent.send_message(message['from'], reply)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Réponse à {message['from']}: {e}")
+            self._forget(message)
+
+    def _forget(self, message: Dict):
+        # Message non répondu : un renvoi de Meta ne doit pas être pris pour un doublon
+        if message['id']:
+            self.dedupe.forget(message['id'])
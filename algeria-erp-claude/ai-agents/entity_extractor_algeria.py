@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔍 Extracteur d'entités fiscales Algeria - Passe unique
+Montants (avec devise), enfants, export/zone franche et scores TVA/IRG
+Support: العربية, الدارجة, Français, ⵜⴰⵎⴰⵣⵉⵖⵜ
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Mots-clés TVA par langue
+TVA_KEYWORDS = {
+    'ar': ['ضريبة', 'قيمة', 'مضافة'],
+    'ar_dz': ['ضريبة', 'تاع', 'البيع'],
+    'fr': ['tva', 'taxe', 'valeur', 'ajoutée'],
+    'ber': ['tigawin', 'azal', 'tmerci', 'asiḍen']  # taxes/valeur/commerce en amazigh
+}
+
+# Mots-clés IRG par langue
+IRG_KEYWORDS = {
+    'ar': ['ضريبة', 'دخل', 'راتب', 'أجر'],
+    'ar_dz': ['ضريبة', 'الراتب', 'الأجر'],
+    'fr': ['irg', 'impôt', 'revenu', 'salaire'],
+    'ber': ['tigawin', 'n', 'udem', 'azref', 'ksebt']  # impôt du travail/salaire en amazigh
+}
+
+# Export / zone franche par langue
+EXPORT_KEYWORDS = {
+    'ar': ['تصدير', 'صادرات'],
+    'ar_dz': ['تصدير', 'صادرات'],
+    'fr': ['export', 'exportation'],
+    'ber': ['asifeḍ', 'tufɣa', 'azen']  # export/envoi en amazigh
+}
+
+ZONE_KEYWORDS = {
+    'ar': ['منطقة', 'حرة'],
+    'ar_dz': ['منطقة', 'حرة'],
+    'fr': ['zone', 'franche'],
+    'ber': ['tamnaḍt', 'tilelli', 'akal']  # zone libre en amazigh
+}
+
+# Mots "enfants" qui suivent un nombre (toutes langues)
+CHILDREN_WORDS = [
+    'أطفال', 'أولاد', 'طفل', 'دراري', 'ولاد',
+    'enfants', 'enfant',
+    'arrac', 'mmi', 'tarwa', 'uqcic'
+]
+
+CURRENCY_WORDS = ['dzd', 'da', 'dinars', 'dinar', 'دج', 'دينار', 'idrimen']
+
+# Nombre complet : (?!\d) empêche de couper 5000 en 500 + 0
+_NUMBER = r'\d{1,3}(?:[\s,.]?\d{3})*(?:[.,]\d{1,2})?(?!\d)'
+_NON_DIGIT = re.compile(r'\D')
+_NOT_LETTER_BEFORE = r'(?<![^\W\d_])'
+_NOT_LETTER_AFTER = r'(?![^\W\d_])'
+# Proclitiques arabes admis devant un mot-clé (الضريبة, والتصدير...)
+_AR_PREFIX = r'(?:وال|بال|لل|ال|و|ب|ل)?'
+# Flexions admises après un mot-clé (pluriel, féminin, participe, pronoms arabes) : mot entier ensuite
+_SUFFIX = r'(?:ées|és|ée|es|é|e|s|ها|نا|كم|هم|ي|ك|ه)?'
+
+
+def _parse_amount(number: str) -> float:
+    """Montant saisi -> valeur ('100,50', '1 234 567,89', '1.234.567', '150000.125')
+
+    Le dernier séparateur est décimal s'il est suivi d'un ou deux chiffres,
+    ou précédé de plus de trois chiffres sans groupement (pas un millier).
+    """
+    separator = max(number.rfind(','), number.rfind('.'))
+    if separator != -1:
+        integer, fraction = number[:separator], number[separator + 1:]
+        if len(fraction) <= 2 or (len(integer) > 3 and integer.isdigit()):
+            return float(f"{_NON_DIGIT.sub('', integer)}.{fraction}")
+    return float(_NON_DIGIT.sub('', number))
+
+
+def _stem(keyword: str) -> str:
+    """Mot-clé arabe sans article (الراتب -> راتب), le préfixe étant optionnel au scan"""
+    if keyword.startswith('ال') and len(keyword) > 3:
+        return keyword[2:]
+    return keyword
+
+
+def _alternation(words) -> str:
+    """Alternative regex, mots les plus longs d'abord"""
+    return '|'.join(re.escape(word) for word in sorted(set(words), key=len, reverse=True))
+
+
+class FiscalQueryExtractor:
+    """🔍 Tokeniseur/extracteur précompilé : une seule passe par requête"""
+
+    def __init__(self):
+        keyword_tables = {
+            'tva': TVA_KEYWORDS,
+            'irg': IRG_KEYWORDS,
+            'export': EXPORT_KEYWORDS,
+            'zone': ZONE_KEYWORDS
+        }
+
+        # (catégorie, langue) -> radicaux attendus
+        self._keywords = {
+            (category, language): frozenset(_stem(word) for word in words)
+            for category, table in keyword_tables.items()
+            for language, words in table.items()
+        }
+        stems = set().union(*self._keywords.values())
+
+        self._pattern = re.compile(
+            rf'(?P<num>{_NUMBER})\s*'
+            rf'(?:(?P<cur>{_alternation(CURRENCY_WORDS)}){_NOT_LETTER_AFTER}'
+            rf'|(?P<kids>{_alternation(CHILDREN_WORDS)}))?'
+            rf'|{_NOT_LETTER_BEFORE}{_AR_PREFIX}(?P<kw>{_alternation(stems)}){_SUFFIX}'
+            rf'{_NOT_LETTER_AFTER}'
+        )
+
+    def extract(self, query: str, language: str) -> Dict:
+        """
+        🔍 Passe unique sur la requête
+
+        Retourne {'entities': ..., 'scores': {'tva': n, 'irg': n}} ; les
+        entités conservent les clés historiques (amount, children,
+        is_export, is_zone_franche) et ajoutent la liste `amounts`.
+        """
+        amounts: List[Dict] = []
+        children: Optional[int] = None
+        matched = set()
+
+        for match in self._pattern.finditer(query.lower()):
+            keyword = match.group('kw')
+            if keyword is not None:
+                matched.add(keyword)
+                continue
+
+            number = match.group('num')
+            if match.group('kids') is not None:
+                if children is None:
+                    children = int(_NON_DIGIT.sub('', number))
+                continue
+
+            amounts.append({
+                'value': _parse_amount(number),
+                'currency': 'DZD' if match.group('cur') else None
+            })
+
+        entities = {}
+        if amounts:
+            # Priorité au premier montant accompagné d'une devise
+            with_currency = [a for a in amounts if a['currency']]
+            entities['amount'] = (with_currency or amounts)[0]['value']
+            entities['amounts'] = amounts
+        if children is not None:
+            entities['children'] = children
+        if matched & self._keywords.get(('export', language), frozenset()):
+            entities['is_export'] = True
+        if matched & self._keywords.get(('zone', language), frozenset()):
+            entities['is_zone_franche'] = True
+
+        # Listes françaises par défaut pour les langues sans mots-clés dédiés
+        scoring_language = language if ('tva', language) in self._keywords else 'fr'
+        scores = {
+            'tva': len(matched & self._keywords[('tva', scoring_language)]),
+            'irg': len(matched & self._keywords[('irg', scoring_language)])
+        }
+
+        return {'entities': entities, 'scores': scores}
+
+    @staticmethod
+    def classify(scores: Dict[str, int]) -> str:
+        """🎯 Type de calcul à partir des scores TVA/IRG"""
+        if scores['tva'] > scores['irg']:
+            return 'tva'
+        elif scores['irg'] > 0:
+            return 'irg'
+        return 'general'
+
+
+_shared_extractor = None
+
+
+def get_extractor() -> FiscalQueryExtractor:
+    """Extracteur partagé (regex compilée une seule fois par processus)"""
+    global _shared_extractor
+    if _shared_extractor is None:
+        _shared_extractor = FiscalQueryExtractor()
+    return _shared_extractor
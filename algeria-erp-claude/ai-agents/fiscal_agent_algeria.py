@@ -9,94 +9,150 @@ Support: العربية, Français, الدارجة, ⵜⴰⵎⴰⵣⵉⵖⵜ
 import asyncio
 import json
 import logging
-from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, List, Optional
-import re
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from time import perf_counter_ns
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Union
 
-# Configuration logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from entity_extractor_algeria import get_extractor
+from fiscal_batch_algeria import calculate_irg_batch, calculate_tva_batch, to_centimes
+from language_detector_algeria import get_detector
+from pipeline_metrics_algeria import PipelineMetrics
+from result_cache_algeria import LruTtlCache
+from tax_rules_algeria import TaxRuleBook, TaxRuleTable, get_rule_book
+from templates_algeria import REGISTRY as TEMPLATE_REGISTRY
 
 logger = logging.getLogger('FiscalAiAgent')
 
+# Langues prises en charge par les modèles de réponse fiscaux
+FISCAL_LANGUAGES = ('ar', 'ar_dz', 'fr', 'ber')
+
 class FiscalAiAgent:
     """🧠 Agent IA pour calculs fiscaux algériens intelligents - Support 4 langues"""
     
-    def __init__(self):
-        # Base de connaissances fiscales Algeria 2025
-        self.tax_knowledge = {
-            'tva_rates': {
-                'normale': Decimal('19.00'),
-                'reduite': Decimal('9.00'),
-                'exoneree': Decimal('0.00')
-            },
-            'irg_brackets': [
-                {'min': 0, 'max': 120000, 'rate': Decimal('0.00')},
-                {'min': 120001, 'max': 360000, 'rate': Decimal('23.00')},
-                {'min': 360001, 'max': 1440000, 'rate': Decimal('27.00')},
-                {'min': 1440001, 'max': float('inf'), 'rate': Decimal('35.00')}
-            ],
-            'abattements_irg': {
-                'base': Decimal('10000'),
-                'par_enfant': Decimal('2500'),
-                'handicape_multiplier': Decimal('1.20')
-            }
-        }
+    def __init__(self, cache_size: int = 4096, cache_ttl: Optional[float] = 300.0,
+                 rule_book: Optional[TaxRuleBook] = None,
+                 metrics: Optional[PipelineMetrics] = None, enable_metrics: bool = True):
+        # Latences par étape du pipeline (enable_metrics=False pour désactiver)
+        self.metrics = metrics or (PipelineMetrics() if enable_metrics else None)
         
-        # Patterns reconnaissance langue étendus
-        self.language_patterns = {
-            'ar_dz': ['كيفاش', 'واش', 'بصح', 'هكاك', 'ديال', 'نتاع', 'ماشي', 'برك', 'دراري', 'ولاد'],
-            'ar': r'[\u0600-\u06FF]',
-            'fr': r'[àâäéèêëïîôùûüÿç]',
-            'ber': {
-                'tifinagh': r'[\u2D30-\u2D7F]',  # Script Tifinagh
-                'latin_keywords': [
-                    # Mots amazigh courants
-                    'deg', 'n', 'akken', 'ma', 'neɣ', 'ad', 'ur', 'ara',
-                    'amek', 'melmi', 'anda', 'ayenna', 'wid', 'tid',
-                    # Nombres
-                    'yiwen', 'sin', 'kraḍ', 'kkuẓ', 'semmus', 'sḍis',
-                    # Calculs/argent
-                    'asiḍen', 'tigawin', 'azref', 'idrimen', 'tamurt',
-                    # Berbère Kabyle
-                    'tizi', 'adrar', 'aman', 'tafukt', 'aggur',
-                    # Chaoui
-                    'amellal', 'aberkan', 'azegzaw', 'amellal',
-                    # Mozabite
-                    'taghardayt', 'bani', 'mzab',
-                    # Targui
-                    'tamashek', 'kel', 'akal'
-                ]
-            }
-        }
+        # Cache des réponses par requête normalisée (cache_size=0 pour désactiver)
+        self.response_cache = LruTtlCache(maxsize=cache_size, ttl=cache_ttl)
+        
+        # Base de connaissances fiscales : fichier versionné par exercice,
+        # partagé et rechargé à chaud (voir tax_rules_algeria)
+        self.rule_book = rule_book or get_rule_book()
+        self._pinned_rules = None
+        self._active_rules = None
+        
+        # Détecteur de langue partagé (lexiques compilés une seule fois)
+        self.language_detector = get_detector()
+        
+        # Extracteur d'entités partagé (regex précompilée)
+        self.entity_extractor = get_extractor()
         
         logger.info("🇩🇿 Agent Fiscal Algeria initialisé - Support 4 langues")
     
+    @property
+    def rules(self) -> TaxRuleTable:
+        """📚 Règles en vigueur (ou règles figées par affectation de tax_knowledge)"""
+        return self._pinned_rules or self.rule_book.current()
+    
+    def rules_for(self, period: Union[date, str, None] = None) -> TaxRuleTable:
+        """📅 Règles applicables à une période passée (date d'effet)"""
+        if period is None:
+            return self.rules
+        return self.rule_book.for_date(period)
+    
+    @property
+    def tax_knowledge(self):
+        """Vue en lecture seule des règles en vigueur"""
+        return self.rules.knowledge
+    
+    @tax_knowledge.setter
+    def tax_knowledge(self, knowledge: Dict):
+        # Règles propres à cet agent, hors fichier partagé
+        self._pinned_rules = TaxRuleTable(knowledge)
+        self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        """🔄 Vide le cache de réponses (automatique quand les règles changent)"""
+        self.response_cache.clear()
+    
+    def cache_stats(self) -> Dict:
+        """📊 Compteurs du cache de réponses (hits, misses, évictions...)"""
+        return self.response_cache.stats()
+    
+    @staticmethod
+    def _cache_key(language: str, calc_type: str, entities: Dict) -> tuple:
+        """Forme normalisée d'une requête : seuls les champs qui changent la réponse"""
+        if calc_type == 'general':
+            return (language, calc_type)
+        return (
+            language,
+            calc_type,
+            entities.get('amount', 0),
+            entities.get('children', 0),
+            bool(entities.get('is_export')),
+            bool(entities.get('is_zone_franche'))
+        )
+    
     async def process_fiscal_query(self, query: str, context: Dict = None) -> Dict:
         """🧠 Traitement intelligent des requêtes fiscales multilingues"""
+        return self._process_query(query, context)
+    
+    def _process_query(self, query: str, context: Dict = None) -> Dict:
+        """Pipeline complet, synchrone (tout le travail est CPU)"""
+        metrics = self.metrics
+        profiler = metrics.start_profile() if metrics is not None else None
+        clock = perf_counter_ns
         try:
+            # Règles rechargées depuis la dernière requête : réponses en cache périmées
+            rules = self.rules
+            if rules is not self._active_rules:
+                self._active_rules = rules
+                self.invalidate_cache()
+            
             # 1. Détection de langue
-            language = await self.detect_language(query)
+            t0 = clock()
+            language = self.language_detector.detect(query, FISCAL_LANGUAGES)
+            t1 = clock()
             
-            # 2. Extraction d'entités (montants, taux, etc.)
-            entities = await self.extract_entities(query, language)
+            # 2. Extraction d'entités (montants, taux, etc.) et
+            # 3. détermination du type de calcul, en une seule passe
+            extraction = self.entity_extractor.extract(query, language)
+            entities = extraction['entities']
+            t2 = clock()
+            calc_type = self.entity_extractor.classify(extraction['scores'])
+            t3 = clock()
+            timings = {'detect': t1 - t0, 'extract': t2 - t1, 'classify': t3 - t2}
             
-            # 3. Détermination du type de calcul
-            calc_type = await self.determine_calculation_type(query, language)
+            # Requête déjà vue sous forme normalisée : calcul et formatage évités
+            cache_key = self._cache_key(language, calc_type, entities)
+            response = self.response_cache.get(cache_key)
+            cache_hit = response is not None
             
-            # 4. Traitement selon le type
-            if calc_type == 'tva':
-                result = await self.calculate_tva_intelligent(entities)
-            elif calc_type == 'irg':
-                result = await self.calculate_irg_intelligent(entities)
-            else:
-                result = await self.provide_general_help(language)
+            if not cache_hit:
+                # 4. Traitement selon le type
+                t4 = clock()
+                if calc_type == 'tva':
+                    result = self._calculate_tva(entities, rules)
+                elif calc_type == 'irg':
+                    result = self._calculate_irg(entities, rules)
+                else:
+                    result = self._general_help(language)
+                t5 = clock()
+                
+                # 5. Formatage réponse selon la langue
+                response = self._format_response(result, language)
+                timings['calculate'] = t5 - t4
+                timings['format'] = clock() - t5
+                self.response_cache.put(cache_key, response)
             
-            # 5. Formatage réponse selon la langue
-            response = await self.format_response(result, language)
+            if metrics is not None:
+                metrics.observe(timings, language, calc_type, cache_hit, query, profiler)
             
             return {
                 'success': True,
@@ -109,271 +165,224 @@ class FiscalAiAgent:
             
         except Exception as e:
             logger.error(f"Erreur traitement: {e}")
+            if metrics is not None:
+                metrics.observe_error(profiler)
             return {
                 'success': False,
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
     
-    async def detect_language(self, text: str) -> str:
-        """🌍 Détection automatique de la langue - Support Amazigh"""
-        text_lower = text.lower()
-        
-        # 1. Détection Tifinagh (script amazigh natif)
-        if re.search(self.language_patterns['ber']['tifinagh'], text):
-            return 'ber'
-        
-        # 2. Détection amazigh en caractères latins
-        ber_score = sum(1 for word in self.language_patterns['ber']['latin_keywords'] 
-                       if word in text_lower)
-        if ber_score >= 1:
-            return 'ber'
-        
-        # 3. Détection darija algérienne (priorité haute)
-        darija_count = sum(1 for word in self.language_patterns['ar_dz'] 
-                          if word in text_lower)
-        if darija_count >= 1:
-            return 'ar_dz'
+    def metrics_snapshot(self) -> Dict:
+        """📊 Latences par étape et compteurs (dict)"""
+        return self.metrics.snapshot() if self.metrics is not None else {}
+    
+    def metrics_prometheus(self) -> str:
+        """📤 Latences par étape et compteurs au format texte Prometheus"""
+        return self.metrics.prometheus_text() if self.metrics is not None else ''
+    
+    async def process_fiscal_queries(self, queries: Union[Iterable[str], AsyncIterable[str]],
+                                     context: Dict = None, concurrency: int = 8,
+                                     ordered: bool = True,
+                                     executor: Union[str, Executor] = 'thread') -> AsyncIterator[Dict]:
+        """
+        📨 Traitement en flux d'un lot de requêtes (files WhatsApp/Telegram)
+        
+        Au plus `concurrency` requêtes sont en cours ou en attente de
+        lecture : la source n'est consommée qu'au rythme des résultats
+        (contre-pression). Le calcul tourne hors de la boucle asyncio,
+        dans un pool de threads ('thread'), de processus ('process') ou
+        un Executor fourni. Chaque résultat porte son rang `index` dans
+        le flux ; ordered=False les rend dans l'ordre d'achèvement.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency doit être >= 1")
+        
+        loop = asyncio.get_running_loop()
+        pool, owned = self._make_executor(executor, concurrency)
+        if isinstance(pool, ProcessPoolExecutor):
+            work = _process_query_in_worker
+        else:
+            work = self._process_query
         
-        # 4. Détection arabe standard
-        if re.search(self.language_patterns['ar'], text):
-            return 'ar'
+        source = _as_async_iterator(queries)
+        pending = deque() if ordered else set()
+        exhausted = False
+        index = 0
         
-        # 5. Détection français
-        if re.search(self.language_patterns['fr'], text) or any(word in text_lower for word in ['calculer', 'tva', 'irg']):
-            return 'fr'
+        async def run(position: int, query: str) -> Dict:
+            result = await loop.run_in_executor(pool, work, query, context)
+            result['index'] = position
+            return result
         
-        return 'fr'  # Par défaut
+        try:
+            while True:
+                # Remplir la fenêtre sans dépasser la limite de concurrence
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        query = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = asyncio.ensure_future(run(index, query))
+                    index += 1
+                    if ordered:
+                        pending.append(task)
+                    else:
+                        pending.add(task)
+                
+                if not pending:
+                    break
+                
+                if ordered:
+                    yield await pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.discard(task)
+                        yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            # Annulation effective (tâches en file de l'executor comprises) avant de rendre la main
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            if owned:
+                pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _make_executor(self, executor: Union[str, Executor], concurrency: int):
+        """Pool d'exécution demandé -> (executor, créé ici ?)"""
+        if isinstance(executor, Executor):
+            return executor, False
+        if executor == 'thread':
+            return ThreadPoolExecutor(max_workers=concurrency,
+                                      thread_name_prefix='fiscal-query'), True
+        if executor == 'process':
+            workers = min(concurrency, os.cpu_count() or 1)
+            return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(self.rules.to_dict(),)), True
+        raise ValueError(f"Executor inconnu: {executor}")
+    
+    async def detect_language(self, text: str) -> str:
+        """🌍 Détection automatique de la langue - Support Amazigh"""
+        return self.language_detector.detect(text, FISCAL_LANGUAGES)
     
     async def extract_entities(self, query: str, language: str) -> Dict:
         """🔍 Extraction d'entités (montants, enfants, etc.) - Support Amazigh"""
-        entities = {}
-        
-        # Extraction montants (DZD, DA, dinars, idrimen)
-        amount_patterns = [
-            r'(\d{1,3}(?:[\s,.]?\d{3})*(?:[.,]\d{2})?)\s*(?:dzd|da|dinar|دج|دينار|idrimen)',
-            r'(\d{1,3}(?:[\s,.]?\d{3})*(?:[.,]\d{2})?)'
-        ]
-        
-        for pattern in amount_patterns:
-            matches = re.findall(pattern, query.lower(), re.IGNORECASE)
-            if matches:
-                amount_str = matches[0].replace(' ', '').replace(',', '')
-                try:
-                    entities['amount'] = float(amount_str)
-                    break
-                except ValueError:
-                    continue
-        
-        # Extraction nombre d'enfants - Support Amazigh
-        children_patterns = {
-            'ar': r'(\d+)\s*(?:أطفال|أولاد|طفل)',
-            'ar_dz': r'(\d+)\s*(?:دراري|ولاد|طفل)',
-            'fr': r'(\d+)\s*(?:enfants?|enfant)',
-            'ber': r'(\d+)\s*(?:arrac|mmi|tarwa|uqcic)'  # enfants en amazigh
-        }
-        
-        if language in children_patterns:
-            children_matches = re.findall(children_patterns[language], query)
-            if children_matches:
-                entities['children'] = int(children_matches[0])
-        
-        # Détection export/zone franche - Support Amazigh
-        export_keywords = {
-            'ar': ['تصدير', 'صادرات'],
-            'ar_dz': ['تصدير', 'صادرات'],
-            'fr': ['export', 'exportation'],
-            'ber': ['asifeḍ', 'tufɣa', 'azen']  # export/envoi en amazigh
-        }
-        
-        zone_keywords = {
-            'ar': ['منطقة', 'حرة'],
-            'ar_dz': ['منطقة', 'حرة'],
-            'fr': ['zone', 'franche'],
-            'ber': ['tamnaḍt', 'tilelli', 'akal']  # zone libre en amazigh
-        }
-        
-        if any(kw in query.lower() for kw in export_keywords.get(language, [])):
-            entities['is_export'] = True
-        
-        if any(kw in query.lower() for kw in zone_keywords.get(language, [])):
-            entities['is_zone_franche'] = True
-        
-        return entities
+        return self.entity_extractor.extract(query, language)['entities']
     
     async def determine_calculation_type(self, query: str, language: str) -> str:
         """🎯 Détermination du type de calcul - Support Amazigh"""
-        query_lower = query.lower()
-        
-        # Keywords TVA - Support Amazigh
-        tva_keywords = {
-            'ar': ['ضريبة', 'قيمة', 'مضافة'],
-            'ar_dz': ['ضريبة', 'تاع', 'البيع'],
-            'fr': ['tva', 'taxe', 'valeur', 'ajoutée'],
-            'ber': ['tigawin', 'azal', 'tmerci', 'asiḍen']  # taxes/valeur/commerce en amazigh
-        }
-        
-        # Keywords IRG - Support Amazigh
-        irg_keywords = {
-            'ar': ['ضريبة', 'دخل', 'راتب', 'أجر'],
-            'ar_dz': ['ضريبة', 'الراتب', 'الأجر'],
-            'fr': ['irg', 'impôt', 'revenu', 'salaire'],
-            'ber': ['tigawin', 'n', 'udem', 'azref', 'ksebt']  # impôt du travail/salaire en amazigh
-        }
-        
-        # Score TVA
-        tva_score = sum(1 for word in tva_keywords.get(language, tva_keywords['fr']) 
-                       if word in query_lower)
-        
-        # Score IRG
-        irg_score = sum(1 for word in irg_keywords.get(language, irg_keywords['fr']) 
-                       if word in query_lower)
-        
-        if tva_score > irg_score:
-            return 'tva'
-        elif irg_score > 0:
-            return 'irg'
-        else:
-            return 'general'
+        scores = self.entity_extractor.extract(query, language)['scores']
+        return self.entity_extractor.classify(scores)
     
     async def calculate_tva_intelligent(self, entities: Dict) -> Dict:
         """💰 Calcul TVA intelligent"""
+        return self._calculate_tva(entities)
+    
+    def _calculate_tva(self, entities: Dict, rules: Optional[TaxRuleTable] = None) -> Dict:
+        tva = (rules or self.rules).tva
         amount = entities.get('amount', 0)
         is_export = entities.get('is_export', False)
         is_zone_franche = entities.get('is_zone_franche', False)
         
         # Détermination du taux
         if is_export or is_zone_franche:
-            rate = self.tax_knowledge['tva_rates']['exoneree']
+            code = tva.exempt_code
             reason = "Export" if is_export else "Zone franche"
         else:
-            rate = self.tax_knowledge['tva_rates']['normale']  # 19% par défaut
+            code = tva.code_of('normale')  # 19% par défaut
             reason = "Taux normal"
         
-        # Calcul
-        tva_amount = Decimal(str(amount)) * rate / Decimal('100')
-        tva_amount = tva_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        total_ttc = Decimal(str(amount)) + tva_amount
+        # Calcul en centimes entiers
+        amount_ht = to_centimes(amount)
+        tva_amount = tva.tva_centimes(amount_ht, code)
         
         return {
             'type': 'tva_calculation',
             'amount_ht': amount,
-            'tva_rate': float(rate),
-            'tva_amount': float(tva_amount),
-            'amount_ttc': float(total_ttc),
+            'tva_rate': tva.rate_percent(code),
+            'tva_amount': tva_amount / 100,
+            'amount_ttc': (amount_ht + tva_amount) / 100,
             'currency': 'DZD',
             'reason': reason
         }
     
+    def calculate_tva_batch(self, amounts: Sequence, rate_codes: Optional[Sequence] = None,
+                            is_export: Optional[Sequence] = None,
+                            is_zone_franche: Optional[Sequence] = None,
+                            centimes: bool = False,
+                            period: Union[date, str, None] = None) -> Dict:
+        """💰 Calcul TVA par lots (lignes de factures) - résultats en centimes"""
+        rules = self.rules_for(period)
+        return calculate_tva_batch(rules.knowledge, amounts, rate_codes, is_export,
+                                   is_zone_franche, centimes=centimes, table=rules.tva)
+    
     async def calculate_irg_intelligent(self, entities: Dict) -> Dict:
         """💼 Calcul IRG intelligent"""
+        return self._calculate_irg(entities)
+    
+    def _calculate_irg(self, entities: Dict, rules: Optional[TaxRuleTable] = None) -> Dict:
+        irg = (rules or self.rules).irg
         salary = entities.get('amount', 0)
         children = entities.get('children', 0)
         
-        # Calcul abattements
-        abattements = self.tax_knowledge['abattements_irg']['base']
-        abattements += Decimal(str(children)) * self.tax_knowledge['abattements_irg']['par_enfant']
+        # Abattements et base imposable en centimes
+        gross = to_centimes(salary)
+        abattements = irg.abattement_base + children * irg.abattement_enfant
+        base_imposable = max(gross - abattements, 0)
         
-        # Base imposable
-        base_imposable = max(Decimal(str(salary)) - abattements, Decimal('0'))
-        
-        # Calcul IRG progressif
-        irg_amount = Decimal('0')
-        
-        for bracket in self.tax_knowledge['irg_brackets']:
-            if base_imposable <= bracket['min']:
-                continue
-            
-            # Montant dans cette tranche
-            if bracket['max'] == float('inf'):
-                amount_in_bracket = base_imposable - Decimal(str(bracket['min']))
-            else:
-                amount_in_bracket = min(base_imposable, Decimal(str(bracket['max']))) - Decimal(str(bracket['min']))
-            
-            if amount_in_bracket > 0:
-                bracket_irg = amount_in_bracket * bracket['rate'] / Decimal('100')
-                irg_amount += bracket_irg
-        
-        irg_amount = irg_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        net_salary = Decimal(str(salary)) - irg_amount
+        # IRG progressif : bisect sur les tranches + cumul précalculé
+        irg_amount = irg.irg_centimes(base_imposable)
         
         return {
             'type': 'irg_calculation',
             'gross_salary': salary,
-            'abattements': float(abattements),
-            'taxable_base': float(base_imposable),
-            'irg_amount': float(irg_amount),
-            'net_salary': float(net_salary),
+            'abattements': abattements / 100,
+            'taxable_base': base_imposable / 100,
+            'irg_amount': irg_amount / 100,
+            'net_salary': (gross - irg_amount) / 100,
             'children': children,
             'currency': 'DZD'
         }
     
+    def calculate_irg_batch(self, salaries: Sequence, children: Optional[Sequence] = None,
+                            centimes: bool = False,
+                            period: Union[date, str, None] = None) -> Dict:
+        """💼 Calcul IRG par lots (paie de masse) - résultats en centimes"""
+        rules = self.rules_for(period)
+        return calculate_irg_batch(rules.knowledge, salaries, children,
+                                   centimes=centimes, table=rules.irg)
+    
+    def calculation_key(self, calc_type: str, amount, children: int = 0, language: str = 'fr',
+                        period: Union[date, str, None] = None) -> tuple:
+        """🔑 Clé d'un calcul TVA/IRG direct : type, montant au centime, enfants, langue, règles"""
+        if language not in FISCAL_LANGUAGES:
+            language = 'fr'
+        return (calc_type, to_centimes(amount), children, language, self.rules_for(period))
+    
+    def calculate(self, calc_type: str, amount, children: int = 0, language: str = 'fr',
+                  period: Union[date, str, None] = None) -> str:
+        """🧮 Calcul TVA/IRG direct (sans analyse de requête), réponse formatée"""
+        if calc_type not in ('tva', 'irg'):
+            raise ValueError(f"Type de calcul inconnu: {calc_type}")
+        if language not in FISCAL_LANGUAGES:
+            language = 'fr'
+        rules = self.rules_for(period)
+        entities = {'amount': amount, 'children': children}
+        if calc_type == 'tva':
+            calculation = self._calculate_tva(entities, rules)
+        else:
+            calculation = self._calculate_irg(entities, rules)
+        return self._format_response(calculation, language)
+    
     async def format_response(self, result: Dict, language: str) -> str:
         """📝 Formatage selon la langue - Support Amazigh complet"""
-        
-        if result['type'] == 'tva_calculation':
-            templates = {
-                'ar': """💰 حساب ضريبة القيمة المضافة:
-المبلغ بدون ضريبة: {amount_ht:,.2f} دج
-معدل الضريبة: {tva_rate}%
-ضريبة القيمة المضافة: {tva_amount:,.2f} دج
-المبلغ الإجمالي: {amount_ttc:,.2f} دج""",
-                
-                'ar_dz': """💰 حساب الضريبة:
-المبلغ بلا ضريبة: {amount_ht:,.2f} دج
-نسبة الضريبة: {tva_rate}%
-الضريبة: {tva_amount:,.2f} دج
-المجموع: {amount_ttc:,.2f} دج""",
-                
-                'fr': """💰 Calcul TVA Algeria:
-Montant HT: {amount_ht:,.2f} DZD
-Taux TVA: {tva_rate}%
-Montant TVA: {tva_amount:,.2f} DZD
-Montant TTC: {amount_ttc:,.2f} DZD""",
-                
-                'ber': """💰 Asiḍen n tigawin:
-Azal war tigawin: {amount_ht:,.2f} DZD
-Aḍris n tigawin: {tva_rate}%
-Tigawin: {tva_amount:,.2f} DZD
-Azal s tigawin: {amount_ttc:,.2f} DZD"""
-            }
-            
-            template = templates.get(language, templates['fr'])
-            return template.format(**result)
-        
-        elif result['type'] == 'irg_calculation':
-            templates = {
-                'ar': """💼 حساب ضريبة الدخل الإجمالي:
-الراتب الإجمالي: {gross_salary:,.2f} دج
-الإعفاءات: {abattements:,.2f} دج
-ضريبة الدخل: {irg_amount:,.2f} دج
-الراتب الصافي: {net_salary:,.2f} دج
-عدد الأطفال: {children}""",
-                
-                'ar_dz': """💼 حساب ضريبة الراتب:
-الراتب الكامل: {gross_salary:,.2f} دج
-التخفيضات: {abattements:,.2f} دج
-الضريبة: {irg_amount:,.2f} دج
-الراتب الصافي: {net_salary:,.2f} دج
-عدد الدراري: {children}""",
-                
-                'fr': """💼 Calcul IRG Algeria:
-Salaire brut: {gross_salary:,.2f} DZD
-Abattements: {abattements:,.2f} DZD
-IRG: {irg_amount:,.2f} DZD
-Salaire net: {net_salary:,.2f} DZD
-Enfants: {children}""",
-                
-                'ber': """💼 Asiḍen n tigawin n udem:
-Azref amellal: {gross_salary:,.2f} DZD
-Isenkisen: {abattements:,.2f} DZD
-Tigawin n udem: {irg_amount:,.2f} DZD
-Azref d uzayad: {net_salary:,.2f} DZD
-Arrac: {children}"""
-            }
-            
-            template = templates.get(language, templates['fr'])
-            return template.format(**result)
+        return self._format_response(result, language)
+    
+    def _format_response(self, result: Dict, language: str) -> str:
+        if result['type'] in ('tva_calculation', 'irg_calculation'):
+            return TEMPLATE_REGISTRY.render(result['type'], language, result)
         
         elif result['type'] == 'general_help':
             return result['message']
@@ -382,18 +391,35 @@ Arrac: {children}"""
     
     async def provide_general_help(self, language: str) -> Dict:
         """❓ Aide générale - Support Amazigh"""
-        help_messages = {
-            'ar': 'يمكنني مساعدتك في حساب الضرائب الجزائرية (TVA, IRG)',
-            'ar_dz': 'نقدر نعاونك في الضرائب تاع الجزائر',
-            'fr': 'Je peux vous aider avec les calculs fiscaux algériens',
-            'ber': 'Zemreɣ ad k-ɛiwneɣ deg tigawin n Dzayer (TVA, IRG)'
-        }
-        
+        return self._general_help(language)
+    
+    def _general_help(self, language: str) -> Dict:
         return {
             'type': 'general_help',
-            'message': help_messages.get(language, help_messages['fr'])
+            'message': TEMPLATE_REGISTRY.render('general_help', language)
         }
 
+# Agent propre à chaque processus du pool (voir process_fiscal_queries)
+_worker_agent = None
+
+def _init_worker(tax_knowledge: Dict):
+    """Initialisation d'un processus du pool avec les règles fiscales du parent"""
+    global _worker_agent
+    _worker_agent = FiscalAiAgent()
+    _worker_agent.tax_knowledge = tax_knowledge
+
+def _process_query_in_worker(query: str, context: Dict = None) -> Dict:
+    return _worker_agent._process_query(query, context)
+
+async def _as_async_iterator(queries) -> AsyncIterator[str]:
+    """Itérable synchrone ou asynchrone -> itérateur asynchrone"""
+    if hasattr(queries, '__aiter__'):
+        async for query in queries:
+            yield query
+    else:
+        for query in queries:
+            yield query
+
 # Test de l'agent avec support Amazigh
 async def test_agent_amazigh():
     """🧪 Test de l'agent fiscal avec support Amazigh"""
@@ -429,4 +455,9 @@ async def test_agent_amazigh():
         print("-" * 40)
 
 if __name__ == "__main__":
+    # Configuration logging (démo uniquement : l'import ne touche pas au logging)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     asyncio.run(test_agent_amazigh())
\ No newline at end of file
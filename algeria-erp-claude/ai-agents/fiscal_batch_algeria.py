@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🇩🇿 Moteur fiscal par lots Algeria - Paie de masse et registres de factures
+Calculs IRG et TVA vectorisés en centimes entiers (NumPy optionnel)
+Résultats identiques au centime près aux calculs unitaires de FiscalAiAgent
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Optional, Sequence
+
+# Montants en centimes, taux en points de base (23.00 % -> 2300).
+# Un produit centimes x points de base vaut donc 1/10000 de centime.
+_RATE_SCALE = 100
+_RAW_PER_CENTIME = 100 * _RATE_SCALE
+_HALF_RAW = _RAW_PER_CENTIME // 2
+
+# Borne "infinie" de la dernière tranche, en centimes
+_NO_LIMIT = 2 ** 62
+
+# Au-delà (~88 Md DZD), l'écart entre flottants voisins masque les demi-centimes
+_FLOAT_EXACT_CENTIMES = 2.0 ** 43
+
+
+def to_centimes(amount) -> int:
+    """💱 Conversion DZD -> centimes entiers (ROUND_HALF_UP)"""
+    value = Decimal(str(amount)) * 100
+    return int(value.quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def _to_centimes_numpy(np, amounts):
+    """💱 DZD (ndarray) -> centimes int64, identiques à to_centimes (ROUND_HALF_UP)
+
+    Le produit flottant tombe sous le demi-centime (200000.005 * 100 vaut
+    20000000.4999...) et np.rint arrondit au pair : arrondi vectorisé hors
+    demi-centimes, to_centimes pour les montants proches d'un demi-centime
+    ou trop grands.
+    """
+    scaled = amounts.astype(np.float64) * 100
+    ambiguous = ~(np.abs(scaled) < _FLOAT_EXACT_CENTIMES)
+    ambiguous |= np.abs(scaled - np.floor(scaled) - 0.5) < 1e-3
+    centimes = np.floor(np.where(ambiguous, 0.0, scaled) + 0.5).astype(np.int64)
+    flat_amounts, flat_centimes = amounts.reshape(-1), centimes.reshape(-1)
+    for i in np.flatnonzero(ambiguous):
+        flat_centimes[i] = to_centimes(flat_amounts[i].item())
+    return centimes
+
+
+def _rate_points(rate: Decimal) -> int:
+    """Taux en % -> points de base entiers"""
+    points = Decimal(str(rate)) * _RATE_SCALE
+    if points != points.to_integral_value():
+        raise ValueError(f"Taux non représentable en points de base: {rate}")
+    return int(points)
+
+
+def _round_raw(raw: int) -> int:
+    """Arrondi ROUND_HALF_UP d'un montant brut vers le centime (avoirs compris)"""
+    if raw < 0:
+        return -((_HALF_RAW - raw) // _RAW_PER_CENTIME)
+    return (raw + _HALF_RAW) // _RAW_PER_CENTIME
+
+
+class IrgBracketTable:
+    """📊 Barème IRG compilé en centimes avec cumuls aux bornes de tranches"""
+
+    __slots__ = ('mins', 'maxs', 'rates', 'cumuls', 'abattement_base', 'abattement_enfant')
+
+    def __init__(self, tax_knowledge: Dict):
+        mins, maxs, rates = [], [], []
+        for bracket in tax_knowledge['irg_brackets']:
+            mins.append(to_centimes(bracket['min']))
+            maxs.append(_NO_LIMIT if bracket['max'] == float('inf') else to_centimes(bracket['max']))
+            rates.append(_rate_points(bracket['rate']))
+
+        # cumuls[i] = impôt brut des tranches 0..i-1 entièrement remplies
+        cumuls = [0]
+        for low, high, rate in zip(mins[:-1], maxs[:-1], rates[:-1]):
+            cumuls.append(cumuls[-1] + (high - low) * rate)
+
+        self.mins = tuple(mins)
+        self.maxs = tuple(maxs)
+        self.rates = tuple(rates)
+        self.cumuls = tuple(cumuls)
+        abattements = tax_knowledge['abattements_irg']
+        self.abattement_base = to_centimes(abattements['base'])
+        self.abattement_enfant = to_centimes(abattements['par_enfant'])
+
+    def irg_centimes(self, taxable_base: int) -> int:
+        """💼 IRG d'une base imposable en centimes (bisect + une multiplication)"""
+        # Nombre de tranches dont le minimum est strictement dépassé
+        index = bisect_left(self.mins, taxable_base)
+        if index == 0:
+            return 0
+        index -= 1
+        raw = self.cumuls[index] + (
+            min(taxable_base, self.maxs[index]) - self.mins[index]
+        ) * self.rates[index]
+        return _round_raw(raw)
+
+
+def _is_numpy(values) -> bool:
+    # NumPy n'est jamais importé ici : un tableau NumPy en entrée implique que
+    # l'appelant l'a déjà chargé, sinon repli sur array('q') en pur Python
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+
+def calculate_irg_batch(tax_knowledge: Dict, salaries: Sequence,
+                        children: Optional[Sequence] = None,
+                        centimes: bool = False,
+                        table: Optional[IrgBracketTable] = None) -> Dict:
+    """
+    💼 Calcul IRG par lots
+
+    salaries : salaires bruts (DZD, ou centimes entiers si centimes=True)
+    children : nombre d'enfants par salarié (0 par défaut)
+
+    Retourne des tableaux en centimes : irg_amount, abattements,
+    taxable_base, net_salary. Tableaux NumPy int64 si l'entrée est un
+    ndarray, array('q') sinon.
+    """
+    table = table or IrgBracketTable(tax_knowledge)
+
+    if _is_numpy(salaries) or _is_numpy(children):
+        return _irg_batch_numpy(table, salaries, children, centimes)
+    return _irg_batch_python(table, salaries, children, centimes)
+
+
+def _irg_batch_numpy(table: IrgBracketTable, salaries, children, centimes: bool) -> Dict:
+    """Chemin vectorisé NumPy (int64)"""
+    np = sys.modules['numpy']
+    salaries = np.asarray(salaries)
+    if centimes:
+        gross = salaries.astype(np.int64)
+    else:
+        gross = _to_centimes_numpy(np, salaries)
+
+    if children is None:
+        kids = np.zeros(gross.shape, dtype=np.int64)
+    else:
+        kids = np.asarray(children, dtype=np.int64)
+
+    abattements = table.abattement_base + kids * table.abattement_enfant
+    taxable = np.maximum(gross - abattements, 0)
+
+    mins = np.asarray(table.mins, dtype=np.int64)
+    maxs = np.asarray(table.maxs, dtype=np.int64)
+    rates = np.asarray(table.rates, dtype=np.int64)
+    cumuls = np.asarray(table.cumuls, dtype=np.int64)
+
+    index = np.searchsorted(mins, taxable, side='left')
+    taxed = index > 0
+    top = np.where(taxed, index - 1, 0)
+    raw = cumuls[top] + (np.minimum(taxable, maxs[top]) - mins[top]) * rates[top]
+    irg = np.where(taxed, (raw + _HALF_RAW) // _RAW_PER_CENTIME, 0)
+
+    return {
+        'irg_amount': irg,
+        'abattements': abattements,
+        'taxable_base': taxable,
+        'net_salary': gross - irg,
+        'currency': 'DZD',
+        'unit': 'centimes'
+    }
+
+
+def _irg_batch_python(table: IrgBracketTable, salaries, children, centimes: bool) -> Dict:
+    """Repli pur Python en entiers (array('q'))"""
+    count = len(salaries)
+    if children is None:
+        children = (0,) * count
+    elif len(children) != count:
+        raise ValueError("salaries et children doivent avoir la même longueur")
+
+    irg_out = array('q', bytes(8 * count))
+    abatt_out = array('q', bytes(8 * count))
+    base_out = array('q', bytes(8 * count))
+    net_out = array('q', bytes(8 * count))
+
+    abattement_base = table.abattement_base
+    abattement_enfant = table.abattement_enfant
+    irg_centimes = table.irg_centimes
+
+    for i, (salary, kids) in enumerate(zip(salaries, children)):
+        gross = int(salary) if centimes else to_centimes(salary)
+        abattements = abattement_base + kids * abattement_enfant
+        taxable = gross - abattements
+        if taxable < 0:
+            taxable = 0
+        irg = irg_centimes(taxable)
+
+        irg_out[i] = irg
+        abatt_out[i] = abattements
+        base_out[i] = taxable
+        net_out[i] = gross - irg
+
+    return {
+        'irg_amount': irg_out,
+        'abattements': abatt_out,
+        'taxable_base': base_out,
+        'net_salary': net_out,
+        'currency': 'DZD',
+        'unit': 'centimes'
+    }
+
+
+# ---------------------------------------------------------------------------
+# TVA par lots (registre de lignes de factures)
+# ---------------------------------------------------------------------------
+
+class TvaRateTable:
+    """💰 Taux TVA compilés : code entier -> points de base"""
+
+    __slots__ = ('names', 'points', 'exempt_code')
+
+    def __init__(self, tax_knowledge: Dict):
+        rates = tax_knowledge['tva_rates']
+        self.names = tuple(rates)
+        self.points = tuple(_rate_points(rate) for rate in rates.values())
+        # Export et zone franche basculent sur le taux exonéré
+        self.exempt_code = self.names.index('exoneree')
+
+    def code_of(self, rate_name: str) -> int:
+        """Nom de taux -> code entier"""
+        return self.names.index(rate_name)
+
+    def rate_percent(self, code: int) -> float:
+        return self.points[code] / _RATE_SCALE
+
+    def tva_centimes(self, amount_ht: int, code: int) -> int:
+        """💰 TVA d'un montant HT en centimes (ROUND_HALF_UP)"""
+        return _round_raw(amount_ht * self.points[code])
+
+    def encode(self, rate_names: Sequence[str]) -> array:
+        """Noms de taux ('normale', 'reduite', ...) -> codes entiers"""
+        index = {name: code for code, name in enumerate(self.names)}
+        return array('b', (index[name] for name in rate_names))
+
+
+def calculate_tva_batch(tax_knowledge: Dict, amounts: Sequence,
+                        rate_codes: Optional[Sequence] = None,
+                        is_export: Optional[Sequence] = None,
+                        is_zone_franche: Optional[Sequence] = None,
+                        centimes: bool = False,
+                        table: Optional[TvaRateTable] = None) -> Dict:
+    """
+    💰 Calcul TVA par lots sur des colonnes de lignes de factures
+
+    amounts    : montants HT (DZD, ou centimes entiers si centimes=True)
+    rate_codes : index dans TvaRateTable.names (taux normal par défaut)
+    is_export, is_zone_franche : indicateurs par ligne (exonération)
+
+    Retourne amount_ht, tva_amount, amount_ttc en centimes, le code de
+    taux appliqué par ligne et les sous-totaux par taux, calculés dans
+    la même passe.
+    """
+    table = table or TvaRateTable(tax_knowledge)
+
+    if any(_is_numpy(column) for column in (amounts, rate_codes, is_export, is_zone_franche)):
+        return _tva_batch_numpy(table, amounts, rate_codes, is_export, is_zone_franche, centimes)
+    return _tva_batch_python(table, amounts, rate_codes, is_export, is_zone_franche, centimes)
+
+
+def _tva_subtotals(table: TvaRateTable, counts, ht, tva, ttc) -> Dict:
+    """Sous-totaux par taux (centimes)"""
+    return {
+        name: {
+            'rate': table.points[code] / _RATE_SCALE,
+            'count': int(counts[code]),
+            'amount_ht': int(ht[code]),
+            'tva_amount': int(tva[code]),
+            'amount_ttc': int(ttc[code])
+        }
+        for code, name in enumerate(table.names)
+    }
+
+
+def _tva_batch_numpy(table: TvaRateTable, amounts, rate_codes, is_export,
+                     is_zone_franche, centimes: bool) -> Dict:
+    """Chemin vectorisé NumPy (int64)"""
+    np = sys.modules['numpy']
+    amounts = np.asarray(amounts)
+    if centimes:
+        ht = amounts.astype(np.int64)
+    else:
+        ht = _to_centimes_numpy(np, amounts)
+
+    if rate_codes is None:
+        codes = np.zeros(ht.shape, dtype=np.intp)
+    else:
+        codes = np.asarray(rate_codes, dtype=np.intp)
+        if codes.size and (codes.min() < 0 or codes.max() >= len(table.names)):
+            raise ValueError(f"Code de taux TVA invalide (0..{len(table.names) - 1} attendus)")
+
+    exempt = np.zeros(ht.shape, dtype=bool)
+    for flags in (is_export, is_zone_franche):
+        if flags is not None:
+            exempt |= np.asarray(flags, dtype=bool)
+    codes = np.where(exempt, table.exempt_code, codes)
+
+    raw = ht * np.asarray(table.points, dtype=np.int64)[codes]
+    tva = np.sign(raw) * ((np.abs(raw) + _HALF_RAW) // _RAW_PER_CENTIME)
+    ttc = ht + tva
+
+    # Sous-totaux exacts en int64 (bincount passerait par des flottants)
+    size = len(table.names)
+    sums = np.zeros((3, size), dtype=np.int64)
+    np.add.at(sums[0], codes, ht)
+    np.add.at(sums[1], codes, tva)
+    np.add.at(sums[2], codes, ttc)
+    counts = np.bincount(codes, minlength=size)
+
+    return {
+        'amount_ht': ht,
+        'tva_amount': tva,
+        'amount_ttc': ttc,
+        'rate_code': codes,
+        'subtotals': _tva_subtotals(table, counts, sums[0], sums[1], sums[2]),
+        'currency': 'DZD',
+        'unit': 'centimes'
+    }
+
+
+def _tva_batch_python(table: TvaRateTable, amounts, rate_codes, is_export,
+                      is_zone_franche, centimes: bool) -> Dict:
+    """Repli pur Python en entiers (array('q'))"""
+    count = len(amounts)
+    for column in (rate_codes, is_export, is_zone_franche):
+        if column is not None and len(column) != count:
+            raise ValueError("Toutes les colonnes doivent avoir la même longueur")
+
+    no_flags = (False,) * count
+    rate_codes = rate_codes if rate_codes is not None else (0,) * count
+    is_export = is_export if is_export is not None else no_flags
+    is_zone_franche = is_zone_franche if is_zone_franche is not None else no_flags
+
+    ht_out = array('q', bytes(8 * count))
+    tva_out = array('q', bytes(8 * count))
+    ttc_out = array('q', bytes(8 * count))
+    code_out = array('b', bytes(count))
+
+    size = len(table.names)
+    counts = [0] * size
+    sum_ht = [0] * size
+    sum_tva = [0] * size
+    sum_ttc = [0] * size
+
+    points = table.points
+    exempt_code = table.exempt_code
+
+    for i, (amount, code, export, zone) in enumerate(
+            zip(amounts, rate_codes, is_export, is_zone_franche)):
+        ht = int(amount) if centimes else to_centimes(amount)
+        if not 0 <= code < size:
+            raise ValueError(f"Code de taux TVA invalide ligne {i}: {code}")
+        if export or zone:
+            code = exempt_code
+        tva = _round_raw(ht * points[code])
+        ttc = ht + tva
+
+        ht_out[i] = ht
+        tva_out[i] = tva
+        ttc_out[i] = ttc
+        code_out[i] = code
+
+        counts[code] += 1
+        sum_ht[code] += ht
+        sum_tva[code] += tva
+        sum_ttc[code] += ttc
+
+    return {
+        'amount_ht': ht_out,
+        'tva_amount': tva_out,
+        'amount_ttc': ttc_out,
+        'rate_code': code_out,
+        'subtotals': _tva_subtotals(table, counts, sum_ht, sum_tva, sum_ttc),
+        'currency': 'DZD',
+        'unit': 'centimes'
+    }
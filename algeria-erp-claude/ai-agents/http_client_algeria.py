@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🌐 Client HTTP asynchrone partagé par les agents Algeria
+Connexions persistantes (keep-alive) en pool, limite par hôte, délais,
+politique de reprise ; HTTP/2 via httpx[http2] lorsqu'il est installé
+(importé seulement si un client le demande)
+"""
+
+import asyncio
+import json as jsonlib
+import logging
+import random
+import ssl
+import time
+import weakref
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger('HttpClient')
+
+USER_AGENT = "AlgeriaERP-Agents/1.0"
+
+# Méthodes rejouables sans effet de bord supplémentaire (RFC 9110, 9.2.2)
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'))
+
+
+class HttpError(Exception):
+    """Échec HTTP (réseau, délai dépassé ou statut d'erreur)"""
+
+    def __init__(self, message: str, status: Optional[int] = None, response=None):
+        super().__init__(message)
+        self.status = status
+        self.response = response
+
+
+class HttpTimeout(HttpError):
+    pass
+
+
+class _ConnectFailed(ConnectionError):
+    """Connexion impossible : la requête n'a pas quitté le client"""
+
+
+class HttpResponse:
+    __slots__ = ('status', 'reason', 'headers', 'body', 'url')
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], body: bytes, url: str):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return jsonlib.loads(self.body)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HttpError(f"HTTP {self.status} {self.reason} ({self.url})",
+                            status=self.status, response=self)
+        return self
+
+
+class RetryPolicy:
+    """🔁 Reprises à délai exponentiel (avec gigue), en respectant Retry-After
+
+    Requêtes non idempotentes (POST sendMessage...) : reprises seulement si
+    la connexion n'a pas pu s'ouvrir ou sur `unsafe_retry_statuses` (429 /
+    503, requête refusée sans traitement). Un délai dépassé, une coupure ou
+    un 500/502/504 peuvent survenir après l'envoi : les rejouer dupliquerait
+    le message.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 10.0,
+                 retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+                 retry_connection_errors: bool = True,
+                 unsafe_retry_statuses: Tuple[int, ...] = (429, 503)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_connection_errors = retry_connection_errors
+        self.unsafe_retry_statuses = frozenset(unsafe_retry_statuses) & self.retry_statuses
+
+    def delay(self, attempt: int, response: Optional[HttpResponse] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            if retry_after and retry_after.isdigit():
+                return min(self.max_delay, float(retry_after))
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class _Connection:
+    __slots__ = ('reader', 'writer', 'idle_since')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+
+    def usable(self, now: float, expiry: float) -> bool:
+        return (not self.writer.is_closing() and not self.reader.at_eof()
+                and now - self.idle_since < expiry)
+
+    def close(self):
+        self.writer.close()
+
+
+class _HostPool:
+    __slots__ = ('idle', 'semaphore')
+
+    def __init__(self, limit: int):
+        self.idle = deque()
+        self.semaphore = asyncio.Semaphore(limit)
+
+
+class HttpClient:
+    """🌐 Client HTTP/1.1 keep-alive (stdlib asyncio), un pool par hôte
+
+    - `limit_per_host` : connexions simultanées par (schéma, hôte, port)
+    - `keepalive_expiry` : durée de vie d'une connexion inactive
+    - `timeout` : délai total d'une tentative, `connect_timeout` pour l'ouverture
+    - `retry` : RetryPolicy (statuts 429/5xx et erreurs réseau par défaut ;
+      429/503 et connexion impossible seulement pour POST/PATCH)
+    - `http2=True` : délègue à httpx si httpx[http2] est installé, sinon HTTP/1.1
+
+    Un client appartient à une boucle asyncio (voir get_http_client()).
+    """
+
+    def __init__(self, limit_per_host: int = 16, timeout: float = 30.0,
+                 connect_timeout: float = 5.0, keepalive_expiry: float = 30.0,
+                 retry: Optional[RetryPolicy] = None, http2: bool = False,
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 default_headers: Optional[Dict[str, str]] = None):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self.retry = retry or RetryPolicy()
+        self.default_headers = {'User-Agent': USER_AGENT, **(default_headers or {})}
+        self._ssl_context = ssl_context
+        self._pools: Dict[Tuple[str, str, int], _HostPool] = {}
+        self._httpx = None
+        if http2:
+            try:
+                import httpx
+                import h2  # noqa: F401  (requis par httpx pour HTTP/2)
+            except ImportError:
+                httpx = None
+            if httpx is not None:
+                self._httpx = httpx.AsyncClient(
+                    http2=True,
+                    timeout=httpx.Timeout(timeout, connect=connect_timeout),
+                    limits=httpx.Limits(max_keepalive_connections=limit_per_host,
+                                        keepalive_expiry=keepalive_expiry)
+                )
+            else:
+                logger.info("ℹ️ httpx[http2] non installé : HTTP/1.1 keep-alive")
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.retries = 0
+
+    @property
+    def http2(self) -> bool:
+        return self._httpx is not None
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    async def request(self, method: str, url: str, *, json=None, data: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                      retry: Optional[RetryPolicy] = None,
+                      idempotent: Optional[bool] = None) -> HttpResponse:
+        """Envoie une requête ; les statuts d'erreur non repris sont retournés tels quels
+
+        `idempotent` : rejouable après envoi (déduit de la méthode par défaut ;
+        True pour un POST protégé par une clé d'idempotence côté serveur).
+        """
+        request_headers = dict(self.default_headers)
+        if headers:
+            request_headers.update(headers)
+        body = data or b''
+        if json is not None:
+            body = jsonlib.dumps(json, ensure_ascii=False).encode('utf-8')
+            request_headers.setdefault('Content-Type', 'application/json')
+
+        method = method.upper()
+        retry = retry or self.retry
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        retry_statuses = retry.retry_statuses if idempotent else retry.unsafe_retry_statuses
+        timeout = self.timeout if timeout is None else timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            self.requests += 1
+            try:
+                response = await asyncio.wait_for(
+                    self._send(method, url, body, request_headers, idempotent), timeout)
+            except asyncio.TimeoutError:
+                error = HttpTimeout(f"Délai dépassé ({timeout}s) : {method} {url}")
+                replayable = idempotent
+            except _ConnectFailed as e:
+                error = HttpError(f"Connexion impossible : {method} {url} : {e}")
+                replayable = True
+            except (OSError, asyncio.IncompleteReadError) as e:
+                error = HttpError(f"Erreur réseau : {method} {url} : {e or type(e).__name__}")
+                replayable = idempotent
+            else:
+                if response.status in retry_statuses and attempt < retry.max_attempts:
+                    self.retries += 1
+                    await asyncio.sleep(retry.delay(attempt, response))
+                    continue
+                return response
+
+            if not (retry.retry_connection_errors and replayable) or attempt >= retry.max_attempts:
+                raise error
+            self.retries += 1
+            await asyncio.sleep(retry.delay(attempt))
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict:
+        return {
+            'http2': self.http2,
+            'requests': self.requests,
+            'connections_opened': self.connections_opened,
+            'connections_reused': self.connections_reused,
+            'idle_connections': sum(len(pool.idle) for pool in self._pools.values()),
+            'retries': self.retries
+        }
+
+    async def close(self):
+        """Ferme les connexions inactives (et le client httpx éventuel)"""
+        for pool in self._pools.values():
+            while pool.idle:
+                connection = pool.idle.popleft()
+                connection.close()
+        if self._httpx is not None:
+            await self._httpx.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # Transport HTTP/1.1
+    # ------------------------------------------------------------------
+
+    async def _send(self, method: str, url: str, body: bytes, headers: Dict[str, str],
+                    idempotent: bool = True) -> HttpResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ValueError(f"schéma non supporté : {url}")
+        host = parts.hostname
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, host, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(self.limit_per_host)
+
+        async with pool.semaphore:
+            if self._httpx is not None:
+                return await self._send_httpx(method, url, body, headers)
+
+            target = parts.path or '/'
+            if parts.query:
+                target += '?' + parts.query
+            host_header = host if port in (80, 443) else f"{host}:{port}"
+            head = self._encode_head(method, target, host_header, body, headers)
+
+            connection = self._idle_connection(pool)
+            if connection is not None:
+                try:
+                    return await self._exchange(pool, connection, method, url, head, body)
+                except ConnectionError:
+                    # Connexion fermée par le serveur pendant l'inactivité, ou coupée
+                    # après réception : seule une requête idempotente est renvoyée
+                    if not idempotent:
+                        raise
+            connection = await self._open(scheme, host, port)
+            return await self._exchange(pool, connection, method, url, head, body)
+
+    def _idle_connection(self, pool: _HostPool) -> Optional[_Connection]:
+        now = time.monotonic()
+        while pool.idle:
+            connection = pool.idle.pop()
+            if connection.usable(now, self.keepalive_expiry):
+                self.connections_reused += 1
+                return connection
+            connection.close()
+        return None
+
+    async def _open(self, scheme: str, host: str, port: int) -> _Connection:
+        context = None
+        if scheme == 'https':
+            context = self._ssl_context or ssl.create_default_context()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=context,
+                                        server_hostname=host if context else None),
+                self.connect_timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise _ConnectFailed(f"{host}:{port} : {e or type(e).__name__}") from e
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    @staticmethod
+    def _encode_head(method, target, host_header, body, headers) -> bytes:
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host_header}"]
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _exchange(self, pool: _HostPool, connection: _Connection, method: str, url: str,
+                        head: bytes, body: bytes) -> HttpResponse:
+        try:
+            connection.writer.write(head + body)
+            await connection.writer.drain()
+            response, keep_alive = await self._read_response(connection.reader, method, url)
+        except BaseException:
+            # Réponse partielle ou annulation (délai) : la connexion n'est plus fiable
+            connection.close()
+            raise
+
+        if keep_alive:
+            connection.idle_since = time.monotonic()
+            pool.idle.append(connection)
+        else:
+            connection.close()
+        return response
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method: str, url: str):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connexion fermée par le serveur")
+        version, status, *reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        status = int(status)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n'):
+                break
+            if not line:
+                raise asyncio.IncompleteReadError(b'', None)
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0], 16)
+                if size == 0:
+                    # Trailers éventuels jusqu'à la ligne vide
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        return HttpResponse(status, reason[0] if reason else '', headers, body, url), keep_alive
+
+    # ------------------------------------------------------------------
+    # Transport HTTP/2 (httpx)
+    # ------------------------------------------------------------------
+
+    async def _send_httpx(self, method, url, body, headers) -> HttpResponse:
+        import httpx
+        try:
+            response = await self._httpx.request(method, url, content=body or None, headers=headers)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            raise _ConnectFailed(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError() from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+        return HttpResponse(response.status_code, response.reason_phrase,
+                            {name.lower(): value for name, value in response.headers.items()},
+                            response.content, url)
+
+
+_shared_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_http_client(**options) -> HttpClient:
+    """Client partagé de la boucle asyncio courante (créé au premier appel)"""
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None:
+        client = _shared_clients[loop] = HttpClient(**options)
+    return client
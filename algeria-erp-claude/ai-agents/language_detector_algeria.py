@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🌍 Détecteur de langue partagé Algeria - Passe unique
+Support: العربية, الدارجة, Français, English, ⵜⴰⵎⴰⵣⵉⵖⵜ
+Un seul tokeniseur compilé + une table de lexiques avec frontières de mots
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+LANGUAGES = ('ar', 'ar_dz', 'fr', 'en', 'ber')
+
+# Lexiques par langue (mots entiers, en minuscules)
+LEXICONS = {
+    'ar_dz': [
+        'كيفاش', 'واش', 'بصح', 'هكاك', 'ديال', 'نتاع', 'تاع', 'ماشي', 'برك',
+        'دراري', 'ولاد', 'كاش', 'ابعتلي'
+    ],
+    'ber': [
+        # Mots amazigh courants
+        'deg', 'n', 'akken', 'ma', 'neɣ', 'ad', 'ur', 'ara',
+        'amek', 'melmi', 'anda', 'ayenna', 'wid', 'tid',
+        # Nombres
+        'yiwen', 'sin', 'kraḍ', 'kkuẓ', 'semmus', 'sḍis',
+        # Calculs/argent
+        'asiḍen', 'tigawin', 'azref', 'idrimen', 'tamurt',
+        # Berbère Kabyle
+        'tizi', 'adrar', 'aman', 'tafukt', 'aggur',
+        # Chaoui
+        'amellal', 'aberkan', 'azegzaw',
+        # Mozabite
+        'taghardayt', 'bani', 'mzab',
+        # Targui
+        'tamashek', 'kel', 'akal',
+        # Salutations / interface
+        'azul', 'tanemmirt', 'tallalt', 'anagraw', 'zemreɣ', 'amaɛiw'
+    ],
+    'en': [
+        'hello', 'help', 'calculate', 'tax', 'vat', 'income', 'salary',
+        'how', 'what', 'when', 'the', 'is', 'for', 'with', 'please', 'my'
+    ],
+    'fr': [
+        'calculer', 'tva', 'irg', 'bonjour', 'aide', 'salut', 'pour', 'avec',
+        'sur', 'salaire', 'enfant', 'enfants', 'le', 'la', 'les', 'des', 'du',
+        'est', 'comment', 'quel', 'quelle', 'impôt', 'taxe', 'montant'
+    ]
+}
+
+# Un seul passage regex : Tifinagh | arabe | mot latin (élisions comprises)
+_TOKEN_RE = re.compile(
+    r"(?P<tif>[\u2D30-\u2D7F]+)"
+    r"|(?P<ar>[\u0600-\u06FF]+)"
+    r"|(?P<lat>[^\W\d_]+(?:['’][^\W\d_]+)*)"
+)
+
+_FR_ACCENTS = frozenset('àâäéèêëïîôùûüÿç')
+
+# Proclitiques arabes retirés avant recherche dans le lexique
+_AR_PREFIXES = ('وال', 'بال', 'لل', 'ال', 'و')
+
+# Ordre de priorité quand aucun critère fort ne tranche
+_LATIN_PRIORITY = ('ber', 'en', 'fr')
+
+
+class LanguageDetector:
+    """🌍 Détection en une passe : scores pour toutes les langues"""
+
+    def __init__(self, lexicons: Optional[Dict[str, Iterable[str]]] = None):
+        lexicons = LEXICONS if lexicons is None else lexicons
+        # Table compilée : mot -> langues qui le revendiquent
+        table = {}
+        for language, words in lexicons.items():
+            for word in words:
+                table.setdefault(word.lower(), set()).add(language)
+        self._table = {word: tuple(sorted(langs)) for word, langs in table.items()}
+
+    def _lookup_arabic(self, token: str) -> tuple:
+        """Recherche d'un mot arabe, avec ou sans proclitique"""
+        languages = self._table.get(token)
+        if languages:
+            return languages
+        for prefix in _AR_PREFIXES:
+            if token.startswith(prefix) and len(token) > len(prefix) + 1:
+                languages = self._table.get(token[len(prefix):])
+                if languages:
+                    return languages
+        return ()
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """🔍 Passe unique sur le texte : scores par langue + scripts"""
+        scores = dict.fromkeys(LANGUAGES, 0)
+        scores['tifinagh'] = 0
+        table = self._table
+
+        for match in _TOKEN_RE.finditer(text.lower()):
+            group = match.lastgroup
+            token = match.group()
+
+            if group == 'tif':
+                scores['tifinagh'] += 1
+                scores['ber'] += 1
+            elif group == 'ar':
+                scores['ar'] += 1
+                for language in self._lookup_arabic(token):
+                    scores[language] += 1
+            else:
+                for language in table.get(token, ()):
+                    scores[language] += 1
+                if not token.isascii() and _FR_ACCENTS.intersection(token):
+                    scores['fr'] += 1
+
+        return scores
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """📊 Scores par langue (sans les compteurs de script)"""
+        scores = self.scan(text)
+        del scores['tifinagh']
+        return scores
+
+    def detect(self, text: str, languages: Iterable[str] = LANGUAGES,
+               default: str = 'fr') -> str:
+        """🎯 Langue la plus probable parmi `languages`"""
+        return self.decide(self.scan(text), languages, default)
+
+    @staticmethod
+    def decide(scores: Dict[str, int], languages: Iterable[str] = LANGUAGES,
+               default: str = 'fr') -> str:
+        """Décision à partir des scores d'une passe"""
+        allowed = set(languages)
+
+        # 1. Script Tifinagh, 2. darija, 3. arabe standard
+        if scores.get('tifinagh') and 'ber' in allowed:
+            return 'ber'
+        if scores['ar_dz'] and 'ar_dz' in allowed:
+            return 'ar_dz'
+        if scores['ar'] and 'ar' in allowed:
+            return 'ar'
+
+        # 4. Texte latin : meilleur score, départage ber > en > fr
+        best, best_score = default, 0
+        for language in _LATIN_PRIORITY:
+            if language in allowed and scores[language] > best_score:
+                best, best_score = language, scores[language]
+        return best
+
+
+_shared_detector = None
+
+
+def get_detector() -> LanguageDetector:
+    """Détecteur partagé par tous les agents (compilé une seule fois)"""
+    global _shared_detector
+    if _shared_detector is None:
+        _shared_detector = LanguageDetector()
+    return _shared_detector
+
+
+def detect_language(text: str, languages: Iterable[str] = LANGUAGES,
+                    default: str = 'fr') -> str:
+    """🌍 Raccourci : détection avec le détecteur partagé"""
+    return get_detector().detect(text, languages, default)
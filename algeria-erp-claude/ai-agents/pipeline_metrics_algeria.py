@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📈 Instrumentation du pipeline fiscal Algeria - Latence par étape
+Histogrammes et compteurs par langue / type de calcul, export Prometheus
+ou dict, profilage échantillonné des requêtes les plus lentes
+"""
+
+import cProfile
+import heapq
+import io
+import random
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+STAGES = ('detect', 'extract', 'classify', 'calculate', 'format')
+
+# Bornes des histogrammes (secondes), style Prometheus
+DEFAULT_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+
+def _label(value) -> str:
+    """Valeur d'étiquette Prometheus échappée (\\, guillemet, saut de ligne)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Histogram:
+    """Histogramme cumulable à bornes fixes (en nanosecondes en interne)"""
+
+    __slots__ = ('counts', 'total_ns')
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)  # dernier seau : +Inf
+        self.total_ns = 0
+
+
+class PipelineMetrics:
+    """📈 Collecteur de latences par étape (thread-safe, coût de quelques µs)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 profile_rate: float = 0.0, slow_threshold: Optional[float] = None,
+                 on_slow: Optional[Callable[[Dict], None]] = None, keep_slowest: int = 10):
+        self.buckets = tuple(buckets)
+        self._bounds_ns = [int(bound * 1e9) for bound in self.buckets]
+        self.profile_rate = profile_rate
+        self.slow_threshold = slow_threshold
+        self.on_slow = on_slow
+        self.keep_slowest = keep_slowest
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._histograms: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._queries: Dict[Tuple[str, str], int] = {}
+        self._cache_hits: Dict[Tuple[str, str], int] = {}
+        self._errors = 0
+        # Tas min (durée totale ns, seq, rapport) des requêtes profilées les plus lentes
+        self._slowest: List[Tuple[int, int, Dict]] = []
+        self._seq = 0
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def start_profile(self) -> Optional[cProfile.Profile]:
+        """🔬 Profileur pour une fraction `profile_rate` des requêtes, sinon None"""
+        if self.profile_rate and random.random() < self.profile_rate:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        return None
+
+    def observe(self, timings_ns: Dict[str, int], language: str, calc_type: str,
+                cache_hit: bool = False, query: Optional[str] = None,
+                profiler: Optional[cProfile.Profile] = None):
+        """Enregistre les durées (ns) des étapes exécutées pour une requête"""
+        total_ns = sum(timings_ns.values())
+        bounds = self._bounds_ns
+        size = len(bounds)
+
+        with self._lock:
+            for stage, elapsed in timings_ns.items():
+                key = (stage, language, calc_type)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = _Histogram(size)
+                histogram.counts[bisect_left(bounds, elapsed)] += 1
+                histogram.total_ns += elapsed
+
+            labels = (language, calc_type)
+            self._queries[labels] = self._queries.get(labels, 0) + 1
+            if cache_hit:
+                self._cache_hits[labels] = self._cache_hits.get(labels, 0) + 1
+
+        if profiler is not None:
+            profiler.disable()
+            self._keep_profile(total_ns, timings_ns, language, calc_type, query, profiler)
+        elif (self.on_slow is not None and self.slow_threshold is not None
+              and total_ns >= self.slow_threshold * 1e9):
+            self.on_slow(self._report(total_ns, timings_ns, language, calc_type, query, None))
+
+    def observe_error(self, profiler: Optional[cProfile.Profile] = None):
+        if profiler is not None:
+            profiler.disable()
+        with self._lock:
+            self._errors += 1
+
+    def _report(self, total_ns, timings_ns, language, calc_type, query, profile_text) -> Dict:
+        return {
+            'total_seconds': total_ns / 1e9,
+            'stages': {stage: elapsed / 1e9 for stage, elapsed in timings_ns.items()},
+            'language': language,
+            'calculation_type': calc_type,
+            'query': query,
+            'profile': profile_text
+        }
+
+    def _keep_profile(self, total_ns, timings_ns, language, calc_type, query, profiler):
+        """Conserve le profil si la requête fait partie des plus lentes"""
+        is_slow = self.slow_threshold is not None and total_ns >= self.slow_threshold * 1e9
+        with self._lock:
+            keep = (len(self._slowest) < self.keep_slowest
+                    or total_ns > self._slowest[0][0])
+        if not keep and not is_slow:
+            return
+
+        import pstats  # uniquement pour les requêtes conservées (import coûteux)
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(15)
+        report = self._report(total_ns, timings_ns, language, calc_type, query, stream.getvalue())
+
+        if keep:
+            with self._lock:
+                self._seq += 1
+                entry = (total_ns, self._seq, report)
+                if len(self._slowest) < self.keep_slowest:
+                    heapq.heappush(self._slowest, entry)
+                else:
+                    heapq.heappushpop(self._slowest, entry)
+
+        if is_slow and self.on_slow is not None:
+            self.on_slow(report)
+
+    def slowest(self) -> List[Dict]:
+        """Rapports profilés des requêtes les plus lentes (plus lente en tête)"""
+        with self._lock:
+            return [report for _, _, report in sorted(self._slowest, reverse=True)]
+
+    def snapshot(self) -> Dict:
+        """📊 Instantané : histogrammes, compteurs par langue/type, erreurs"""
+        with self._lock:
+            stages = {}
+            for (stage, language, calc_type), histogram in self._histograms.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                stages.setdefault(stage, []).append({
+                    'language': language,
+                    'calculation_type': calc_type,
+                    'count': cumulative,
+                    'sum_seconds': histogram.total_ns / 1e9,
+                    'buckets': buckets
+                })
+            return {
+                'stages': stages,
+                'queries': [
+                    {'language': language, 'calculation_type': calc_type, 'count': count}
+                    for (language, calc_type), count in self._queries.items()
+                ],
+                'cache_hits': [
+                    {'language': language, 'calculation_type': calc_type, 'count': count}
+                    for (language, calc_type), count in self._cache_hits.items()
+                ],
+                'errors': self._errors
+            }
+
+    def prometheus_text(self, prefix: str = 'fiscal') -> str:
+        """📤 Export au format texte Prometheus"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_latency_seconds Latence par étape du pipeline fiscal",
+            f"# TYPE {prefix}_stage_latency_seconds histogram"
+        ]
+        for stage in STAGES:
+            for series in snapshot['stages'].get(stage, []):
+                labels = (f'stage="{stage}",language="{_label(series["language"])}",'
+                          f'calc_type="{_label(series["calculation_type"])}"')
+                for bound, count in series['buckets'].items():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_stage_latency_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f'{prefix}_stage_latency_seconds_sum{{{labels}}} {series["sum_seconds"]!r}')
+                lines.append(f'{prefix}_stage_latency_seconds_count{{{labels}}} {series["count"]}')
+
+        for name, key, help_text in (
+                ('queries_total', 'queries', "Requêtes traitées par langue et type de calcul"),
+                ('cache_hits_total', 'cache_hits', "Réponses servies depuis le cache")):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for series in snapshot[key]:
+                lines.append(
+                    f'{prefix}_{name}{{language="{_label(series["language"])}",'
+                    f'calc_type="{_label(series["calculation_type"])}"}} {series["count"]}'
+                )
+
+        lines.append(f"# HELP {prefix}_query_errors_total Requêtes en erreur")
+        lines.append(f"# TYPE {prefix}_query_errors_total counter")
+        lines.append(f"{prefix}_query_errors_total {snapshot['errors']}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚦 Limiteurs de débit (seau à jetons) pour les API des plateformes
+Quotas par défaut alignés sur les limites publiées de chaque API
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# plateforme -> (messages par seconde, rafale maximale)
+PLATFORM_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    'telegram': (30.0, 30.0),   # Bot API : ~30 messages/s tous destinataires confondus
+    'whatsapp': (80.0, 80.0),   # Cloud API : 80 messages/s par numéro (palier standard)
+    'signal': (5.0, 10.0),      # signal-cli : pas de quota publié, limite prudente
+}
+
+
+class TokenBucket:
+    """🚦 Seau à jetons asyncio : débit moyen `rate`/s, rafale `capacity`
+
+    Les jetons sont réservés à l'appel (le solde peut devenir négatif) :
+    chaque appelant attend exactement sa part, dans l'ordre d'arrivée,
+    sans verrou ni réveil inutile.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate doit être > 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._last = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Réserve des jetons et retourne l'attente nécessaire (secondes)"""
+        self._refill()
+        self._tokens -= tokens
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    async def acquire(self, tokens: float = 1.0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+def platform_buckets(rate_limits: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
+                     ) -> Dict[str, TokenBucket]:
+    """Un seau par plateforme ; une limite à None = pas de limitation"""
+    limits = dict(PLATFORM_RATE_LIMITS)
+    if rate_limits:
+        limits.update(rate_limits)
+    buckets = {}
+    for platform, limit in limits.items():
+        if limit is not None:
+            rate, capacity = limit
+            buckets[platform] = TokenBucket(rate, capacity)
+    return buckets
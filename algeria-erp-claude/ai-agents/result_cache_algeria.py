@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗃️ Cache de résultats LRU + TTL partagé par les agents Algeria
+Taille bornée, expiration, compteurs hits/misses/évictions ; regroupement
+des calculs identiques simultanés (single-flight)
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Union
+
+_MISSING = object()
+
+
+class LruTtlCache:
+    """🗃️ Cache LRU avec durée de vie par entrée (thread-safe)"""
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize < 0:
+            raise ValueError("maxsize doit être >= 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # clé -> (expiration, valeur)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Valeur en cache (et rafraîchie en LRU), ou `default`"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires, value = entry
+            if expires is not None and expires <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insère ou remplace une entrée, en évinçant la moins récente si plein"""
+        if self.maxsize == 0:
+            return
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        """📊 Compteurs pour le dimensionnement en production"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class SingleFlight:
+    """🛫 Un seul calcul en vol par clé, résultat partagé puis mis en cache
+
+    Les appels simultanés de même clé attendent la tâche du premier appel
+    (protégée par asyncio.shield : l'annulation d'un appelant n'interrompt
+    pas le calcul des autres). Les erreurs sont propagées à tous les
+    appelants en attente mais jamais mises en cache.
+    """
+
+    def __init__(self, cache: Optional[LruTtlCache] = None):
+        self.cache = cache if cache is not None else LruTtlCache(maxsize=1024, ttl=300.0)
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.computations = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, compute: Callable[[], Union[Any, Awaitable]]) -> Any:
+        """Résultat pour `key` : cache, calcul en vol, ou nouveau calcul"""
+        self.calls += 1
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.computations += 1
+            task = asyncio.ensure_future(self._compute(key, compute))
+            # Erreur marquée comme lue même si tous les appelants ont été annulés
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable) -> Any:
+        try:
+            value = compute()
+            if inspect.isawaitable(value):
+                value = await value
+            self.cache.put(key, value)
+            return value
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict:
+        """📊 Appels, calculs réels, appels regroupés, cache"""
+        cache = self.cache.stats()
+        return {
+            'calls': self.calls,
+            'computations': self.computations,
+            'coalesced': self.coalesced,
+            'cache_hits': cache['hits'],
+            'in_flight': len(self._in_flight),
+            'saved_ratio': 1 - self.computations / self.calls if self.calls else 0.0,
+            'cache': cache
+        }
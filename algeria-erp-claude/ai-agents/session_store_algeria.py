@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💬 Sessions de conversation Algeria (une par utilisateur)
+Enregistrements compacts en tableaux `array` : langue collante, dernière
+intention, dernières entités ; expiration (TTL) et plafond mémoire
+"""
+
+import math
+import time
+from array import array
+from typing import Callable, Dict, Iterable, Optional
+
+from language_detector_algeria import LANGUAGES, get_detector
+
+INTENTS = ('general', 'welcome', 'tva', 'irg')
+
+# Écriture du texte : une session ne saute la détection que si le nouveau
+# message est dans la même écriture que celui qui a fixé la langue
+SCRIPT_LATIN, SCRIPT_ARABIC, SCRIPT_TIFINAGH = 0, 1, 2
+
+_FLAG_EXPORT = 1
+_FLAG_ZONE = 2
+_FLAG_REFERENCED = 4  # seconde chance avant éviction
+_NO_AMOUNT = -1
+_NO_CHILDREN = -1
+_MAX_CENTIMES = 2 ** 63 - 1  # plage de array('q')
+
+
+def _centimes(amount) -> int:
+    """Montant en centimes ; _NO_AMOUNT si absent, infini ou hors de la plage stockable"""
+    if amount is None or not math.isfinite(amount):
+        return _NO_AMOUNT
+    centimes = round(amount * 100)
+    return centimes if -_MAX_CENTIMES <= centimes <= _MAX_CENTIMES else _NO_AMOUNT
+
+
+def text_script(text: str) -> int:
+    """Écriture de la première lettre du texte (coût : quelques caractères)"""
+    for char in text:
+        if char.isalpha():
+            code = ord(char)
+            if 0x2D30 <= code <= 0x2D7F:
+                return SCRIPT_TIFINAGH
+            if 0x0600 <= code <= 0x06FF or 0x0750 <= code <= 0x077F or 0xFB50 <= code <= 0xFEFF:
+                return SCRIPT_ARABIC
+            return SCRIPT_LATIN
+    return SCRIPT_LATIN
+
+
+class Session:
+    """Vue en lecture d'une session (les données restent dans les tableaux)"""
+
+    __slots__ = ('user_id', 'language', 'intent', 'entities', 'confirmations')
+
+    def __init__(self, user_id, language, intent, entities, confirmations):
+        self.user_id = user_id
+        self.language = language
+        self.intent = intent
+        self.entities = entities
+        self.confirmations = confirmations
+
+    def __repr__(self):
+        return (f"Session({self.user_id!r}, language={self.language!r}, "
+                f"intent={self.intent!r}, entities={self.entities!r})")
+
+
+class SessionStore:
+    """💬 Sessions actives indexées par utilisateur
+
+    Un seul dict (user_id -> numéro de case) ; tout le reste tient dans des
+    tableaux typés d'environ 20 octets par session. La langue devient
+    collante après `confirmations` détections concordantes : les messages
+    suivants dans la même écriture la réutilisent sans détection, avec une
+    détection de contrôle tous les `recheck_every` messages.
+
+    Plafond `maxsize` : éviction approximativement LRU (file circulaire
+    avec seconde chance pour les sessions utilisées depuis leur entrée).
+    Les sessions inactives depuis `ttl` secondes sont ignorées à la lecture
+    et récupérées en tête de file.
+    """
+
+    def __init__(self, maxsize: int = 1_000_000, ttl: float = 1800.0,
+                 confirmations: int = 2, recheck_every: int = 16,
+                 intents: Iterable[str] = INTENTS, detector=None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize doit être > 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.confirmations = confirmations
+        self.recheck_every = recheck_every
+        self.intents = tuple(intents)
+        self._intent_codes = {intent: code for code, intent in enumerate(self.intents)}
+        self._language_codes = {language: code for code, language in enumerate(LANGUAGES)}
+        self.detector = detector or get_detector()
+        self._clock = clock
+        # Horodatages >= 1 : la valeur 0 marque une case vide ou expirée
+        self._origin = clock() - 1
+
+        self._index: Dict[str, int] = {}
+        self._users = []                      # case -> user_id
+        self._language = array('B')
+        self._script = array('B')
+        self._streak = array('B')              # détections concordantes / messages depuis contrôle
+        self._intent = array('B')
+        self._flags = array('B')
+        self._children = array('b')
+        self._amount = array('q')              # centimes
+        self._seen = array('I')                # secondes depuis l'origine
+        self._free = array('I')
+        # File circulaire des cases occupées, dans l'ordre d'entrée
+        self._ring = array('I')
+        self._head = 0
+        self._count = 0
+
+        self.detections = 0
+        self.skipped = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # ------------------------------------------------------------------
+    # Cases
+    # ------------------------------------------------------------------
+
+    def _now(self) -> int:
+        return int(self._clock() - self._origin)
+
+    def _live_slot(self, user_id: str, now: int) -> Optional[int]:
+        """Case de l'utilisateur ; une session expirée est remise à zéro (horodatage 0)"""
+        slot = self._index.get(user_id)
+        if slot is not None and self._seen[slot] and now - self._seen[slot] >= self.ttl:
+            self._reset(slot)
+            self.expirations += 1
+        return slot
+
+    def _reset(self, slot: int):
+        """La case reste attribuée à l'utilisateur mais la session repart à zéro"""
+        self._streak[slot] = 0
+        self._intent[slot] = 0
+        self._flags[slot] &= _FLAG_REFERENCED
+        self._children[slot] = _NO_CHILDREN
+        self._amount[slot] = _NO_AMOUNT
+        self._seen[slot] = 0
+
+    def _push(self, slot: int):
+        ring = self._ring
+        if self._count == len(ring):
+            # Agrandissement par doublement (plafonné à maxsize), file remise à plat
+            ring = self._ring = ring[self._head:] + ring[:self._head]
+            ring.frombytes(bytes(4 * min(self.maxsize - len(ring), max(16, len(ring)))))
+            self._head = 0
+        ring[(self._head + self._count) % len(ring)] = slot
+        self._count += 1
+
+    def _pop(self) -> int:
+        slot = self._ring[self._head]
+        self._head = (self._head + 1) % len(self._ring)
+        self._count -= 1
+        return slot
+
+    def _release(self, slot: int):
+        del self._index[self._users[slot]]
+        self._users[slot] = None
+
+    def _sweep(self, now: int, budget: int = 2):
+        """Récupère quelques sessions expirées en tête de file (coût amorti)"""
+        while budget and self._count:
+            slot = self._ring[self._head]
+            seen = self._seen[slot]
+            if seen and now - seen < self.ttl:
+                return
+            self._pop()
+            if seen:
+                self.expirations += 1
+            self._release(slot)
+            self._free.append(slot)
+            budget -= 1
+
+    def _allocate(self, user_id: str, now: int) -> int:
+        self._sweep(now)
+        if self._free:
+            slot = self._free.pop()
+        elif len(self._users) < self.maxsize:
+            slot = len(self._users)
+            self._users.append(None)
+            for column in (self._language, self._script, self._streak, self._intent, self._flags):
+                column.append(0)
+            self._children.append(_NO_CHILDREN)
+            self._amount.append(_NO_AMOUNT)
+            self._seen.append(0)
+        else:
+            # Seconde chance : une session relue depuis son entrée repasse en queue
+            while True:
+                slot = self._pop()
+                seen = self._seen[slot]
+                if self._flags[slot] & _FLAG_REFERENCED and seen and now - seen < self.ttl:
+                    self._flags[slot] ^= _FLAG_REFERENCED
+                    self._push(slot)
+                    continue
+                self._release(slot)
+                self.evictions += 1
+                break
+
+        # Case vide (horodatage 0) jusqu'au _touch de l'appelant
+        self._users[slot] = user_id
+        self._index[user_id] = slot
+        self._language[slot] = self._script[slot] = self._streak[slot] = 0
+        self._intent[slot] = self._flags[slot] = 0
+        self._children[slot] = _NO_CHILDREN
+        self._amount[slot] = _NO_AMOUNT
+        self._seen[slot] = 0
+        self._push(slot)
+        return slot
+
+    def _touch(self, slot: int, now: int):
+        # Seule une session déjà vue mérite une seconde chance à l'éviction
+        if self._seen[slot]:
+            self._flags[slot] |= _FLAG_REFERENCED
+        self._seen[slot] = now
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def detect_language(self, user_id: str, text: str) -> str:
+        """🌍 Langue du message, détection sautée si la session l'a déjà fixée"""
+        now = self._now()
+        slot = self._live_slot(user_id, now)
+        script = text_script(text)
+
+        if slot is not None and self._seen[slot]:
+            streak = self._streak[slot]
+            if (streak >= self.confirmations and self._script[slot] == script
+                    and streak < self.confirmations + self.recheck_every):
+                self._streak[slot] = streak + 1
+                self._touch(slot, now)
+                self.skipped += 1
+                return LANGUAGES[self._language[slot]]
+
+        self.detections += 1
+        language = self.detector.detect(text)
+        code = self._language_codes[language]
+        if slot is None:
+            slot = self._allocate(user_id, now)
+
+        if self._streak[slot] and self._language[slot] == code and self._script[slot] == script:
+            # Détection concordante (ou contrôle périodique réussi)
+            self._streak[slot] = min(self._streak[slot], self.confirmations - 1) + 1
+        else:
+            self._language[slot] = code
+            self._script[slot] = script
+            self._streak[slot] = 1
+        self._touch(slot, now)
+        return language
+
+    def is_active(self, user_id: str) -> bool:
+        """Conversation en cours (session non expirée ayant déjà reçu un message)"""
+        slot = self._live_slot(user_id, self._now())
+        return slot is not None and self._seen[slot] != 0
+
+    def remember(self, user_id: str, intent: str, entities: Optional[Dict] = None):
+        """🧠 Dernière intention et entités (montant, enfants, export, zone franche)"""
+        now = self._now()
+        slot = self._live_slot(user_id, now)
+        if slot is None:
+            slot = self._allocate(user_id, now)
+        self._intent[slot] = self._intent_codes.get(intent, 0)
+
+        entities = entities or {}
+        self._amount[slot] = _centimes(entities.get('amount'))
+        children = entities.get('children')
+        self._children[slot] = _NO_CHILDREN if children is None else min(children, 127)
+        flags = self._flags[slot] & _FLAG_REFERENCED
+        if entities.get('is_export'):
+            flags |= _FLAG_EXPORT
+        if entities.get('is_zone_franche'):
+            flags |= _FLAG_ZONE
+        self._flags[slot] = flags
+        self._touch(slot, now)
+
+    def get(self, user_id: str) -> Optional[Session]:
+        """Session active de l'utilisateur, ou None"""
+        slot = self._live_slot(user_id, self._now())
+        if slot is None or not self._seen[slot]:
+            return None
+
+        entities = {}
+        if self._amount[slot] != _NO_AMOUNT:
+            entities['amount'] = self._amount[slot] / 100
+        if self._children[slot] != _NO_CHILDREN:
+            entities['children'] = self._children[slot]
+        if self._flags[slot] & _FLAG_EXPORT:
+            entities['is_export'] = True
+        if self._flags[slot] & _FLAG_ZONE:
+            entities['is_zone_franche'] = True
+        language = LANGUAGES[self._language[slot]] if self._streak[slot] else None
+        return Session(user_id, language, self.intents[self._intent[slot]], entities,
+                       min(self._streak[slot], self.confirmations))
+
+    def delete(self, user_id: str):
+        """Termine la session (la case est récupérée par le balayage)"""
+        slot = self._index.get(user_id)
+        if slot is not None:
+            self._reset(slot)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, user_id: str) -> bool:
+        return self.is_active(user_id)
+
+    def stats(self) -> Dict:
+        """📊 Compteurs : détections évitées, évictions, expirations"""
+        messages = self.detections + self.skipped
+        return {
+            'size': len(self._index),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'detections': self.detections,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / messages if messages else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
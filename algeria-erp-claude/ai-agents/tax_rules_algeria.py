@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📚 Règles fiscales Algeria versionnées - Fichier de données par exercice
+Tables compilées immuables (cumuls IRG aux bornes), rechargement à chaud atomique
+et recherche par date d'effet pour recalculer les périodes passées
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, List, Optional, Union
+
+from fiscal_batch_algeria import IrgBracketTable, TvaRateTable
+
+logger = logging.getLogger('TaxRules')
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  'data', 'tax_rules_dz.json')
+
+
+def _freeze(value):
+    """Vue en lecture seule (dicts -> MappingProxyType, listes -> tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Copie modifiable et sérialisable (pickle) d'une vue figée"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class TaxRuleTable:
+    """📊 Jeu de règles d'un exercice, compilé une fois et immuable"""
+
+    __slots__ = ('fiscal_year', 'effective_from', 'knowledge', 'irg', 'tva')
+
+    def __init__(self, knowledge: Dict, fiscal_year: Optional[int] = None,
+                 effective_from: Optional[date] = None):
+        self.fiscal_year = fiscal_year
+        self.effective_from = effective_from
+        # Même structure que l'ancien FiscalAiAgent.tax_knowledge, en lecture seule
+        self.knowledge = _freeze(knowledge)
+        self.irg = IrgBracketTable(knowledge)
+        self.tva = TvaRateTable(knowledge)
+
+    def to_dict(self) -> Dict:
+        """Base de connaissances sous forme de dict ordinaire"""
+        return _thaw(self.knowledge)
+
+    @classmethod
+    def from_rule_set(cls, rule_set: Dict) -> 'TaxRuleTable':
+        """Construction depuis une entrée du fichier de données (montants en chaînes)"""
+        knowledge = {
+            'tva_rates': {
+                name: Decimal(rate) for name, rate in rule_set['tva_rates'].items()
+            },
+            'irg_brackets': [
+                {
+                    'min': Decimal(bracket['min']),
+                    'max': float('inf') if bracket['max'] is None else Decimal(bracket['max']),
+                    'rate': Decimal(bracket['rate'])
+                }
+                for bracket in rule_set['irg_brackets']
+            ],
+            'abattements_irg': {
+                name: Decimal(value) for name, value in rule_set['abattements_irg'].items()
+            }
+        }
+        return cls(knowledge, rule_set['fiscal_year'],
+                   date.fromisoformat(rule_set['effective_from']))
+
+
+class TaxRuleBook:
+    """📚 Ensemble des exercices chargés depuis le fichier, rechargé à chaud"""
+
+    def __init__(self, path: str = DEFAULT_RULES_PATH, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        # Règles du jour mémorisées jusqu'à la prochaine vérification
+        self._current = None
+        self._current_until = 0.0
+        # (dates d'effet triées, tables, mtime) remplacés d'un seul bloc au rechargement
+        self._state = self._load()
+
+    def _load(self) -> tuple:
+        """Lecture + compilation complètes avant toute publication"""
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, encoding='utf-8') as handle:
+            data = json.load(handle)
+
+        tables = sorted(
+            (TaxRuleTable.from_rule_set(rule_set) for rule_set in data['rule_sets']),
+            key=lambda table: table.effective_from
+        )
+        if not tables:
+            raise ValueError(f"Aucun jeu de règles dans {self.path}")
+        return tuple(table.effective_from for table in tables), tuple(tables), mtime
+
+    def reload(self) -> bool:
+        """🔄 Recharge le fichier ; l'ancien état reste actif en cas d'erreur"""
+        with self._lock:
+            try:
+                state = self._load()
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Rechargement des règles fiscales impossible: {e}")
+                return False
+            self._state = state  # publication atomique
+            self._current = None
+        logger.info(f"📚 Règles fiscales rechargées: exercices {self.fiscal_years()}")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Recharge seulement si le fichier a été modifié"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        return mtime != self._state[2] and self.reload()
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self.reload_if_changed()
+
+    def fiscal_years(self) -> List[int]:
+        return [table.fiscal_year for table in self._state[1]]
+
+    def for_date(self, when: Union[date, str, None] = None) -> TaxRuleTable:
+        """📅 Règles en vigueur à une date (aujourd'hui par défaut)"""
+        if self.check_interval is not None:
+            self._maybe_reload()
+        if when is None:
+            when = date.today()
+        elif isinstance(when, str):
+            when = date.fromisoformat(when)
+        dates, tables, _ = self._state
+        index = bisect_right(dates, when)
+        if index == 0:
+            raise LookupError(f"Aucune règle fiscale en vigueur au {when.isoformat()}")
+        return tables[index - 1]
+
+    def for_year(self, fiscal_year: int) -> TaxRuleTable:
+        """Règles d'un exercice donné"""
+        for table in self._state[1]:
+            if table.fiscal_year == fiscal_year:
+                return table
+        raise LookupError(f"Exercice {fiscal_year} absent de {self.path}")
+
+    def current(self) -> TaxRuleTable:
+        """Règles en vigueur aujourd'hui (réévaluées toutes les check_interval s)"""
+        current = self._current
+        if current is None or time.monotonic() >= self._current_until:
+            current = self.for_date()
+            self._current = current
+            self._current_until = time.monotonic() + (self.check_interval or 0.0)
+        return current
+
+
+_shared_rule_book = None
+
+
+def get_rule_book() -> TaxRuleBook:
+    """Règles partagées par tous les agents du processus"""
+    global _shared_rule_book
+    if _shared_rule_book is None:
+        _shared_rule_book = TaxRuleBook()
+    return _shared_rule_book
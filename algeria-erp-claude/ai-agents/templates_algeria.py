@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📝 Registre de modèles de réponse multilingues partagé par les agents Algeria
+Chargé une seule fois, immuable, indexé par (type de message, langue)
+Support: العربية, الدارجة, Français, English, ⵜⴰⵎⴰⵣⵉⵖⵜ
+"""
+
+from string import Formatter
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+LANGUAGES = ('ar', 'ar_dz', 'fr', 'en', 'ber')
+
+# type de message -> langue -> modèle (syntaxe str.format)
+TEMPLATES = {
+    'tva_calculation': {
+        'ar': """💰 حساب ضريبة القيمة المضافة:
+المبلغ بدون ضريبة: {amount_ht:,.2f} دج
+معدل الضريبة: {tva_rate}%
+ضريبة القيمة المضافة: {tva_amount:,.2f} دج
+المبلغ الإجمالي: {amount_ttc:,.2f} دج""",
+
+        'ar_dz': """💰 حساب الضريبة:
+المبلغ بلا ضريبة: {amount_ht:,.2f} دج
+نسبة الضريبة: {tva_rate}%
+الضريبة: {tva_amount:,.2f} دج
+المجموع: {amount_ttc:,.2f} دج""",
+
+        'fr': """💰 Calcul TVA Algeria:
+Montant HT: {amount_ht:,.2f} DZD
+Taux TVA: {tva_rate}%
+Montant TVA: {tva_amount:,.2f} DZD
+Montant TTC: {amount_ttc:,.2f} DZD""",
+
+        'ber': """💰 Asiḍen n tigawin:
+Azal war tigawin: {amount_ht:,.2f} DZD
+Aḍris n tigawin: {tva_rate}%
+Tigawin: {tva_amount:,.2f} DZD
+Azal s tigawin: {amount_ttc:,.2f} DZD"""
+    },
+
+    'irg_calculation': {
+        'ar': """💼 حساب ضريبة الدخل الإجمالي:
+الراتب الإجمالي: {gross_salary:,.2f} دج
+الإعفاءات: {abattements:,.2f} دج
+ضريبة الدخل: {irg_amount:,.2f} دج
+الراتب الصافي: {net_salary:,.2f} دج
+عدد الأطفال: {children}""",
+
+        'ar_dz': """💼 حساب ضريبة الراتب:
+الراتب الكامل: {gross_salary:,.2f} دج
+التخفيضات: {abattements:,.2f} دج
+الضريبة: {irg_amount:,.2f} دج
+الراتب الصافي: {net_salary:,.2f} دج
+عدد الدراري: {children}""",
+
+        'fr': """💼 Calcul IRG Algeria:
+Salaire brut: {gross_salary:,.2f} DZD
+Abattements: {abattements:,.2f} DZD
+IRG: {irg_amount:,.2f} DZD
+Salaire net: {net_salary:,.2f} DZD
+Enfants: {children}""",
+
+        'ber': """💼 Asiḍen n tigawin n udem:
+Azref amellal: {gross_salary:,.2f} DZD
+Isenkisen: {abattements:,.2f} DZD
+Tigawin n udem: {irg_amount:,.2f} DZD
+Azref d uzayad: {net_salary:,.2f} DZD
+Arrac: {children}"""
+    },
+
+    'general_help': {
+        'ar': 'يمكنني مساعدتك في حساب الضرائب الجزائرية (TVA, IRG)',
+
+        'ar_dz': 'نقدر نعاونك في الضرائب تاع الجزائر',
+
+        'fr': 'Je peux vous aider avec les calculs fiscaux algériens',
+
+        'ber': 'Zemreɣ ad k-ɛiwneɣ deg tigawin n Dzayer (TVA, IRG)'
+    },
+
+    'welcome': {
+        'ar': """🇩🇿 أهلاً في نظام إدارة الأعمال الجزائري
+🤖 مساعدك الذكي للضرائب والمحاسبة
+📱 أستطيع مساعدتك في:
+- حساب ضريبة القيمة المضافة (TVA)
+- حساب ضريبة الدخل الإجمالي (IRG)
+- الإقرارات الضريبية
+
+أرسل استفسارك بأي لغة تريد 👍""",
+
+        'ar_dz': """🇩🇿 مرحبا بيك في السيستام تاع البيزنس الجزائري
+🤖 أنا المساعد الذكي تاعك للضرائب
+📱 نقدر نعاونك في:
+- حساب الضريبة (TVA)
+- ضريبة الراتب (IRG)
+- الإقرارات
+
+ابعتلي السؤال تاعك بأي لغة تحب 👍""",
+
+        'fr': """🇩🇿 Bienvenue dans Algeria ERP by Claude
+🤖 Assistant intelligent fiscal et comptable
+📱 Je peux vous aider avec:
+- Calculs TVA Algeria
+- Calculs IRG progressif
+- Déclarations fiscales
+
+Posez votre question dans la langue de votre choix 👍""",
+
+        'en': """🇩🇿 Welcome to Algeria ERP by Claude
+🤖 Your smart tax and accounting assistant
+📱 I can help you with:
+- Algeria VAT calculations
+- Progressive income tax (IRG)
+- Tax declarations
+
+Ask your question in any language 👍""",
+
+        'ber': """🇩🇿 Ansuf-ik deg unagraw n tnebgi n Dzayer
+🤖 Amaɛiw-ik n tikti i tigawin
+📱 Zemreɣ ad k-ɛiwneɣ deg:
+- Asiḍen n tigawin (TVA)
+- Asiḍen n udem (IRG)
+- Tinnubga n tigawin
+
+Azen-iyi asteqsi s tutlayt i tebɣiḍ 👍"""
+    },
+
+    # Accusé de réception WhatsApp (extrait du message reçu)
+    'message_received': {
+        'ar': "تم استلام رسالتك باللغة العربية: {excerpt}...",
+        'ar_dz': "وصلت الرسالة بالدارجة الجزائرية: {excerpt}...",
+        'fr': "Message reçu en français: {excerpt}...",
+        'en': "Message received in English: {excerpt}...",
+        'ber': "Yewweḍ-d izen s teqbaylit: {excerpt}..."
+    },
+
+    # Signal : données sécurisées et alertes diffusées
+    'secure_data': {
+        'ar': "🔒 بيانات آمنة: {data_type}",
+        'fr': "🔒 Données sécurisées: {data_type}",
+        'en': "🔒 Secure data: {data_type}"
+    },
+
+    'alert.deadline_fiscal': {
+        'ar': "🚨 تذكير: موعد الإقرار الضريبي قريب!",
+        'fr': "🚨 Rappel: Échéance déclaration fiscale proche!",
+        'en': "🚨 Reminder: Tax declaration deadline approaching!"
+    },
+
+    'alert.system_update': {
+        'ar': "⚡ تحديث النظام متاح",
+        'fr': "⚡ Mise à jour système disponible",
+        'en': "⚡ System update available"
+    }
+}
+
+# Langue de repli par type de message (None : pas de repli, le texte par défaut de l'appelant s'applique)
+FALLBACK_LANGUAGES = {
+    'tva_calculation': 'fr',
+    'irg_calculation': 'fr',
+    'general_help': 'fr',
+    'welcome': 'fr',
+    'message_received': 'fr',
+    'secure_data': 'fr',
+    'alert.deadline_fiscal': None,
+    'alert.system_update': None
+}
+
+
+class TemplateRegistry:
+    """📝 Modèles précompilés : une recherche de dict + un format_map par message"""
+
+    def __init__(self, templates: Dict[str, Dict[str, str]],
+                 fallbacks: Optional[Dict[str, Optional[str]]] = None):
+        fallbacks = fallbacks or {}
+        compiled = {}
+        for kind, by_language in templates.items():
+            entries = {
+                language: self._compile(text) for language, text in by_language.items()
+            }
+            # Repli résolu une fois pour toutes les langues connues
+            fallback = fallbacks.get(kind)
+            if fallback is not None:
+                for language in LANGUAGES:
+                    entries.setdefault(language, entries[fallback])
+            for language, entry in entries.items():
+                compiled[(kind, language)] = entry
+        self._compiled = MappingProxyType(compiled)
+        self._fallbacks = MappingProxyType(dict(fallbacks))
+
+    @staticmethod
+    def _compile(text: str) -> tuple:
+        """(texte, formateur lié) ; formateur None si le modèle n'a aucun champ"""
+        has_fields = any(field is not None for _, field, _, _ in Formatter().parse(text))
+        return (text, text.format_map if has_fields else None)
+
+    def has(self, kind: str, language: str) -> bool:
+        return (kind, language) in self._compiled
+
+    def text(self, kind: str, language: str) -> str:
+        """Modèle brut (sans substitution)"""
+        return self._compiled[(kind, language)][0]
+
+    def render(self, kind: str, language: str, values: Optional[Mapping] = None,
+               default: Optional[str] = None) -> str:
+        """🖨️ Rend le modèle (kind, language) ; `default` si absent, sinon KeyError"""
+        entry = self._compiled.get((kind, language))
+        if entry is None:
+            fallback = self._fallbacks.get(kind)
+            if fallback is not None:
+                entry = self._compiled[(kind, fallback)]
+            elif default is not None:
+                return default
+            else:
+                raise KeyError((kind, language))
+        text, formatter = entry
+        return formatter(values) if formatter is not None else text
+
+
+# Registre partagé, construit à l'import (une fois par processus)
+REGISTRY = TemplateRegistry(TEMPLATES, FALLBACK_LANGUAGES)
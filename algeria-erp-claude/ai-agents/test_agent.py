@@ -2,152 +2,1233 @@
 # -*- coding: utf-8 -*-
 """
 🧪 Test Agent IA Fiscal Algeria
-Tests des calculs fiscaux multilingues
+Tests des calculs fiscaux multilingues, client HTTP partagé (serveur
+d'API simulé), démon signal-cli (faux signal-cli), webhooks WhatsApp,
+sessions de conversation, calculs regroupés et ordonnancement de
+l'orchestrateur, réception Telegram, OCR des factures + garde-fou de performance
+(références dans benchmarks/baselines.json, voir benchmarks/suite.py)
 """
 
 import asyncio
-import sys
+import hashlib
+import hmac
+import itertools
+import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from string import Formatter
+
+import pytest
+
+AGENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Dossiers des modules : pythonpath de pyproject.toml
 
-# Import direct de l'agent Algeria
+from agent_registry_algeria import AgentRegistry
+from answer_cache_algeria import AnswerCache
+from broadcast_engine_algeria import BroadcastEngine, BroadcastReport
+from bench_ocr_pipeline import write_batch
+from course_index_algeria import CourseIndex
+from dispatch_scheduler_algeria import DispatchScheduler, MessageShed
+from entity_extractor_algeria import get_extractor
 from fiscal_agent_algeria import FiscalAiAgent
+from http_client_algeria import HttpClient, HttpError, RetryPolicy
+from language_detector_algeria import LanguageDetector, detect_language
+from multi_platform_orchestrator import MultiPlatformOrchestrator
+from ocr_factures_dz import GlyphOcrBackend, InvoiceOcrPipeline, OcrBackend
+from outbound_queue_algeria import OutboundQueue
+from pipeline_metrics_algeria import PipelineMetrics
+from preference_store_algeria import MemoryPreferenceStore, PreferenceStore, SQLitePreferenceStore
+from rate_limit_algeria import TokenBucket
+from result_cache_algeria import LruTtlCache
+from session_store_algeria import SessionStore
+from signal_agent_algeria import SignalAgentAlgeria
+from signal_daemon_algeria import SignalDaemon, SignalDaemonError, SignalRpcError
+from stub_api_server import StubApiServer
+from tax_rules_algeria import DEFAULT_RULES_PATH, TaxRuleBook
+from telegram_agent_algeria import TelegramAgentAlgeria
+from templates_algeria import FALLBACK_LANGUAGES, REGISTRY, TEMPLATES
+from telegram_updates_algeria import TelegramUpdatePoller, TelegramWebhookHandler
+from whatsapp_agent_algeria import WhatsAppAgent, WhatsAppConfig
+from whatsapp_webhook_algeria import WhatsAppWebhookReceiver
+from elearning_chat_ai import ELearningChatAI, build_course_index
+import import_budget
+import signal_agent_algeria
+import suite
+
+TVA_CASES = [
+    # (requête, langue, montant TVA attendu)
+    ("TVA sur 100000 DZD", 'fr', 19000.0),
+    ("احسب ضريبة القيمة المضافة على 100000 دينار", 'ar', 19000.0),
+    ("Calculer la TVA sur 75000 DZD", 'fr', 14250.0),
+    ("TVA export 200000 DZD", 'fr', 0.0),
+]
+
+IRG_CASES = [
+    # (requête, langue, enfants, IRG attendu)
+    ("حساب ضريبة الدخل على راتب 200000 دينار", 'ar', 0, 16099.77),
+    ("كيفاش نحسب ضريبة الراتب 300000 دج مع 2 دراري؟", 'ar_dz', 2, 37949.77),
+    # Cas de base en darija : « الضريبة » seul, classé IRG comme à l'origine
+    ("كيفاش نحسب الضريبة على 50000 دج؟", 'ar_dz', 0, 0.0),
+    ("IRG pour salaire 150000 DZD avec 1 enfant", 'fr', 1, 4024.77),
+]
+
+
+# Demi-centimes : arrondi ROUND_HALF_UP du calcul unitaire, pas celui d'un flottant binaire
+HALF_CENT_AMOUNTS = [150000.125, 200000.005, 1.005, 36000.015, 0.0, 999999.995]
+
+
+RULES_VERSIONS = itertools.count(1)
+
+
+def write_rules(path, *rule_sets):
+    """Fichier de règles : exercice 2025 de référence, taux normal et date d'effet modifiés"""
+    with open(DEFAULT_RULES_PATH, encoding='utf-8') as handle:
+        base = json.load(handle)['rule_sets'][0]
+    data = {'format_version': 1, 'rule_sets': [
+        {**base, 'fiscal_year': int(effective_from[:4]), 'effective_from': effective_from,
+         'tva_rates': {**base['tva_rates'], 'normale': rate}}
+        for effective_from, rate in rule_sets]}
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(data, handle)
+    # mtime strictement croissant, même sur un système de fichiers à faible résolution
+    mtime = os.stat(path).st_mtime_ns + next(RULES_VERSIONS) * 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+LANGUAGE_CASES = [
+    # (texte, langue attendue)
+    ("Bonjour, je veux calculer la TVA", 'fr'),
+    ("Quel impôt sur mon salaire ?", 'fr'),
+    ("How do I calculate the VAT for my company?", 'en'),
+    ("احسب ضريبة القيمة المضافة على 100000 دينار", 'ar'),
+    ("واش نخلص على الراتب تاعي؟", 'ar_dz'),
+    # Proclitique و retiré : « وكيفاش » reconnu comme darija
+    ("وكيفاش نحسب الضريبة؟", 'ar_dz'),
+    ("Azul, amek ara d-nḥesbeɣ asiḍen n tigawin?", 'ber'),
+    ("ⴰⵣⵓⵍ ⴰⵎⴻⴽ ⴰⴷ ⵏⵃⵙⴱ", 'ber'),
+    # Tifinagh prioritaire sur le reste du texte
+    ("ⴰⵣⵓⵍ TVA sur 100000 DZD", 'ber'),
+]
+
+
+AMOUNT_CASES = [
+    # (requête, montants extraits, devise du premier)
+    ("TVA sur 100,50 DA", [100.5], 'DZD'),
+    ("Facture de 1 234 567,89 DA", [1234567.89], 'DZD'),
+    ("Total 1.234.567 DZD puis 100.000 dinars", [1234567.0, 100000.0], 'DZD'),
+    ("Salaire 150000.75 et 12,500 DA", [150000.75, 12500.0], None),
+    ("Montant 150000.125", [150000.125], None),
+    ("IRG sur 5000 da avec 2 enfants", [5000.0], 'DZD'),
+]
+
+
+# Valeurs d'exemple pour chaque champ des modèles de réponse
+TEMPLATE_VALUES = {
+    'amount_ht': 100000.0, 'tva_rate': 19, 'tva_amount': 19000.0, 'amount_ttc': 119000.0,
+    'gross_salary': 150000.0, 'abattements': 12500.0, 'irg_amount': 4024.77,
+    'net_salary': 145975.23, 'children': 1, 'excerpt': 'Salam', 'data_type': 'Rapport G50',
+}
+
+
+def run_query(query: str) -> dict:
+    agent = FiscalAiAgent(cache_size=0)
+    return asyncio.run(agent.process_fiscal_query(query))
+
+
+@pytest.mark.parametrize('query,language,tva_amount', TVA_CASES)
+def test_tva_multilingue(query, language, tva_amount):
+    """💰 TVA multilingue"""
+    result = run_query(query)
+    assert result['success'], result.get('error')
+    assert result['language'] == language
+    assert result['calculation_type'] == 'tva'
+
+    agent = FiscalAiAgent(cache_size=0)
+    calculation = asyncio.run(agent.calculate_tva_intelligent(result['entities']))
+    assert calculation['tva_amount'] == tva_amount
+
+
+@pytest.mark.parametrize('query,language,children,irg_amount', IRG_CASES)
+def test_irg_multilingue(query, language, children, irg_amount):
+    """💼 IRG multilingue"""
+    result = run_query(query)
+    assert result['success'], result.get('error')
+    assert result['language'] == language
+    assert result['calculation_type'] == 'irg'
+    assert result['entities'].get('children', 0) == children
+
+    agent = FiscalAiAgent(cache_size=0)
+    calculation = asyncio.run(agent.calculate_irg_intelligent(result['entities']))
+    assert calculation['irg_amount'] == irg_amount
+
+
+FLUX_QUERIES = ["TVA sur 100000 DZD", "IRG pour salaire 150000 DZD avec 1 enfant",
+                "Bonjour", "TVA export 200000 DZD"] * 6
+
+
+def test_flux_requetes_ordre_index_et_fenetre():
+    """📨 Flux : rang `index`, ordre d'entrée ou d'achèvement, fenêtre de concurrence bornée"""
+    async def scenario(ordered):
+        agent = FiscalAiAgent(cache_size=0, enable_metrics=False)
+        pulled = []
+
+        async def source():
+            for query in FLUX_QUERIES:
+                pulled.append(query)
+                yield query
+
+        results, windows = [], []
+        async for result in agent.process_fiscal_queries(source(), concurrency=3, ordered=ordered):
+            windows.append(len(pulled) - len(results))
+            results.append(result)
+        return results, windows
+
+    for ordered in (True, False):
+        results, windows = asyncio.run(scenario(ordered))
+        indexes = [result['index'] for result in results]
+        if ordered:
+            assert indexes == list(range(len(FLUX_QUERIES)))
+        assert sorted(indexes) == list(range(len(FLUX_QUERIES)))
+        assert all(result['success'] for result in results)
+        assert [results[i]['calculation_type'] for i in sorted(range(len(results)),
+                                                             key=indexes.__getitem__)] == \
+            ['tva', 'irg', 'general', 'tva'] * 6
+        # Jamais plus de `concurrency` requêtes lues et non rendues
+        assert max(windows) <= 3
+
+
+def test_flux_requetes_processus_regles_figees():
+    """📨 Pool de processus : les règles figées (tax_knowledge) atteignent les workers"""
+    agent = FiscalAiAgent(cache_size=0, enable_metrics=False)
+    knowledge = agent.rules.to_dict()
+    knowledge['tva_rates']['normale'] = 20
+    agent.tax_knowledge = knowledge
+
+    async def scenario():
+        return [result async for result in agent.process_fiscal_queries(
+            ["TVA sur 100000 DZD"] * 4, concurrency=2, executor='process')]
+
+    results = asyncio.run(scenario())
+    assert [result['index'] for result in results] == [0, 1, 2, 3]
+    assert all('20,000.00' in result['response'] for result in results)
+
+
+def test_flux_requetes_arret_anticipe_annule_le_reste():
+    """📨 Sortie de boucle : requêtes en attente annulées, source plus consommée"""
+    gate = threading.Event()
+
+    class Recording(ThreadPoolExecutor):
+        futures = []
+
+        def submit(self, *args, **kwargs):
+            future = super().submit(*args, **kwargs)
+            self.futures.append(future)
+            return future
+
+    async def scenario():
+        agent = FiscalAiAgent(cache_size=0, enable_metrics=False)
+        process_query = agent._process_query
+        calls = []
+
+        def slow(query, context=None):
+            calls.append(query)
+            if len(calls) > 1:
+                gate.wait(5)
+            return process_query(query, context)
+
+        agent._process_query = slow
+        pulled = []
+
+        async def source():
+            for query in FLUX_QUERIES:
+                pulled.append(query)
+                yield query
+
+        executor = Recording(max_workers=1)
+        stream = agent.process_fiscal_queries(source(), concurrency=4, executor=executor)
+        async for first in stream:
+            break
+        await stream.aclose()
+        gate.set()
+        executor.shutdown(wait=True)
+        return first, pulled, executor.futures
+
+    first, pulled, futures = asyncio.run(scenario())
+    assert first['index'] == 0 and len(pulled) == 4
+    # Requête 1 déjà en cours ; 2 et 3 jamais exécutées
+    assert len(futures) == 4 and all(future.cancelled() for future in futures[2:])
+
+
+def test_cache_lru_ttl_compteurs():
+    """🗃️ Hits, misses, éviction LRU et expiration avec une horloge injectée"""
+    now = [0.0]
+    cache = LruTtlCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1 and cache.get('c', 'absent') == 'absent'
+    cache.put('c', 3)  # 'b', le moins récent, est évincé
+    assert cache.get('b') is None and cache.get('c') == 3
+    now[0] = 10.0
+    assert cache.get('a') is None and len(cache) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (2, 3, 1, 1)
+    assert stats['hit_rate'] == 0.4
+
+    assert LruTtlCache(maxsize=0).put('a', 1) is None and not LruTtlCache(maxsize=0).get('a')
+
+
+def test_cache_reponses_invalide_quand_les_regles_changent(tmp_path):
+    """🗃️ Réponse en cache jamais servie après tax_knowledge modifié ou fichier rechargé"""
+    path = str(tmp_path / 'rules.json')
+    write_rules(path, ('2025-01-01', '19.00'))
+    agent = FiscalAiAgent(rule_book=TaxRuleBook(path, check_interval=0), enable_metrics=False)
+
+    def ask():
+        return asyncio.run(agent.process_fiscal_query("TVA sur 100000 DZD"))['response']
+
+    assert '19,000.00' in ask() and '19,000.00' in ask()
+    assert agent.cache_stats()['hits'] == 1
 
-async def test_simple_tva():
-    """Test simple TVA"""
-    print("\n🧪 === TEST SIMPLE TVA ===")
-    
+    # Fichier partagé modifié : rechargé, cache vidé
+    write_rules(path, ('2025-01-01', '20.00'))
+    assert '20,000.00' in ask()
+
+    # Règles figées pour cet agent
+    knowledge = agent.rules.to_dict()
+    knowledge['tva_rates']['normale'] = 21
+    agent.tax_knowledge = knowledge
+    assert '21,000.00' in ask() and agent.cache_stats()['hits'] == 1
+
+
+def test_regles_fiscales_rechargement_et_dates_effet(tmp_path):
+    """📚 Rechargement sur mtime, fichier invalide ignoré, recherche par date d'effet"""
+    path = str(tmp_path / 'rules.json')
+    write_rules(path, ('2025-01-01', '19.00'))
+    book = TaxRuleBook(path, check_interval=0)
+    first = book.for_date('2025-06-30')
+    assert first.tva.rate_percent(first.tva.code_of('normale')) == 19
+    assert not book.reload_if_changed()
+
+    # Nouvel exercice ajouté au fichier : pris en compte à la lecture suivante
+    write_rules(path, ('2025-01-01', '19.00'), ('2026-07-01', '21.00'))
+    before, after = book.for_date('2026-06-30'), book.for_date(date(2026, 7, 1))
+    assert book.fiscal_years() == [2025, 2026] and before is not first
+    assert before.fiscal_year == 2025 and after.fiscal_year == 2026
+    assert after.tva.rate_percent(after.tva.code_of('normale')) == 21
+    with pytest.raises(LookupError):
+        book.for_date('2024-12-31')
+
+    # JSON tronqué : les règles précédentes restent en vigueur
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write('{"rule_sets": [')
+    assert not book.reload()
+    assert book.for_date('2026-07-01') is after and book.fiscal_years() == [2025, 2026]
+
+
+@pytest.mark.parametrize('text,language', LANGUAGE_CASES)
+def test_detection_langue(text, language):
+    """🌍 Une langue par cas : français, anglais, arabe, darija, amazigh (latin et tifinagh)"""
+    assert detect_language(text) == language
+
+
+def test_detection_langue_proclitiques_et_departage():
+    """🌍 Proclitiques arabes, départage ber > en > fr, langues autorisées"""
+    detector = LanguageDetector({'ar_dz': ['كيفاش'], 'fr': ['taxe', 'is'],
+                                 'en': ['tax', 'is'], 'ber': ['n', 'is']})
+    # و / ال / بال / لل retirés ; mot trop court après retrait laissé tel quel
+    assert detector.scores("وكيفاش")['ar_dz'] == 1
+    assert detector.scores("بالكيفاش للكيفاش")['ar_dz'] == 2
+    assert detector.scores("وال")['ar_dz'] == 0
+
+    # Scores égaux : ber, puis en, puis fr ; langue exclue ignorée
+    assert detector.detect("is") == 'ber'
+    assert detector.detect("is", ('fr', 'en')) == 'en'
+    assert detector.detect("is", ('fr', 'ar')) == 'fr'
+    assert detector.detect("tax taxe taxe") == 'fr'
+    assert detector.detect("12345", default='ar') == 'ar'
+    # Darija reconnue mais non autorisée : arabe standard
+    assert detector.detect("كيفاش", ('ar', 'fr')) == 'ar'
+
+
+@pytest.mark.parametrize('query,values,currency', AMOUNT_CASES)
+def test_extraction_montants(query, values, currency):
+    """🔍 Tous les montants : milliers groupés, virgule décimale, devise"""
+    entities = get_extractor().extract(query, 'fr')['entities']
+    assert [amount['value'] for amount in entities['amounts']] == values
+    assert entities['amounts'][0]['currency'] == currency
+
+
+def test_extraction_mots_cles_entiers():
+    """🔍 Mots-clés entiers (flexions listées seulement), enfants, export"""
+    extractor = get_extractor()
+
+    def classify(query, language):
+        result = extractor.extract(query, language)
+        return extractor.classify(result['scores']), result['entities']
+
+    # Amazigh : « n » compte comme mot entier, égalité départagée vers l'IRG
+    calc_type, entities = classify("Asiḍen n tigawin deg 100000 idrimen", 'ber')
+    assert calc_type == 'irg' and entities['amount'] == 100000.0
+    # Radical en début d'un autre mot : pas de correspondance
+    calc_type, entities = classify("Salaire de l'exportateur 150000 DA avec 1 enfant", 'fr')
+    assert calc_type == 'irg' and 'is_export' not in entities and entities['children'] == 1
+    calc_type, entities = classify("TVA sur les produits exportés 200000 DA", 'fr')
+    assert calc_type == 'tva' and entities['is_export']
+    assert classify("Taxes et valeurs ajoutées", 'fr')[0] == 'tva'
+    assert classify("Tvalidation irgendwas", 'fr')[0] == 'general'
+    # Proclitique et pronom arabes : « وراتبي » = et mon salaire
+    assert classify("وراتبي 200000 دج", 'ar')[0] == 'irg'
+
+
+@pytest.mark.parametrize('kind', sorted(TEMPLATES))
+@pytest.mark.parametrize('language', ['fr', 'ar', 'ber'])
+def test_modeles_rendus_par_langue(kind, language):
+    """📝 Chaque type rendu en fr/ar/ber, champs substitués ; repli ou défaut de l'appelant"""
+    source = TEMPLATES[kind].get(language)
+    if source is None and FALLBACK_LANGUAGES.get(kind) is not None:
+        source = TEMPLATES[kind][FALLBACK_LANGUAGES[kind]]
+    rendered = REGISTRY.render(kind, language, TEMPLATE_VALUES, default="<défaut>")
+    if source is None:
+        # Pas de modèle ni de repli (alertes) : texte par défaut de l'appelant
+        assert rendered == "<défaut>"
+        with pytest.raises(KeyError):
+            REGISTRY.render(kind, language, TEMPLATE_VALUES)
+        return
+    fields = {field for _, field, _, _ in Formatter().parse(source) if field is not None}
+    assert fields <= TEMPLATE_VALUES.keys()
+    assert rendered == source.format_map(TEMPLATE_VALUES) and '{' not in rendered
+    if 'amount_ht' in fields:
+        assert '100,000.00' in rendered and '119,000.00' in rendered
+
+
+def test_modeles_registre_lecture_seule():
+    """📝 Registre immuable : tables en MappingProxyType, type inconnu refusé"""
+    with pytest.raises(TypeError):
+        REGISTRY._compiled[('welcome', 'fr')] = ("piraté", None)
+    with pytest.raises(TypeError):
+        REGISTRY._fallbacks['welcome'] = 'en'
+    assert REGISTRY.render('welcome', 'fr').startswith("🇩🇿 Bienvenue")
+    assert REGISTRY.text('secure_data', 'ber') == TEMPLATES['secure_data']['fr']
+    with pytest.raises(KeyError):
+        REGISTRY.render('inconnu', 'fr')
+
+
+def test_metriques_instantane_et_export_prometheus():
+    """📈 Histogrammes cumulés monotones, compteurs, étiquettes échappées"""
+    metrics = PipelineMetrics(buckets=(0.001, 0.01))
+    ms = 1_000_000
+    metrics.observe({'detect': ms, 'extract': 5 * ms}, 'fr', 'tva')
+    metrics.observe({'detect': 20 * ms, 'extract': ms // 2}, 'fr', 'tva', cache_hit=True)
+    metrics.observe({'detect': 2 * ms}, 'ar"\\\n', 'irg')
+    metrics.observe_error()
+
+    snapshot = metrics.snapshot()
+    detect = {series['language']: series for series in snapshot['stages']['detect']}
+    # Borne incluse (le="0.001") ; cumul croissant jusqu'à +Inf = count
+    assert list(detect['fr']['buckets'].items()) == [(0.001, 1), (0.01, 1), (float('inf'), 2)]
+    assert detect['fr']['count'] == 2 and detect['fr']['sum_seconds'] == pytest.approx(0.021)
+    for series in snapshot['stages']['extract'] + snapshot['stages']['detect']:
+        counts = list(series['buckets'].values())
+        assert counts == sorted(counts) and counts[-1] == series['count']
+    assert {(q['language'], q['count']) for q in snapshot['queries']} == {('fr', 2), ('ar"\\\n', 1)}
+    assert snapshot['cache_hits'] == [{'language': 'fr', 'calculation_type': 'tva', 'count': 1}]
+    assert snapshot['errors'] == 1
+
+    text = metrics.prometheus_text()
+    lines = text.splitlines()
+    assert 'fiscal_stage_latency_seconds_bucket{stage="detect",language="fr",calc_type="tva",le="0.001"} 1' in lines
+    assert 'fiscal_stage_latency_seconds_bucket{stage="detect",language="fr",calc_type="tva",le="+Inf"} 2' in lines
+    assert 'fiscal_stage_latency_seconds_count{stage="extract",language="fr",calc_type="tva"} 2' in lines
+    assert 'fiscal_cache_hits_total{language="fr",calc_type="tva"} 1' in lines
+    assert 'fiscal_query_errors_total 1' in lines
+    # Guillemet, antislash et saut de ligne échappés : une série par ligne
+    assert 'fiscal_queries_total{language="ar\\"\\\\\\n",calc_type="irg"} 1' in lines
+    assert all(line.startswith(('# ', 'fiscal_')) for line in lines) and text.endswith('\n')
+
+    metrics.reset()
+    assert metrics.snapshot() == {'stages': {}, 'queries': [], 'cache_hits': [], 'errors': 0}
+
+
+def test_metriques_profils_des_plus_lentes():
+    """🔬 Profils conservés pour les N requêtes les plus lentes, alerte au-delà du seuil"""
+    slow = []
+    metrics = PipelineMetrics(profile_rate=1.0, keep_slowest=2, slow_threshold=0.008,
+                              on_slow=slow.append)
+    for total_ms in (5, 1, 9, 3, 7):
+        profiler = metrics.start_profile()
+        assert profiler is not None
+        metrics.observe({'calculate': total_ms * 1_000_000}, 'fr', 'irg',
+                        query=f"requête {total_ms} ms", profiler=profiler)
+
+    reports = metrics.slowest()
+    assert [report['total_seconds'] for report in reports] == [0.009, 0.007]
+    assert reports[0]['query'] == "requête 9 ms" and 'function calls' in reports[0]['profile']
+    assert [report['total_seconds'] for report in slow] == [0.009]
+    assert PipelineMetrics().start_profile() is None
+
+
+def test_irg_par_lots_identique_au_calcul_unitaire():
+    """💼 Paie par lots = calcul unitaire au centime près (demi-centimes compris)"""
+    agent = FiscalAiAgent(cache_size=0, enable_metrics=False)
+    expected = [agent._calculate_irg({'amount': salary, 'children': 1})
+                for salary in HALF_CENT_AMOUNTS]
+    children = [1] * len(HALF_CENT_AMOUNTS)
+    batches = [agent.calculate_irg_batch(HALF_CENT_AMOUNTS, children)]
     try:
-        agent = FiscalAiAgent()
-        print("✅ Agent IA Algeria créé avec succès")
-        
-        # Test simple français
-        query = "TVA sur 100000 DZD"
-        print(f"📝 Test: {query}")
-        
-        result = await agent.process_fiscal_query(query)
-        
-        if result['success']:
-            print("✅ Calcul réussi:")
-            print(result['response'])
-            print(f"🌍 Langue détectée: {result['language']}")
-        else:
-            print(f"❌ Erreur: {result['error']}")
-            
-    except Exception as e:
-        print(f"❌ Erreur création agent: {e}")
-        import traceback
-        traceback.print_exc()
-
-async def test_tva_multilingue():
-    """Test TVA multilingue"""
-    print("\n💰 === TESTS TVA MULTILINGUE ===")
-    
-    agent = FiscalAiAgent()
-    
-    test_cases = [
-        {
-            'query': "احسب ضريبة القيمة المضافة على 100000 دينار",
-            'description': "TVA en arabe standard"
-        },
-        {
-            'query': "كيفاش نحسب الضريبة على 50000 دج؟",
-            'description': "TVA en darija algérienne"
-        },
-        {
-            'query': "Calculer la TVA sur 75000 DZD",
-            'description': "TVA en français"
-        },
-        {
-            'query': "TVA export 200000 DZD",
-            'description': "TVA exportation (exonérée)"
-        }
-    ]
-    
-    for i, test in enumerate(test_cases, 1):
-        print(f"\n📝 Test {i}: {test['description']}")
-        print(f"Query: {test['query']}")
-        
-        try:
-            result = await agent.process_fiscal_query(test['query'])
-            
-            if result['success']:
-                print(f"✅ Langue détectée: {result['language']}")
-                print(f"📊 Réponse:")
-                print(result['response'])
-            else:
-                print(f"❌ Erreur: {result['error']}")
-        except Exception as e:
-            print(f"❌ Erreur test: {e}")
-        
-        print("-" * 50)
-
-async def test_irg_multilingue():
-    """Test IRG multilingue"""
-    print("\n💼 === TESTS IRG MULTILINGUE ===")
-    
-    agent = FiscalAiAgent()
-    
-    test_cases = [
-        {
-            'query': "حساب ضريبة الدخل على راتب 200000 دينار",
-            'description': "IRG sans enfants (arabe)"
-        },
-        {
-            'query': "كيفاش نحسب ضريبة الراتب 300000 دج مع 2 دراري؟",
-            'description': "IRG avec enfants (darija)"
-        },
-        {
-            'query': "IRG pour salaire 150000 DZD avec 1 enfant",
-            'description': "IRG avec enfant (français)"
-        }
-    ]
-    
-    for i, test in enumerate(test_cases, 1):
-        print(f"\n📝 Test {i}: {test['description']}")
-        print(f"Query: {test['query']}")
-        
-        try:
-            result = await agent.process_fiscal_query(test['query'])
-            
-            if result['success']:
-                print(f"✅ Langue détectée: {result['language']}")
-                print(f"📊 Réponse:")
-                print(result['response'])
-            else:
-                print(f"❌ Erreur: {result['error']}")
-        except Exception as e:
-            print(f"❌ Erreur test: {e}")
-        
-        print("-" * 50)
-
-async def main():
-    """🧪 Tests principaux"""
-    print("🇩🇿 =" * 50)
-    print("🧪 TESTS AGENT IA FISCAL ALGERIA")
-    print("🤖 by Claude AI")
-    print("🚀 ERP Algeria - Tests Multilingues")
-    print("=" * 50)
-    
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is not None:
+        batches.append(agent.calculate_irg_batch(numpy.array(HALF_CENT_AMOUNTS), children))
+    for batch in batches:
+        assert [int(value) for value in batch['net_salary']] == [
+            round(result['net_salary'] * 100) for result in expected]
+        assert [int(value) for value in batch['irg_amount']] == [
+            round(result['irg_amount'] * 100) for result in expected]
+
+
+def test_tva_par_lots_identique_au_calcul_unitaire():
+    """💰 TVA par lots = calcul unitaire (ROUND_HALF_UP), codes de taux contrôlés"""
+    agent = FiscalAiAgent(cache_size=0, enable_metrics=False)
+    expected = [agent._calculate_tva({'amount': amount}) for amount in HALF_CENT_AMOUNTS]
+    batches = [agent.calculate_tva_batch(HALF_CENT_AMOUNTS)]
     try:
-        # Test simple en premier
-        await test_simple_tva()
-        
-        # Tests multilingues
-        await test_tva_multilingue()
-        await test_irg_multilingue()
-        
-        print("\n🎉 =" * 50)
-        print("✅ TOUS LES TESTS TERMINÉS AVEC SUCCÈS !")
-        print("🇩🇿 Algeria ERP by Claude - Agent IA opérationnel")
-        print("🤖 Support: العربية, Français, الدارجة")
-        print("💰 Calculs: TVA, IRG, TAP conformes Algeria")
-        print("=" * 50)
-        
-    except Exception as e:
-        print(f"\n❌ ERREUR DANS LES TESTS: {e}")
-        import traceback
-        traceback.print_exc()
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is not None:
+        batches.append(agent.calculate_tva_batch(numpy.array(HALF_CENT_AMOUNTS)))
+    for batch in batches:
+        assert [int(value) for value in batch['amount_ttc']] == [
+            round(result['amount_ttc'] * 100) for result in expected]
+        assert [int(value) for value in batch['tva_amount']] == [
+            round(result['tva_amount'] * 100) for result in expected]
+
+    for codes in ([0, -1], [0, len(agent.rules.tva.names)]):
+        with pytest.raises(ValueError):
+            agent.calculate_tva_batch([100.0, 100.0], codes)
+        if numpy is not None:
+            with pytest.raises(ValueError):
+                agent.calculate_tva_batch(numpy.array([100.0, 100.0]), numpy.array(codes))
+
+
+def test_client_http_keepalive_et_reprises():
+    """🌐 Pool keep-alive borné par hôte, 503 repris jusqu'au succès"""
+    async def scenario():
+        async with StubApiServer(fail_every=7, retry_after=0) as server:
+            async with HttpClient(limit_per_host=4, retry=RetryPolicy(max_attempts=4, base_delay=0.001)) as client:
+                responses = await asyncio.gather(*(
+                    client.post(f"{server.url}/bot123:ABC/sendMessage",
+                                json={'chat_id': i, 'text': "Échéance G50"})
+                    for i in range(40)
+                ))
+                return responses, server, client.stats()
+
+    responses, server, stats = asyncio.run(scenario())
+    assert all(response.ok and response.json()['ok'] for response in responses)
+    assert len(server.messages) == 40
+    assert stats['retries'] > 0
+    assert server.connections <= 4
+
+
+def test_client_http_pas_de_reprise_post_apres_envoi():
+    """🌐 504 : GET repris, POST sendMessage non rejoué (sauf idempotent=True)"""
+    async def scenario():
+        async with StubApiServer(fail_every=1, fail_status=504) as server:
+            async with HttpClient(retry=RetryPolicy(max_attempts=3, base_delay=0.001)) as client:
+                url = f"{server.url}/bot123:ABC/sendMessage"
+                post = await client.post(url, json={'chat_id': 1, 'text': "G50"})
+                posted = server.requests
+                get = await client.get(url)
+                got = server.requests - posted
+                await client.post(url, json={'chat_id': 1}, idempotent=True)
+                keyed = server.requests - posted - got
+        async with HttpClient(retry=RetryPolicy(max_attempts=3, base_delay=0.001)) as client:
+            with pytest.raises(HttpError, match="Connexion impossible"):
+                await client.post(f"http://127.0.0.1:{server.port}/bot123:ABC/sendMessage")
+            return post.status, posted, get.status, got, keyed, client.stats()['retries']
+
+    post_status, posted, get_status, got, keyed, retries = asyncio.run(scenario())
+    assert (post_status, posted) == (504, 1)
+    assert (get_status, got) == (504, 3)
+    assert keyed == 3
+    assert retries == 2  # connexion refusée : rien n'a été envoyé, POST repris
+
+
+def test_client_http_post_coupe_apres_lecture_non_renvoye():
+    """🌐 Connexion réutilisée coupée après lecture du POST : pas de second envoi"""
+    received = []
+
+    async def handle(reader, writer):
+        while True:
+            head = await reader.readuntil(b'\r\n\r\n')
+            method = head.split(b' ', 1)[0].decode()
+            length = next((int(line.split(b':', 1)[1]) for line in head.split(b'\r\n')
+                           if line.lower().startswith(b'content-length:')), 0)
+            await reader.readexactly(length)
+            received.append(method)
+            if method == 'POST':
+                # Requête reçue, puis RST sans réponse
+                writer.transport.abort()
+                return
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/bot123:ABC/sendMessage"
+        async with HttpClient(retry=RetryPolicy(max_attempts=3, base_delay=0.001)) as client:
+            await client.get(url)
+            with pytest.raises(HttpError, match="réseau"):
+                await client.post(url, json={'chat_id': 1, 'text': "G50"})
+            stats = client.stats()
+        server.close()
+        await server.wait_closed()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert received == ['GET', 'POST']
+    assert stats['connections_reused'] == 1 and stats['retries'] == 0
+
+
+def test_demon_signal_multiplexage_et_redemarrage():
+    """🔐 Réponses désordonnées rendues par id, relance après plantage"""
+    command = [sys.executable, os.path.join(AGENTS_DIR, 'benchmarks', 'fake_signal_cli.py'),
+               '-a', '+213555000000', 'jsonRpc', '--crash-after', '31']
+
+    async def scenario():
+        notifications = []
+        daemon = SignalDaemon(command, request_timeout=5, restart_delay=0.01,
+                              on_notification=notifications.append)
+        numbers = [f"+2135550{i:05d}" for i in range(30)]
+        results = await asyncio.gather(*(daemon.send(number, "Échéance G50") for number in numbers))
+        with pytest.raises(SignalRpcError):
+            await daemon.send("pas-un-numero", "x")
+        with pytest.raises(SignalDaemonError) as crash:
+            await daemon.send("+213555000001", "x")  # 32e requête : plantage du démon
+        assert not isinstance(crash.value, SignalRpcError)
+        after_restart = await daemon.send("+213555000001", "après redémarrage")
+        await daemon.close()
+        return numbers, results, after_restart, daemon.restarts, notifications
+
+    numbers, results, after_restart, restarts, notifications = asyncio.run(scenario())
+    assert [r['results'][0]['recipientAddress']['number'] for r in results] == numbers
+    assert after_restart['results'][0]['type'] == 'SUCCESS'
+    assert restarts >= 1
+    assert notifications and notifications[0]['method'] == 'receive'
+
+
+def test_demon_signal_binaire_absent(tmp_path):
+    """🔐 signal-cli introuvable : erreur immédiate au lieu d'une attente sans fin"""
+    missing = str(tmp_path / 'signal-cli')
+
+    async def scenario():
+        agent = SignalAgentAlgeria('+213555000000', signal_cli_path=missing)
+        with pytest.raises(SignalDaemonError, match="introuvable"):
+            await asyncio.wait_for(agent.start_daemon(restart_delay=0.01), 5)
+        with pytest.raises(SignalDaemonError, match="introuvable"):
+            await asyncio.wait_for(agent.daemon.send('+213555000001', "Alerte"), 5)
+        await agent.daemon.close()
+        return agent.daemon.restarts
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_signal_alerte_par_lots(monkeypatch):
+    """📢 Alerte Signal par lots : ordre des contacts, deux lots en vol, rendu par langue"""
+    renders = []
+    registry = signal_agent_algeria.TEMPLATE_REGISTRY
+
+    class CountingRegistry:
+        def render(self, kind, language, *args, **kwargs):
+            renders.append(language)
+            return registry.render(kind, language, *args, **kwargs)
+
+    monkeypatch.setattr(signal_agent_algeria, 'TEMPLATE_REGISTRY', CountingRegistry())
+
+    class Daemon:
+        def __init__(self):
+            self.started = []
+
+        async def send(self, recipient, text):
+            self.started.append(recipient)
+            # Achèvement dans le désordre au sein d'un lot
+            await asyncio.sleep(0.001 * (int(recipient[-2:]) % 3))
+            if recipient.endswith('07'):
+                raise SignalRpcError({'message': 'Unregistered user', 'code': -1})
+            return {'timestamp': int(recipient[-2:]), 'text': text}
+
+    contacts = [(f"+2135550000{i:02d}", ('fr', 'ar', 'ber')[i % 3]) for i in range(22)]
+
+    async def scenario():
+        daemon = Daemon()
+        agent = SignalAgentAlgeria('+213555000000', daemon=daemon)
+        deliveries, windows = [], []
+        async for delivery in agent.stream_alert(contacts, 'deadline_fiscal', chunk_size=5,
+                                                 concurrency=4):
+            windows.append(len(daemon.started) - len(deliveries))
+            deliveries.append(delivery)
+        return deliveries, windows
+
+    deliveries, windows = asyncio.run(scenario())
+    assert [(d['contact'], d['language']) for d in deliveries] == contacts
+    # Lot courant + lot suivant au plus : jamais plus de 2 × 5 envois lancés et non rendus
+    assert max(windows) <= 10 and windows[0] > 5
+    assert sorted(renders) == ['ar', 'ber', 'fr']
+    failed = [d for d in deliveries if not d['success']]
+    assert [d['contact'] for d in failed] == ["+213555000007"]
+    assert failed[0]['error'] == 'Unregistered user'
+    assert deliveries[0]['result']['text'].startswith("🚨 Rappel")
+    assert deliveries[2]['result']['text'] == "🔔 Notification"  # pas de modèle amazigh
+
+
+def test_webhook_whatsapp_acquittement_et_doublons():
+    """📥 Vérification hub.challenge, acquittement 200, renvois Meta dédupliqués"""
+    def notification(message_id, text):
+        return {'entry': [{'changes': [{'value': {'messages': [
+            {'id': message_id, 'from': '213555000001', 'type': 'text', 'text': {'body': text}}
+        ]}}]}]}
+
+    async def scenario():
+        replies = []
+        agent = WhatsAppAgent(WhatsAppConfig("TOKEN", "1234567890", "VERIFY", ""))
+        async with WhatsAppWebhookReceiver(agent, FiscalAiAgent(), batch_delay=0.005,
+                                           on_reply=lambda m, r: replies.append((m['id'], r))) as receiver:
+            url = f"http://127.0.0.1:{receiver.port}/webhook"
+            async with HttpClient() as client:
+                challenge = await client.get(f"{url}?hub.mode=subscribe&hub.verify_token=VERIFY&hub.challenge=42")
+                refused = await client.get(f"{url}?hub.mode=subscribe&hub.verify_token=FAUX&hub.challenge=42")
+                acks = await asyncio.gather(*(
+                    client.post(url, json=notification(f"wamid.{i % 3}", text))
+                    for i, text in enumerate(["TVA sur 100000 DZD", "Bonjour", "Salam"] * 2)
+                ))
+            await receiver.drain()
+        return challenge, refused, acks, dict(replies), receiver.stats
+
+    challenge, refused, acks, replies, stats = asyncio.run(scenario())
+    assert challenge.text == '42' and refused.status == 403
+    assert all(ack.status == 200 for ack in acks)
+    assert stats['duplicates'] == 3 and len(replies) == 3
+    assert '19' in replies['wamid.0'] and stats['fiscal'] == 1
+
+
+def test_webhook_whatsapp_renvoi_apres_echec_traite():
+    """📥 Lot ou réponse en échec : le renvoi de Meta est traité, pas écarté comme doublon"""
+    def notification(message_id, text):
+        return {'entry': [{'changes': [{'value': {'messages': [
+            {'id': message_id, 'from': '213555000001', 'type': 'text', 'text': {'body': text}}
+        ]}}]}]}
+
+    async def scenario():
+        replies = []
+        agent = WhatsAppAgent(WhatsAppConfig("TOKEN", "1234567890", "VERIFY", ""))
+        process_message = agent.process_message
+        failures = {'lot': 1, 'reponse': 1}
+
+        async def flaky_process(text, user_id=None):
+            if failures['lot']:
+                failures['lot'] -= 1
+                raise RuntimeError("agent indisponible")
+            return await process_message(text, user_id=user_id)
+
+        def flaky_reply(message, reply):
+            if message['id'] == 'wamid.reponse' and failures['reponse']:
+                failures['reponse'] -= 1
+                raise ConnectionError("Graph API 500")
+            replies.append(message['id'])
+
+        agent.process_message = flaky_process
+        async with WhatsAppWebhookReceiver(agent, batch_delay=0.001, workers=1,
+                                           on_reply=flaky_reply) as receiver:
+            url = f"http://127.0.0.1:{receiver.port}/webhook"
+            async with HttpClient() as client:
+                for message_id in ('wamid.lot', 'wamid.reponse'):
+                    for _ in range(2):  # envoi puis renvoi de Meta
+                        await client.post(url, json=notification(message_id, "Salam"))
+                        await receiver.drain()
+        return replies, receiver.stats
+
+    replies, stats = asyncio.run(scenario())
+    assert replies == ['wamid.lot', 'wamid.reponse']
+    assert stats['duplicates'] == 0 and stats['errors'] == 2
+
+
+def test_webhook_whatsapp_signature_non_ascii_refusee():
+    """🔏 Signature HMAC : en-tête non ASCII refusé en 403, le récepteur continue"""
+    async def scenario():
+        agent = WhatsAppAgent(WhatsAppConfig("TOKEN", "1234567890", "VERIFY", ""))
+        async with WhatsAppWebhookReceiver(agent, app_secret='SECRET', batch_delay=0.005) as receiver:
+            url = f"http://127.0.0.1:{receiver.port}/webhook"
+            body = json.dumps({'entry': []}).encode()
+            signature = 'sha256=' + hmac.new(b'SECRET', body, hashlib.sha256).hexdigest()
+            async with HttpClient() as client:
+                forged = await client.post(url, data=body, headers={'X-Hub-Signature-256': 'sha256=é'})
+                signed = await client.post(url, data=body, headers={'X-Hub-Signature-256': signature})
+            await receiver.drain()
+        return forged, signed, receiver.stats
+
+    forged, signed, stats = asyncio.run(scenario())
+    assert forged.status == 403 and signed.status == 200
+    assert stats['invalid_signature'] == 1
+
+
+def test_sessions_langue_collante_ttl_et_plafond():
+    """💬 Détection sautée une fois la langue confirmée, expiration, éviction"""
+    now = [0.0]
+    sessions = SessionStore(maxsize=2, ttl=60, clock=lambda: now[0])
+    languages = [sessions.detect_language('+213555000001', "Bonjour, je veux calculer la TVA")
+                 for _ in range(4)]
+    assert languages == ['fr'] * 4 and sessions.skipped == 2
+    # Changement d'écriture : nouvelle détection immédiate
+    assert sessions.detect_language('+213555000001', "احسب ضريبة القيمة المضافة") == 'ar'
+
+    sessions.remember('+213555000001', 'tva', {'amount': 150000.55, 'is_export': True})
+    session = sessions.get('+213555000001')
+    assert (session.language, session.intent) == ('ar', 'tva')
+    assert session.entities == {'amount': 150000.55, 'is_export': True}
+
+    # Plafond : la session relue survit, la plus ancienne non relue est évincée
+    sessions.detect_language('+213555000002', "Hello")
+    sessions.detect_language('+213555000003', "Salut")
+    assert len(sessions) == 2 and '+213555000001' in sessions and '+213555000002' not in sessions
+
+    now[0] = 61.0
+    assert sessions.get('+213555000001') is None
+
+
+@pytest.mark.parametrize('amount', [1e30, -1e30, float('inf'), float('nan')])
+def test_sessions_montant_hors_plage_ignore(amount):
+    """💬 Montant non stockable en centimes int64 : oublié, sans OverflowError"""
+    sessions = SessionStore()
+    sessions.detect_language('+213555000001', "Bonjour")
+    sessions.remember('+213555000001', 'tva', {'amount': 150000})
+    sessions.remember('+213555000001', 'tva', {'amount': amount, 'is_export': True})
+    assert sessions.get('+213555000001').entities == {'is_export': True}
+
+
+def test_preferences_interface_abstraite():
+    """📇 Stockage incomplet refusé dès sa construction ; regroupement par plateforme"""
+    class Incomplete(PreferenceStore):
+        def get(self, user_id, default=None):
+            return default
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    store = MemoryPreferenceStore()
+    store.import_bulk([('+213555000001', 'signal'), ('+213555000002', 'whatsapp')])
+    groups = store.group_by_platform(['+213555000001', '+213555000002', '+213555000003'])
+    assert groups == {'signal': ['+213555000001'], 'whatsapp': ['+213555000002'],
+                      'telegram': ['+213555000003']}
+
+
+def test_preferences_sqlite_import_recherches_et_partage(tmp_path):
+    """📇 SQLite : import par lots, get_many découpé, absences en cache, second worker"""
+    path = str(tmp_path / 'preferences.db')
+    store = SQLitePreferenceStore(path)
+    users = [f"+21355{i:07d}" for i in range(2500)]
+    assert store.import_bulk(((user, 'signal') for user in users[:2000]), chunk_size=700) == 2000
+    assert len(store) == 2000
+
+    # 1 500 absents du cache : deux requêtes IN (_LOOKUP_CHUNK = 900)
+    found = store.get_many(users[1000:])
+    assert found == {user: 'signal' for user in users[1000:2000]}
+
+    # Absence en cache puis écriture : la préférence est visible tout de suite
+    assert store.get(users[-1]) is None
+    store.set(users[-1], 'whatsapp')
+    assert store.get(users[-1]) == 'whatsapp'
+    store.delete(users[0])
+    assert store.get(users[0], 'telegram') == 'telegram' and len(store) == 2000
+
+    other = SQLitePreferenceStore(path)
+    assert other.get(users[-1]) == 'whatsapp' and other.get(users[0]) is None
+    assert other.get_many(users[:3]) == {users[1]: 'signal', users[2]: 'signal'}
+    other.close()
+
+    class Agent:
+        http_client = None
+
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, recipient, text):
+            self.sent.append(recipient)
+            return True
+
+    async def scenario():
+        orchestrator = MultiPlatformOrchestrator(preference_store=store)
+        agents = {platform: Agent() for platform in ('telegram', 'signal', 'whatsapp')}
+        for platform, agent in agents.items():
+            orchestrator.register_platform(platform, agent)
+        for user in (users[0], users[1], users[-1]):
+            await orchestrator.send_smart_message(user, "Échéance G50")
+        return {platform: agent.sent for platform, agent in agents.items()}
+
+    assert asyncio.run(scenario()) == {'telegram': [users[0]], 'signal': [users[1]],
+                                       'whatsapp': [users[-1]]}
+    store.close()
+
+
+def test_seau_a_jetons_horloge_injectee():
+    """🚦 Rafale servie immédiatement, puis attente proportionnelle au débit"""
+    now = [0.0]
+    bucket = TokenBucket(rate=10, capacity=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.1, 0.2]
+    now[0] = 0.3  # trois jetons regagnés sur un solde de -2
+    assert bucket.available == pytest.approx(1.0)
+    now[0] = 10.0  # plafonné à la rafale
+    assert bucket.available == 2
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_diffusion_debit_concurrence_et_rapport():
+    """📢 Seau par plateforme, plafond global d'envois, statuts et erreurs bornées"""
+    class Agent:
+        def __init__(self, failures=()):
+            self.failures = failures
+            self.sent = []
+
+        async def send_message(self, recipient, text):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            self.sent.append(recipient)
+            if recipient in self.failures:
+                raise ConnectionError("refus API")
+            return False if recipient.endswith('-ko') else f"ok {recipient}"
+
+    in_flight = peak = 0
+    now = [0.0]
+
+    async def scenario():
+        engine = BroadcastEngine({'telegram': None, 'whatsapp': None}, concurrency=3,
+                                 progress_every=4, max_failures=1)
+        # Horloge figée : aucun jeton regagné, chaque envoi au-delà de la rafale attend 1 ms de plus
+        engine.buckets['signal'] = TokenBucket(rate=1000, capacity=5, clock=lambda: now[0])
+        agents = {'telegram': Agent(failures={'t2'}), 'whatsapp': Agent(),
+                  'signal': Agent()}
+        recipients = {
+            'telegram': ['t0', 't1', 't2', 't3-ko', 't4'],
+            'whatsapp': (f"w{i}" for i in range(6)),
+            'signal': [f"s{i}" for i in range(20)],
+            'viber': ['v0'],
+        }
+        progress = []
+        start = time.perf_counter()
+        report = await engine.broadcast(agents, "Échéance G50", recipients,
+                                        on_progress=progress.append)
+        return report, agents, progress, time.perf_counter() - start, engine.buckets['signal']
+
+    report, agents, progress, elapsed, bucket = asyncio.run(scenario())
+    assert peak == 3
+    assert bucket.available == 5 - 20 and elapsed >= 0.014
+    assert report.unavailable == ['viber'] and report.sent['viber'] == 0
+    assert (report.sent['telegram'], report.failed['telegram']) == (3, 2)
+    assert (report.total_sent, report.total_failed) == (29, 2)
+    assert [report.status('telegram', i) for i in range(6)] == [True, True, False, False, True, None]
+    assert list(report.iter_results('whatsapp', ['w0', 'w1'])) == [('w0', True), ('w1', True)]
+    # Une seule erreur conservée (max_failures=1), compteur complet
+    assert len(report.failures['telegram']) == 1
+    summary = report.to_dict()
+    assert summary['done'] and summary['unavailable'] == ['viber']
+    assert summary['platforms']['signal'] == {'sent': 20, 'failed': 0}
+    assert len(progress) == 31 // 4 + 1 and progress[-1]['done']
+
+
+def test_orchestrateur_diffusion_rapport():
+    """📢 broadcast_notification retourne un BroadcastReport (plus un dict)"""
+    class Agent:
+        http_client = None
+
+        async def send_message(self, recipient, text):
+            return f"ok {recipient}"
+
+    async def scenario():
+        orchestrator = MultiPlatformOrchestrator()
+        orchestrator.register_platform('telegram', Agent())
+        channels = await orchestrator.broadcast_notification("Maintenance", ['telegram', 'signal'])
+        listed = await orchestrator.broadcast_notification(
+            "Maintenance", ['telegram'], recipients={'telegram': ['+213555000001'], 'signal': ['x']})
+        return channels, listed
+
+    channels, listed = asyncio.run(scenario())
+    assert isinstance(channels, BroadcastReport) and isinstance(listed, BroadcastReport)
+    assert channels.sent == {'telegram': 1, 'signal': 0} and channels.unavailable == ['signal']
+    assert channels.status('telegram', 0) is True
+    assert listed.sent == {'telegram': 1} and not listed.unavailable
+
+
+def test_orchestrateur_calculs_fiscaux_regroupes():
+    """🛫 Demandes identiques simultanées : un seul calcul exact, puis cache"""
+    class Agent:
+        http_client = None
+
+        async def send_message(self, recipient, text):
+            return True
+
+    async def scenario():
+        orchestrator = MultiPlatformOrchestrator()
+        orchestrator.register_platform('telegram', Agent())
+        burst = await asyncio.gather(*(
+            orchestrator.handle_fiscal_calculation(f"+2135550{i:05d}", 'irg', 150000, 'fr', children=1)
+            for i in range(20)
+        ))
+        later = await orchestrator.handle_fiscal_calculation('+213555000001', 'irg', 150000, 'fr', children=1)
+        return burst, later, orchestrator.fiscal_stats()
+
+    burst, later, stats = asyncio.run(scenario())
+    assert len(set(burst)) == 1 and later == burst[0]
+    assert 'IRG: 4,024.77 DZD' in burst[0]  # barème exact, pas l'ancienne formule float
+    assert (stats['computations'], stats['coalesced'], stats['cache_hits']) == (1, 19, 1)
+
+    # Point d'entrée public de l'agent : langue inconnue ramenée au français
+    agent = FiscalAiAgent(cache_size=0, enable_metrics=False)
+    assert agent.calculation_key('irg', 150000, 1, 'en') == agent.calculation_key('irg', 150000.001, 1, 'fr')
+    assert agent.calculate('irg', 150000, 1, 'en') == burst[0]
+    with pytest.raises(ValueError):
+        agent.calculate('is', 150000)
+
+
+def test_ordonnanceur_priorites_equite_et_delestage():
+    """🗓️ Alertes d'abord, tourniquet entre tenants, marketing délesté en surcharge"""
+    async def scenario():
+        order = []
+
+        async def send(user_id, platform, message, message_type):
+            order.append(message)
+            return True
+
+        scheduler = DispatchScheduler(rate_limits={'telegram': None}, concurrency=1, max_queue=8)
+        futures = [scheduler.submit_nowait(f"+21366600{i:04d}", 'telegram', f"promo-{i}",
+                                           'marketing', tenant='atlas') for i in range(4)]
+        futures += [scheduler.submit_nowait('+213555000001', 'telegram', f"{tenant}-{i}",
+                                            'normal', tenant=tenant)
+                    for tenant in ('atlas', 'tassili') for i in range(2)]
+        # File pleine : l'alerte évince la plus ancienne promo, une promo de plus est refusée
+        futures.append(scheduler.submit_nowait('+213555000002', 'telegram', 'alerte-G50', 'alert'))
+        futures.append(scheduler.submit_nowait('+213555000003', 'telegram', 'promo-4', 'marketing'))
+        scheduler.start(send)
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await scheduler.close()
+        return order, results, scheduler.stats()
+
+    order, results, stats = asyncio.run(scenario())
+    assert order == ['alerte-G50', 'atlas-0', 'tassili-0', 'atlas-1', 'tassili-1',
+                     'promo-1', 'promo-2', 'promo-3']
+    assert isinstance(results[0], MessageShed) and isinstance(results[-1], MessageShed)
+    marketing = stats['classes']['marketing']
+    assert (marketing['sent'], marketing['shed'], marketing['depth']) == (3, 2, 0)
+    assert stats['classes']['alert']['wait_max'] < 1.0
+
+
+def test_file_envoi_ouverture_unique_et_idempotence(tmp_path):
+    """📮 Premiers enqueue simultanés : une seule connexion SQLite, clés dédupliquées"""
+    async def scenario():
+        queue = OutboundQueue(str(tmp_path / 'outbox.db'))
+        opened = []
+        open_db = queue._open
+        queue._open = lambda: (opened.append(1), open_db())
+        ids = await asyncio.gather(*(
+            queue.enqueue('+213555000001', 'telegram', f"G50-{i % 10}", idempotency_key=f"g50-{i % 10}")
+            for i in range(30)
+        ))
+        stats = await queue.stats()
+        await queue.close()
+        return opened, ids, stats
+
+    opened, ids, stats = asyncio.run(scenario())
+    assert len(opened) == 1
+    assert len(set(ids)) == 10 and stats['pending'] == 10 and stats['enqueued'] == 10
+
+
+def test_orchestrateur_file_durable_via_ordonnanceur(tmp_path):
+    """🗓️ Ordonnanceur démarré au premier envoi ; la file durable passe par lui (tenant conservé)"""
+    async def scenario():
+        sent = []
+
+        class Agent:
+            http_client = None
+
+            async def send_message(self, recipient, text):
+                sent.append(text)
+                return True
+
+        orchestrator = MultiPlatformOrchestrator(
+            scheduler=DispatchScheduler(rate_limits={'telegram': None}))
+        orchestrator.register_platform('telegram', Agent())
+        direct = await asyncio.wait_for(
+            orchestrator.send_smart_message('+213555000001', 'direct', 'alert'), 2)
+
+        orchestrator.outbox = OutboundQueue(str(tmp_path / 'outbox.db'))
+        orchestrator.start_outbox()
+        for i in range(3):
+            await orchestrator.send_smart_message('+213555000001', f'G50-{i}', 'alert',
+                                                  tenant_id='eurl-tassili')
+        await orchestrator.outbox.drain(timeout=5)
+        await orchestrator.outbox.close()
+        await orchestrator.scheduler.close()
+        return direct, sent, orchestrator.dispatch_stats()
+
+    direct, sent, stats = asyncio.run(scenario())
+    assert direct is True
+    assert sorted(sent) == ['G50-0', 'G50-1', 'G50-2', 'direct']
+    assert stats['classes']['alert']['sent'] == 4
+
+
+def test_telegram_long_polling_et_commandes():
+    """📥 getUpdates par lots, offset confirmé, commandes et requêtes fiscales"""
+    async def scenario():
+        async with StubApiServer() as server:
+            async with HttpClient() as client:
+                agent = TelegramAgentAlgeria("123:ABC", http_client=client, api_base=server.url,
+                                             fiscal_agent=FiscalAiAgent())
+                for chat_id, text in enumerate(["/start", "/tva@erp_dz_bot 100000", "/inconnue",
+                                                "IRG pour salaire 150000 DZD avec 1 enfant"]):
+                    server.push_update(text, chat_id=chat_id)
+                poller = TelegramUpdatePoller(agent, limit=3, timeout=1)
+                poller.start()
+                while len(server.messages) < 4:
+                    await asyncio.sleep(0.01)
+                # Mise à jour arrivée pendant le long-polling
+                server.push_update("/help", chat_id=9)
+                while len(server.messages) < 5:
+                    await asyncio.sleep(0.01)
+                await poller.stop()
+                return {m['chat_id']: m['text'] for m in server.messages}, poller, server.updates
+
+    replies, poller, pending = asyncio.run(scenario())
+    assert replies[0].startswith("🇩🇿 Bienvenue") and "/tva" in replies[9]
+    assert "19,000.00" in replies[1] and "4,024.77" in replies[3]
+    assert replies[2].startswith("❓")
+    assert poller.offset == 6 and not pending and poller.batches == 3
+
+
+def test_telegram_webhook_jeton_secret():
+    """🔗 Jeton secret du webhook : absent, faux ou non ASCII refusé en 403"""
+    batches = []
+
+    class Dispatcher:
+        async def dispatch(self, batch):
+            batches.append(batch)
+
+    async def scenario():
+        handler = TelegramWebhookHandler(Dispatcher(), secret_token='S3CRET', batch_delay=0.001)
+        body = json.dumps({'update_id': 1}).encode()
+        statuses = [handler.handle(body, headers) for headers in (
+            {}, {'x-telegram-bot-api-secret-token': 'FAUX'},
+            {'x-telegram-bot-api-secret-token': 'é'},
+            {'x-telegram-bot-api-secret-token': 'S3CRET'})]
+        await asyncio.sleep(0.02)
+        return statuses
+
+    assert asyncio.run(scenario()) == [403, 403, 403, 200]
+    assert batches == [[{'update_id': 1}]]
+
+
+def test_imports_sans_effet_de_bord_et_registre_paresseux():
+    """📦 Import muet, sans numpy ni sys.path modifié ; agents importés au premier usage"""
+    result = import_budget.measure('multi_platform_orchestrator',
+                                   ['numpy', 'httpx', 'telegram_agent_algeria',
+                                    'fiscal_agent_algeria'])
+    assert not result['stdout'] and not result['handlers'] and not result['forbidden']
+    for module in ('multi_platform_orchestrator', 'elearning_chat_ai', 'ocr_factures_dz'):
+        assert not import_budget.measure(module, [])['sys_path'], module
+
+    registry = AgentRegistry({'telegram': 'telegram_agent_algeria:TelegramAgentAlgeria'},
+                             group=None)
+    assert not registry.is_loaded('telegram')
+    agent = registry.create('telegram', 'TOKEN')
+    assert isinstance(agent, TelegramAgentAlgeria) and registry.is_loaded('telegram')
+    with pytest.raises(KeyError):
+        registry.load('viber')
+
+
+def test_index_formations_bm25_mmap(tmp_path):
+    """🔎 Leçons et base de connaissances indexées, fichier mmap, deux chemins identiques"""
+    path = str(tmp_path / 'course_index.dzix')
+    build_course_index(path)
+    with CourseIndex.open(path) as index, CourseIndex.open(path, use_numpy=False) as plain:
+        for query in ("taux de TVA à l'export", "Déclaration G50", "cotisations sociales CNAS"):
+            assert index.search(query) == plain.search(query)
+        assert index.search("déclaration mensuelle")[0].title == "Déclarations G50"
+        assert index.search("bonjour") == []
+
+    chat = ELearningChatAI(index_path=path)
+    answer = asyncio.run(chat.process_question("Quel est le taux de TVA ?"))
+    assert answer.startswith("💰 TVA Algeria: 19%") and "« TVA Algeria »" in answer
+    assert asyncio.run(chat.process_question("bonjour")).startswith("📚")
+
+
+def test_cache_reponses_questions_proches():
+    """🧩 Reformulations servies par le cache, langues séparées, LRU et TTL"""
+    now = [0.0]
+    cache = AnswerCache(maxsize=2, ttl=60, clock=lambda: now[0])
+    cache.put("Quel est le taux de TVA en Algérie ?", "TVA")
+    cache.put("ما هي نسبة الضريبة على القيمة المضافة؟", "TVA-ar", 'ar')
+    assert cache.get("quel taux TVA algerie") == "TVA"                      # exact après normalisation
+    assert cache.get("Svp, le taux de la TVA en Algérie ?") == "TVA"  # proche (Jaccard 3/4)
+    assert cache.get("ما نسبة ضريبة القيمة المضافة", 'ar') == "TVA-ar"      # article, ة/ه, ؟
+    assert cache.get("taux IRG Algérie") is None
+    assert cache.get("quel taux TVA algerie", 'ar') is None
+
+    cache.put("Déclaration G50", "G50")                       # évince la moins récemment servie
+    assert cache.get("Quel est le taux de TVA en Algérie ?") is None
+    now[0] = 61.0
+    assert cache.get("ما هي نسبة الضريبة على القيمة المضافة؟", 'ar') is None
+
+    stats = cache.stats()
+    assert (stats['exact_hits'], stats['near_hits'], stats['misses']) == (2, 1, 4)
+    assert stats['evictions'] == 1 and stats['expired'] == 1 and stats['size'] == 1
+
+
+def test_ocr_factures_pipeline_parallele(tmp_path):
+    """📄 TIFF multi-pages en flux sur 2 processus : champs exacts, TVA contrôlée"""
+    batch = write_batch(str(tmp_path), 6, invalid_ratio=0.3)
+    (tmp_path / 'vide.tif').write_bytes(b'II*\0')
+    expected = {path: (fields, valid) for path, fields, valid in batch}
+    pipeline = InvoiceOcrPipeline(GlyphOcrBackend(), workers=2, queue_size=2)
+
+    async def run():
+        return [result async for result in pipeline.process(
+            [path for path, _, _ in batch] + [str(tmp_path / 'vide.tif')])]
+
+    results = asyncio.run(run())
+    assert sorted(result['index'] for result in results) == list(range(7))
+    broken = results.pop(next(i for i, result in enumerate(results) if result['index'] == 6))
+    assert broken['error'].startswith("décodage") and not broken['validation']['valid']
+    for result in results:
+        fields, valid = expected[result['source']]
+        assert result['fields'] == fields
+        assert result['validation']['valid'] == valid, result['validation']['errors']
+    assert any(not valid for _, valid in expected.values())
+    stats = pipeline.stats()
+    assert stats['documents'] == 7 and stats['pages'] == sum(r['pages'] for r in results)
+    assert stats['max_pending_pages'] <= 2
+
+    class Unfinished(OcrBackend):
+        name = 'incomplet'
+
+    with pytest.raises(TypeError):  # moteur sans recognize() refusé avant tout envoi au pool
+        InvoiceOcrPipeline(Unfinished())
+
+
+@pytest.mark.skipif(not os.environ.get('RUN_BENCHMARKS'),
+                    reason="benchmarks : définir RUN_BENCHMARKS=1")
+def test_benchmarks_sans_regression():
+    """⏱️ Aucune régression au-delà du seuil des références"""
+    baselines = suite.load_baselines()
+    results = suite.run_suite(list(baselines['results']))
+    regressions = suite.compare(results, baselines)
+    assert not regressions, "\n".join(regressions)
+
 
 if __name__ == "__main__":
-    print("🚀 Démarrage des tests Agent IA Algeria...")
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(pytest.main([__file__, '-v']))
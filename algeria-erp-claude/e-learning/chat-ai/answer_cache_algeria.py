@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧩 Cache des réponses par similarité (MinHash + LSH)
+Les stagiaires d'une même promotion posent la même question avec de
+petites variantes (accents, mots vides, pluriels, ordre des mots) : la
+question normalisée reçoit une signature MinHash, les questions proches
+sont retrouvées par bandes LSH et la réponse en cache est réutilisée
+au-delà d'un seuil de similarité (Jaccard des termes).
+"""
+
+import hashlib
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from course_index_algeria import tokenize
+
+_MASK = 0xFFFFFFFF
+
+
+class _Entry:
+    __slots__ = ('key', 'language', 'signature', 'answer', 'expires', 'hits')
+
+
+class AnswerCache:
+    """🧩 Réponses réutilisées pour les questions quasi identiques
+
+    - clé exacte (termes normalisés triés) : un dict, sans calcul de signature
+    - sinon signature MinHash de `num_perm` valeurs 32 bits sur l'ensemble
+      des termes (les `num_perm` hachages d'un terme sont tirés d'un seul
+      condensat SHAKE-128, salé par `seed`), découpée en `bands` bandes : deux questions partageant une
+      bande sont candidates, retenues si le Jaccard exact de leurs termes
+      atteint `threshold` (pas de faux positif dû à l'estimation MinHash)
+    - au plus `maxsize` réponses, éviction LRU ; `ttl` (s) optionnel
+    """
+
+    def __init__(self, maxsize: int = 10_000, threshold: float = 0.75, num_perm: int = 64,
+                 bands: int = 16, ttl: Optional[float] = None, seed: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands")
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ttl = ttl
+        self._clock = clock
+        self._salt = seed.to_bytes(8, 'little')
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._buckets: Dict[tuple, List[_Entry]] = {}
+        self._stats = {'lookups': 0, 'exact_hits': 0, 'near_hits': 0, 'misses': 0,
+                       'candidates': 0, 'evictions': 0, 'expired': 0}
+
+    # ------------------------------------------------------------------
+    # Signatures
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def shingles(question: str) -> frozenset:
+        """Ensemble des termes normalisés (ceux de l'index des formations)"""
+        return frozenset(tokenize(question))
+
+    def signature(self, shingles: frozenset) -> array:
+        """Signature MinHash : minimum de chaque permutation sur les termes"""
+        if not shingles:
+            return array('I', [_MASK] * self.num_perm)
+        size = 4 * self.num_perm
+        hashes = [array('I', hashlib.shake_128(self._salt + shingle.encode('utf-8')).digest(size))
+                  for shingle in shingles]
+        return array('I', map(min, *hashes)) if len(hashes) > 1 else hashes[0]
+
+    @staticmethod
+    def similarity(first: frozenset, second: frozenset) -> float:
+        """Jaccard des ensembles de termes"""
+        if not first and not second:
+            return 1.0
+        return len(first & second) / len(first | second)
+
+    def _band_keys(self, language: str, signature: array):
+        rows = self.rows
+        return [(language, band, signature[band * rows:(band + 1) * rows].tobytes())
+                for band in range(self.bands)]
+
+    # ------------------------------------------------------------------
+    # Lecture / écriture
+    # ------------------------------------------------------------------
+
+    def get(self, question: str, language: str = 'fr') -> Optional[str]:
+        """Réponse en cache pour une question identique ou proche, sinon None"""
+        self._stats['lookups'] += 1
+        shingles = self.shingles(question)
+        key = (language, tuple(sorted(shingles)))
+
+        entry = self._entries.get(key)
+        if entry is not None and self._alive(entry):
+            self._stats['exact_hits'] += 1
+            return self._hit(entry)
+
+        signature = self.signature(shingles)
+        candidates = {}
+        for band_key in self._band_keys(language, signature):
+            for candidate in self._buckets.get(band_key, ()):
+                candidates[id(candidate)] = candidate
+        self._stats['candidates'] += len(candidates)
+
+        best, best_similarity = None, self.threshold
+        for candidate in candidates.values():
+            score = self.similarity(shingles, frozenset(candidate.key[1]))
+            if score >= best_similarity and self._alive(candidate):
+                best, best_similarity = candidate, score
+        if best is None:
+            self._stats['misses'] += 1
+            return None
+        self._stats['near_hits'] += 1
+        return self._hit(best)
+
+    def put(self, question: str, answer: str, language: str = 'fr'):
+        shingles = self.shingles(question)
+        key = (language, tuple(sorted(shingles)))
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._remove(previous)
+
+        entry = _Entry()
+        entry.key = key
+        entry.language = language
+        entry.signature = self.signature(shingles)
+        entry.answer = answer
+        entry.expires = None if self.ttl is None else self._clock() + self.ttl
+        entry.hits = 0
+        self._entries[key] = entry
+        for band_key in self._band_keys(language, entry.signature):
+            self._buckets.setdefault(band_key, []).append(entry)
+
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries.values())))
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        """À appeler quand l'index des formations est reconstruit"""
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _hit(self, entry: _Entry) -> str:
+        entry.hits += 1
+        self._entries.move_to_end(entry.key)
+        return entry.answer
+
+    def _alive(self, entry: _Entry) -> bool:
+        if entry.expires is None or entry.expires > self._clock():
+            return True
+        self._remove(entry)
+        self._stats['expired'] += 1
+        return False
+
+    def _remove(self, entry: _Entry):
+        del self._entries[entry.key]
+        for band_key in self._band_keys(entry.language, entry.signature):
+            bucket = self._buckets[band_key]
+            bucket.remove(entry)
+            if not bucket:
+                del self._buckets[band_key]
+
+    # ------------------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """📊 Taux de succès (exact / proche), candidats LSH vérifiés, évictions"""
+        stats = dict(self._stats)
+        hits = stats['exact_hits'] + stats['near_hits']
+        stats['hits'] = hits
+        stats['hit_rate'] = hits / stats['lookups'] if stats['lookups'] else 0.0
+        stats['size'] = len(self._entries)
+        stats['buckets'] = len(self._buckets)
+        return stats
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔎 Index de recherche des formations Algeria (BM25)
+Index inversé des leçons (modules/*.json) et de la base de connaissances,
+construit une fois puis enregistré dans un fichier binaire compact ouvert
+par mmap : les workers le chargent sans le décoder, une requête ne lit
+que les listes de ses termes.
+"""
+
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from array import array
+from collections import Counter, namedtuple
+from heapq import nlargest
+from typing import Dict, Iterable, List, Optional
+
+# Format de fichier : en-tête puis 6 sections alignées sur 8 octets
+MAGIC = b'DZIX'
+VERSION = 1
+_HEADER = struct.Struct('<4sHBBIIIdd')          # magic, version, ordre, -, termes, docs, postings, k1, b
+_SECTIONS = ('offsets', 'terms', 'doc_ids', 'scores', 'doc_offsets', 'docs')
+_SECTION_TABLE = struct.Struct('<' + 'QQ' * len(_SECTIONS))
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+
+# Titre compté deux fois : une leçon intitulée « TVA » passe devant une simple mention
+TITLE_WEIGHT = 2
+
+
+SearchHit = namedtuple('SearchHit', ['score', 'kind', 'title', 'text', 'source', 'meta'])
+
+_TOKEN_RE = re.compile(r'\w+')
+# ى -> ي, ة -> ه ; tatweel supprimé (les hamzas et diacritiques partent avec NFKD)
+_ARABIC_FOLD = str.maketrans({'ى': 'ي', 'ة': 'ه', 'ـ': None})
+
+
+def normalize(text: str) -> str:
+    """Minuscules sans accents ni diacritiques arabes (أ إ آ -> ا)"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed
+                   if not unicodedata.combining(char)).translate(_ARABIC_FOLD)
+
+
+# Mots vides, normalisés comme les textes indexés
+STOPWORDS = frozenset(normalize(word) for word in """
+le la les l un une des de du d au aux a et ou en sur pour par avec sans dans est sont
+ce cet cette ces quel quelle quels quelles que qui quoi comment combien je tu il nous vous
+ils mon ma mes ton ta votre vos leur leurs se sa son ses y ne pas plus moins tres
+the of and or to in on for with is are what how which my your
+في من على الى عن مع هل ما ماذا كيف كم هو هي هذا هذه ذلك التي الذي او و ان
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Termes indexés d'un texte (français, anglais, arabe, darja, tamazight)"""
+    tokens = []
+    for token in _TOKEN_RE.findall(normalize(text)):
+        if token in STOPWORDS or (len(token) < 2 and not token.isdigit()):
+            continue
+        if token.isascii():
+            # Pluriel latin : declarations -> declaration
+            if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+                token = token[:-1]
+        else:
+            # Article arabe : الضريبة / والضريبة / بالضريبة -> ضريبه
+            for prefix in ('وال', 'بال', 'لل', 'ال'):
+                if token.startswith(prefix) and len(token) - len(prefix) >= 3:
+                    token = token[len(prefix):]
+                    break
+        tokens.append(token)
+    return tokens
+
+
+def collect_documents(modules_dir: Optional[str] = None,
+                      knowledge_base: Optional[Dict[str, Dict[str, str]]] = None) -> List[Dict]:
+    """📚 Documents à indexer : leçons des modules et entrées de la base de connaissances
+
+    Une leçon est un titre (chaîne) ou un objet {"title", "content", ...}.
+    """
+    documents = []
+    if modules_dir and os.path.isdir(modules_dir):
+        for name in sorted(os.listdir(modules_dir)):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(modules_dir, name), encoding='utf-8') as handle:
+                module = json.load(handle)
+            for position, lesson in enumerate(module.get('lessons', [])):
+                if isinstance(lesson, str):
+                    lesson = {'title': lesson}
+                documents.append({
+                    'kind': 'lesson',
+                    'title': lesson['title'],
+                    'text': lesson.get('content', ''),
+                    'source': f"{name}#{position}",
+                    'meta': {'module': module.get('module', ''),
+                             'duration': lesson.get('duration', module.get('duration', ''))}
+                })
+    for category, entries in (knowledge_base or {}).items():
+        for key, text in entries.items():
+            documents.append({'kind': 'knowledge', 'title': key, 'text': text,
+                              'source': f"{category}.{key}", 'meta': {'category': category}})
+    return documents
+
+
+def _load_numpy():
+    """numpy s'il est installé ; importé à l'ouverture d'un index, pas à l'import du module"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _align(buffer: bytearray):
+    buffer.extend(b'\0' * (-len(buffer) % 8))
+
+
+def build_index(documents: Iterable[Dict], k1: float = 1.2, b: float = 0.75) -> bytes:
+    """🏗️ Index BM25 sérialisé : poids de chaque posting précalculés à la construction"""
+    documents = list(documents)
+    frequencies = []
+    for document in documents:
+        tokens = tokenize(document['title']) * TITLE_WEIGHT + tokenize(document.get('text', ''))
+        frequencies.append(Counter(tokens))
+    lengths = [sum(counts.values()) for counts in frequencies]
+    average = (sum(lengths) / len(lengths)) if documents else 1.0
+
+    postings: Dict[str, List[int]] = {}
+    for doc_id, counts in enumerate(frequencies):
+        for term in counts:
+            postings.setdefault(term, []).append(doc_id)
+
+    count = len(documents)
+    term_offsets, terms = array('I', [0]), bytearray()
+    posting_offsets, doc_ids, scores = array('I', [0]), array('I'), array('f')
+    for term in sorted(postings, key=lambda term: term.encode('utf-8')):
+        terms += term.encode('utf-8')
+        term_offsets.append(len(terms))
+        ids = postings[term]
+        idf = math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+        for doc_id in ids:
+            tf = frequencies[doc_id][term]
+            norm = k1 * (1 - b + b * lengths[doc_id] / average)
+            doc_ids.append(doc_id)
+            scores.append(idf * tf * (k1 + 1) / (tf + norm))
+        posting_offsets.append(len(doc_ids))
+    # Une seule table d'offsets pour les termes et leurs listes : [fin du terme, fin des postings]
+    offsets = array('I')
+    for position in range(len(term_offsets)):
+        offsets += array('I', (term_offsets[position], posting_offsets[position]))
+
+    doc_offsets, docs = array('I', [0]), bytearray()
+    for document in documents:
+        docs += json.dumps([document['kind'], document['title'], document.get('text', ''),
+                            document.get('source', ''), document.get('meta', {})],
+                           ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        doc_offsets.append(len(docs))
+
+    sections = (offsets.tobytes(), bytes(terms), doc_ids.tobytes(), scores.tobytes(),
+                doc_offsets.tobytes(), bytes(docs))
+    # Offsets absolus : chaque section commence à un multiple de 8 dans le fichier
+    output = bytearray(_HEADER.size + _SECTION_TABLE.size)
+    table = []
+    for data in sections:
+        _align(output)
+        table += [len(output), len(data)]
+        output += data
+    _HEADER.pack_into(output, 0, MAGIC, VERSION, _BYTE_ORDERS[sys.byteorder], 0,
+                      len(postings), count, len(doc_ids), k1, b)
+    _SECTION_TABLE.pack_into(output, _HEADER.size, *table)
+    return bytes(output)
+
+
+class CourseIndex:
+    """🔎 Index BM25 en lecture seule sur un tampon (bytes ou fichier mmap)
+
+    Le dictionnaire des termes est trié : un terme est trouvé par recherche
+    dichotomique directement dans le tampon, ses postings (document, poids
+    BM25) sont lus sans copie. Seuls les documents retournés sont décodés.
+    """
+
+    def __init__(self, buffer, mapping: Optional[mmap.mmap] = None, use_numpy: bool = True):
+        self._mapping = mapping
+        view = memoryview(buffer)
+        magic, version, byte_order, _, self.term_count, self.doc_count, self.posting_count, \
+            self.k1, self.b = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("fichier d'index de formation invalide ou version non supportée")
+        table = _SECTION_TABLE.unpack_from(view, _HEADER.size)
+        sections = {name: view[table[2 * i]:table[2 * i] + table[2 * i + 1]]
+                    for i, name in enumerate(_SECTIONS)}
+
+        native = byte_order == _BYTE_ORDERS[sys.byteorder]
+        self._offsets = self._typed(sections['offsets'], 'I', native)
+        self._doc_ids = self._typed(sections['doc_ids'], 'I', native)
+        self._scores = self._typed(sections['scores'], 'f', native)
+        self._doc_offsets = self._typed(sections['doc_offsets'], 'I', native)
+        self._terms = sections['terms']
+        self._docs = sections['docs']
+        self._view = view
+
+        # Chemin rapide numpy (si installé) : vues sans copie sur les postings
+        self._np = _load_numpy() if use_numpy else None
+        if self._np is not None:
+            self._np_doc_ids = self._np.frombuffer(self._doc_ids, dtype=self._np.uint32)
+            self._np_scores = self._np.frombuffer(self._scores, dtype=self._np.float32)
+
+    @staticmethod
+    def _typed(section: memoryview, code: str, native: bool):
+        if native:
+            return section.cast(code)
+        copy = array(code, section.tobytes())
+        copy.byteswap()
+        return copy
+
+    @classmethod
+    def build(cls, documents: Iterable[Dict], **params) -> "CourseIndex":
+        return cls(build_index(documents, **params))
+
+    @classmethod
+    def open(cls, path: str, use_numpy: bool = True) -> "CourseIndex":
+        """Ouvre un index enregistré (mmap : pages lues à la demande, partagées entre workers)"""
+        with open(path, 'rb') as handle:
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapping, mapping, use_numpy=use_numpy)
+
+    @staticmethod
+    def save(documents: Iterable[Dict], path: str, **params) -> int:
+        """💾 Construit et enregistre l'index (remplacement atomique) ; taille en octets"""
+        data = build_index(documents, **params)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as handle:
+            handle.write(data)
+        os.replace(temporary, path)
+        return len(data)
+
+    def close(self):
+        if self._mapping is not None:
+            self._np_doc_ids = self._np_scores = None
+            for view in (self._offsets, self._doc_ids, self._scores, self._doc_offsets,
+                         self._terms, self._docs, self._view):
+                if isinstance(view, memoryview):
+                    view.release()
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _term(self, position: int) -> bytes:
+        return self._terms[self._offsets[2 * position]:self._offsets[2 * position + 2]].tobytes()
+
+    def lookup(self, term: str) -> Optional[range]:
+        """Plage des postings du terme (None s'il est absent)"""
+        key = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self._term(low) == key:
+            return range(self._offsets[2 * low + 1], self._offsets[2 * low + 3])
+        return None
+
+    def document(self, doc_id: int) -> Dict:
+        start = self._doc_offsets[doc_id]
+        kind, title, text, source, meta = json.loads(
+            self._docs[start:self._doc_offsets[doc_id + 1]].tobytes())
+        return {'kind': kind, 'title': title, 'text': text, 'source': source, 'meta': meta}
+
+    def search(self, query: str, k: int = 3) -> List[SearchHit]:
+        """Meilleurs documents pour `query` (somme des poids BM25 de ses termes)"""
+        postings = [found for found in map(self.lookup, set(tokenize(query))) if found]
+        if not postings:
+            return []
+        if self._np is not None:
+            ranked = self._top_numpy(postings, k)
+        else:
+            ranked = nlargest(k, self._accumulate(postings).items(), key=lambda item: item[1])
+        return [SearchHit(score, **self.document(doc_id)) for doc_id, score in ranked]
+
+    def _accumulate(self, postings: List[range]) -> Dict[int, float]:
+        doc_ids, scores = self._doc_ids, self._scores
+        first = postings[0]
+        totals = dict(zip(doc_ids[first.start:first.stop].tolist(),
+                          scores[first.start:first.stop].tolist()))
+        get = totals.get
+        for found in postings[1:]:
+            for doc_id, score in zip(doc_ids[found.start:found.stop].tolist(),
+                                     scores[found.start:found.stop].tolist()):
+                totals[doc_id] = get(doc_id, 0.0) + score
+        return totals
+
+    def _top_numpy(self, postings: List[range], k: int) -> List[tuple]:
+        """Sommes par document en un bincount, k meilleurs par argpartition"""
+        np = self._np
+        doc_ids = np.concatenate([self._np_doc_ids[found.start:found.stop] for found in postings])
+        scores = np.concatenate([self._np_scores[found.start:found.stop] for found in postings])
+        totals = np.bincount(doc_ids, weights=scores)
+        candidates = np.flatnonzero(totals)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(totals[candidates], -k)[-k:]]
+        return sorted(((int(doc_id), float(totals[doc_id])) for doc_id in candidates),
+                      key=lambda item: item[1], reverse=True)
+
+    def stats(self) -> Dict:
+        return {'documents': self.doc_count, 'terms': self.term_count,
+                'postings': self.posting_count, 'bytes': len(self._view)}
@@ -1,29 +1,83 @@
 import asyncio
 import json
+import os
+import sys
 from datetime import datetime
 
+from answer_cache_algeria import AnswerCache
+from course_index_algeria import CourseIndex, collect_documents
+
+CHAT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULES_DIR = os.path.join(os.path.dirname(CHAT_DIR), 'modules')
+# Index construit par `python elearning_chat_ai.py --build-index`
+DEFAULT_INDEX_PATH = os.path.join(CHAT_DIR, 'course_index.dzix')
+
+KNOWLEDGE_BASE = {
+    "fiscal_algeria": {
+        "tva": "TVA Algeria: 19% normale, 9% réduite, 0% export",
+        "irg": "IRG progressif: 0-120k (0%), 120-360k (23%), 360k-1.44M (27%), +1.44M (35%)"
+    },
+    "social_algeria": {
+        "cnas": "CNAS: Sécurité sociale salariés, cotisations employeur 26%",
+        "casnos": "CASNOS: Non-salariés, cotisation 15% revenus"
+    }
+}
+
+CATEGORY_ICONS = {
+    "fiscal_algeria": "💰",
+    "social_algeria": "👥"
+}
+
+DEFAULT_ANSWER = "📚 Posez votre question sur fiscal/social Algeria. Je suis là pour vous former!"
+
+
+def build_course_index(path=DEFAULT_INDEX_PATH, modules_dir=MODULES_DIR,
+                       knowledge_base=KNOWLEDGE_BASE):
+    """🏗️ Indexe toutes les leçons et la base de connaissances ; taille du fichier"""
+    return CourseIndex.save(collect_documents(modules_dir, knowledge_base), path)
+
+
 class ELearningChatAI:
-    def __init__(self):
-        self.knowledge_base = {
-            "fiscal_algeria": {
-                "tva": "TVA Algeria: 19% normale, 9% réduite, 0% export",
-                "irg": "IRG progressif: 0-120k (0%), 120-360k (23%), 360k-1.44M (27%), +1.44M (35%)"
-            },
-            "social_algeria": {
-                "cnas": "CNAS: Sécurité sociale salariés, cotisations employeur 26%",
-                "casnos": "CASNOS: Non-salariés, cotisation 15% revenus"
-            }
-        }
+    def __init__(self, index: CourseIndex = None, index_path=DEFAULT_INDEX_PATH,
+                 min_score=0.5, answer_cache: AnswerCache = None):
+        self.knowledge_base = KNOWLEDGE_BASE
+        # Index enregistré (mmap) s'il existe, sinon construit en mémoire au démarrage
+        if index is None:
+            if os.path.exists(index_path):
+                index = CourseIndex.open(index_path)
+            else:
+                index = CourseIndex.build(collect_documents(MODULES_DIR, self.knowledge_base))
+        self.index = index
+        self.min_score = min_score
+        # Questions quasi identiques d'une même promotion : réponse réutilisée
+        self.answer_cache = answer_cache if answer_cache is not None else AnswerCache()
         print("🧠 Chat IA Formateur Algeria initialisé")
-    
+
     async def process_question(self, question, language="fr"):
-        if "tva" in question.lower():
-            return "💰 TVA Algeria: Taux normal 19%, réduit 9%, export 0%. Questions?"
-        elif "irg" in question.lower():
-            return "💼 IRG progressif Algeria avec abattements famille. Exemple?"
-        else:
-            return "📚 Posez votre question sur fiscal/social Algeria. Je suis là pour vous former!"
+        answer = self.answer_cache.get(question, language)
+        if answer is None:
+            answer = self.answer_question(question)
+            self.answer_cache.put(question, answer, language)
+        return answer
+
+    def answer_question(self, question):
+        """📚 Réponse calculée depuis l'index (sans cache)"""
+        hits = [hit for hit in self.index.search(question, k=3) if hit.score >= self.min_score]
+        if not hits:
+            return DEFAULT_ANSWER
+
+        lines = []
+        answer = next((hit for hit in hits if hit.kind == 'knowledge'), None)
+        if answer is not None:
+            lines.append(f"{CATEGORY_ICONS.get(answer.meta['category'], '📌')} {answer.text}")
+        for lesson in (hit for hit in hits if hit.kind == 'lesson'):
+            lines.append(f"📖 Leçon « {lesson.title} » - {lesson.meta['module']} "
+                         f"({lesson.meta['duration']})")
+        return "\n".join(lines)
 
 if __name__ == "__main__":
+    if "--build-index" in sys.argv:
+        size = build_course_index()
+        print(f"💾 Index des formations: {DEFAULT_INDEX_PATH} ({size} octets)")
     chat = ELearningChatAI()
     print("✅ Chat IA E-Learning opérationnel")